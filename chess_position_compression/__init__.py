@@ -0,0 +1,12 @@
+
+"""
+Compression of chess positions.
+Importing the package only loads the scheme registry (see registry.py); each scheme's module and code tables
+are loaded on its first use, e.g.
+  from chess_position_compression import encode, decode
+  bits = encode(board, "best")
+  board = decode(bits.to_bytes(), len(bits), "best")
+Modules with a command line are run with python -m chess_position_compression.<module>.
+"""
+
+from .registry import SCHEMES, Scheme, register_scheme, get_scheme, encode, decode
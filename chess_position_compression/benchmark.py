@@ -0,0 +1,195 @@
+
+"""
+Reproducible benchmarks of the encoding schemes.
+A corpus of positions is sampled once from the PGN with a fixed seed and frozen to a JSON file of FENs, so every
+run measures exactly the same positions without parsing any PGN. For every scheme, a run measures encoding and
+decoding speed (positions per second, best of several repeats), bits per position and peak memory (tracemalloc),
+and writes the results as JSON. Results can be compared against a stored baseline to catch regressions.
+Usage:
+  python -m chess_position_compression.benchmark freeze corpus.json [--n 2000] [--factor 10] [--seed 0] [--pgn games.pgn]
+  python -m chess_position_compression.benchmark run corpus.json [--output results.json] [--baseline baseline.json] [--tolerance 0.1]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import chess
+from .registry import SCHEMES
+
+CORPUS_FORMAT = "chess-position-compression-corpus"
+RESULTS_FORMAT = "chess-position-compression-benchmark"
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.1
+
+def encode_fen(board):
+  return board.fen()
+
+def decode_fen(fen):
+  return chess.Board(fen)
+
+def get_benchmark_schemes(codebook_id=0):
+  """ Returns {scheme name: (encoding function, decoding function, size function)}, FEN included for reference. """
+  schemes = {"fen": (encode_fen, decode_fen, lambda encoding: len(encoding) * 8)}
+  for name, scheme in SCHEMES.items():
+    if scheme.scheme_id is None:
+      continue
+    encode_fn, decode_fn = scheme.load()
+    if scheme.uses_codebook:
+      encode = lambda board, encode_fn=encode_fn: encode_fn(board, codebook_id=codebook_id)
+      decode = lambda encoding, decode_fn=decode_fn: decode_fn(encoding.to_bytes(), len(encoding), codebook_id=codebook_id)
+    else:
+      encode = encode_fn
+      decode = lambda encoding, decode_fn=decode_fn: decode_fn(encoding.to_bytes(), len(encoding))
+    schemes[name] = (encode, decode, len)
+  return schemes
+
+def freeze_corpus(path, n=2000, factor=10, seed=0, pgn_path=None):
+  """
+  Samples up to n unique positions from the PGN with a seeded random generator and saves them as FENs to path.
+  Returns the number of positions.
+  """
+  from .load_games import iter_positions
+  from .position_store import unique_positions
+  positions = unique_positions(iter_positions(n, factor, pgn_path=pgn_path, rng=random.Random(seed)))
+  with open(path, "w") as f:
+    json.dump({
+      "format": CORPUS_FORMAT,
+      "seed": seed,
+      "factor": factor,
+      "fens": [board.fen() for board in positions]
+    }, f, indent=0)
+  return len(positions)
+
+def load_corpus(path):
+  """ Returns the chess.Boards of a corpus saved with freeze_corpus. """
+  with open(path) as f:
+    contents = json.load(f)
+  if contents.get("format") != CORPUS_FORMAT:
+    raise ValueError("{} is not a benchmark corpus.".format(path))
+  return [chess.Board(fen) for fen in contents["fens"]]
+
+def best_time(fn, items, repeat):
+  """ Returns the shortest of repeat timings of calling fn on every item. """
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for item in items:
+      fn(item)
+    elapsed = time.perf_counter() - start
+    if best is None or elapsed < best:
+      best = elapsed
+  return best
+
+def peak_memory(encode, decode, boards):
+  """ Returns the peak bytes allocated while encoding and decoding every board. """
+  tracemalloc.start()
+  try:
+    for board in boards:
+      decode(encode(board))
+    return tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+def benchmark_scheme(encode, decode, size, boards, repeat=DEFAULT_REPEAT):
+  """ Returns the results of one scheme on boards as a dict. """
+  encodings = [encode(board) for board in boards]
+  for board, encoding in zip(boards, encodings):
+    if decode(encoding).board_fen() != board.board_fen():
+      raise ValueError("Decoding doesn't give back {}.".format(board.fen()))
+  encode_time = best_time(encode, boards, repeat)
+  decode_time = best_time(decode, encodings, repeat)
+  return {
+    "encode_per_second": len(boards) / encode_time,
+    "decode_per_second": len(encodings) / decode_time,
+    "bits_per_position": sum([size(encoding) for encoding in encodings]) / len(encodings),
+    "peak_memory_bytes": peak_memory(encode, decode, boards)
+  }
+
+def run_benchmarks(boards, schemes=None, repeat=DEFAULT_REPEAT, codebook_id=0):
+  """ Benchmarks the named schemes (all if None) on boards. Returns the results as a dict. """
+  benchmark_schemes = get_benchmark_schemes(codebook_id)
+  if schemes is None:
+    schemes = list(benchmark_schemes)
+  results = {}
+  for name in schemes:
+    results[name] = benchmark_scheme(*benchmark_schemes[name], boards, repeat)
+  return {
+    "format": RESULTS_FORMAT,
+    "positions": len(boards),
+    "repeat": repeat,
+    "codebook_id": codebook_id,
+    "python": platform.python_version(),
+    "chess": chess.__version__,
+    "schemes": results
+  }
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+  """
+  Returns a list of regressions of results against baseline, as strings.
+  Speed may drop and peak memory may grow by the tolerance fraction before counting as a regression, since
+  timings are noisy; sizes are deterministic, so any growth counts.
+  """
+  regressions = []
+  for name, baseline_result in baseline["schemes"].items():
+    if name not in results["schemes"]:
+      continue
+    result = results["schemes"][name]
+    for key in ("encode_per_second", "decode_per_second"):
+      if result[key] < baseline_result[key] * (1 - tolerance):
+        regressions.append("{} {}: {:.0f} -> {:.0f}".format(name, key, baseline_result[key], result[key]))
+    if result["bits_per_position"] > baseline_result["bits_per_position"]:
+      regressions.append("{} bits_per_position: {:.2f} -> {:.2f}".format(name, baseline_result["bits_per_position"], result["bits_per_position"]))
+    if result["peak_memory_bytes"] > baseline_result["peak_memory_bytes"] * (1 + tolerance):
+      regressions.append("{} peak_memory_bytes: {} -> {}".format(name, baseline_result["peak_memory_bytes"], result["peak_memory_bytes"]))
+  return regressions
+
+def format_results(results):
+  """ Returns the results as a table. """
+  lines = ["{:14}| {:>12} | {:>12} | {:>10} | {:>12}".format("scheme", "encode/s", "decode/s", "bits", "peak bytes")]
+  for name, result in results["schemes"].items():
+    lines.append("{:14}| {:12.0f} | {:12.0f} | {:10.2f} | {:12}".format(
+      name, result["encode_per_second"], result["decode_per_second"], result["bits_per_position"], result["peak_memory_bytes"]))
+  return "\n".join(lines)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Benchmarks the encoding schemes on a frozen corpus.")
+  commands = parser.add_subparsers(dest="command", required=True)
+  freeze = commands.add_parser("freeze", help="Samples a corpus from the PGN and saves it.")
+  freeze.add_argument("corpus")
+  freeze.add_argument("--n", type=int, default=2000)
+  freeze.add_argument("--factor", type=int, default=10)
+  freeze.add_argument("--seed", type=int, default=0)
+  freeze.add_argument("--pgn", default=None)
+  run = commands.add_parser("run", help="Benchmarks every scheme on a saved corpus.")
+  run.add_argument("corpus")
+  run.add_argument("--schemes", nargs="+", default=None)
+  run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+  run.add_argument("--codebook", type=int, default=0)
+  run.add_argument("--output", default=None, help="Writes the results as JSON.")
+  run.add_argument("--baseline", default=None, help="Results JSON to compare against; exits with 1 on regressions.")
+  run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+  args = parser.parse_args(argv)
+
+  if args.command == "freeze":
+    print("Froze", freeze_corpus(args.corpus, args.n, args.factor, args.seed, args.pgn), "positions to", args.corpus)
+    return 0
+  results = run_benchmarks(load_corpus(args.corpus), args.schemes, args.repeat, args.codebook)
+  print(format_results(results))
+  if args.output:
+    with open(args.output, "w") as f:
+      json.dump(results, f, indent=1)
+  if args.baseline:
+    with open(args.baseline) as f:
+      regressions = compare_results(results, json.load(f), args.tolerance)
+    for regression in regressions:
+      print("Regression:", regression)
+    if regressions:
+      return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,174 @@
+
+"""
+Bit-level writer and reader used by every encoding scheme.
+Bits are accumulated most significant bit first into a Python int and packed into bytes,
+so an encoding is stored as (bytes, exact number of bits) rather than a string of "0"/"1" characters.
+The string form is only kept as a debug view.
+"""
+
+def code_table(codes):
+  """
+  Converts a dict of string codes, e.g. {"p": "011"}, into a dict of (value, length) tuples, e.g. {"p": (3, 3)}.
+  """
+  return {symbol: (int(code, 2), len(code)) for symbol, code in codes.items()}
+
+def build_decode_table(codes):
+  """
+  Builds a lookup table for decoding a prefix code in one step.
+  codes is a dict of {symbol: (value, length)}. 
+  Returns (table, max_length), where table is indexed by the next max_length bits and holds (symbol, length) tuples,
+  or None for bit patterns that do not start with a valid code. 
+  """
+  max_length = max(length for _, length in codes.values())
+  table = [None] * (1 << max_length)
+  for symbol, (value, length) in codes.items():
+    shift = max_length - length
+    start = value << shift
+    table[start:start + (1 << shift)] = [(symbol, length)] * (1 << shift)
+  return table, max_length
+
+def read_symbol(reader, decode_table):
+  """ Reads one symbol from reader using a table from build_decode_table. """
+  table, max_length = decode_table
+  entry = table[reader.peek(max_length)]
+  if entry is None:
+    raise ValueError("Invalid code at bit {}.".format(reader.pos))
+  reader.skip(entry[1])
+  return entry[0]
+
+class BitWriter:
+  """ Accumulates bits most significant bit first. """
+
+  __slots__ = ("value", "length")
+
+  def __init__(self):
+    self.value = 0
+    self.length = 0
+
+  def write(self, value, num_bits):
+    """ Appends the low num_bits bits of value. """
+    self.value = (self.value << num_bits) | value
+    self.length += num_bits
+    return self
+
+  def write_code(self, code):
+    """ Appends a (value, length) code. """
+    self.value = (self.value << code[1]) | code[0]
+    self.length += code[1]
+    return self
+
+  def write_bit(self, bit):
+    self.value = (self.value << 1) | (1 if bit else 0)
+    self.length += 1
+    return self
+
+  def write_string(self, bits):
+    """ Appends a string of "0"/"1" characters. """
+    if bits:
+      self.write(int(bits, 2), len(bits))
+    return self
+
+  def extend(self, other):
+    """ Appends all of the bits of another BitWriter. """
+    self.value = (self.value << other.length) | other.value
+    self.length += other.length
+    return self
+
+  def to_bytes(self):
+    """ Returns the bits packed into bytes, padded with zeros at the end. """
+    num_bytes = (self.length + 7) // 8
+    return (self.value << (num_bytes * 8 - self.length)).to_bytes(num_bytes, "big")
+
+  def to_string(self):
+    """ Returns the bits as a string of "0"/"1" characters. Only meant for debugging. """
+    if self.length == 0:
+      return ""
+    return format(self.value, "0{}b".format(self.length))
+
+  def __len__(self):
+    return self.length
+
+  def __str__(self):
+    return self.to_string()
+
+  def __repr__(self):
+    return "BitWriter('{}')".format(self.to_string())
+
+  def __eq__(self, other):
+    if isinstance(other, BitWriter):
+      return self.length == other.length and self.value == other.value
+    if isinstance(other, str):
+      return self.to_string() == other
+    return NotImplemented
+
+  def __hash__(self):
+    return hash((self.value, self.length))
+
+class BitReader:
+  """
+  Reads bits most significant bit first from bytes.
+  Reading past the end raises a ValueError; peeking past the end pads with zeros.
+  """
+
+  __slots__ = ("value", "total", "length", "pos")
+
+  def __init__(self, data, length=None):
+    self.value = int.from_bytes(data, "big")
+    self.total = len(data) * 8
+    self.length = self.total if length is None else length
+    self.pos = 0
+
+  @classmethod
+  def from_writer(cls, writer):
+    return cls(writer.to_bytes(), writer.length)
+
+  @classmethod
+  def from_string(cls, bits):
+    writer = BitWriter().write_string(bits)
+    return cls(writer.to_bytes(), writer.length)
+
+  def remaining(self):
+    return self.length - self.pos
+
+  def peek(self, num_bits):
+    """ Returns the next num_bits bits without consuming them. """
+    shift = self.total - self.pos - num_bits
+    if shift >= 0:
+      return (self.value >> shift) & ((1 << num_bits) - 1)
+    return (self.value << -shift) & ((1 << num_bits) - 1)
+
+  def read(self, num_bits):
+    if self.pos + num_bits > self.length:
+      raise ValueError("Tried to read {} bits with only {} remaining.".format(num_bits, self.remaining()))
+    value = self.peek(num_bits)
+    self.pos += num_bits
+    return value
+
+  def read_bit(self):
+    return self.read(1)
+
+  def skip(self, num_bits):
+    if self.pos + num_bits > self.length:
+      raise ValueError("Tried to skip {} bits with only {} remaining.".format(num_bits, self.remaining()))
+    self.pos += num_bits
+
+def as_reader(bits, length=None):
+  """
+  Returns a BitReader for bits, which may be a BitReader (returned as is), a BitWriter,
+  bytes (optionally with an exact bit length), or a string of "0"/"1" characters.
+  """
+  if isinstance(bits, BitReader):
+    return bits
+  if isinstance(bits, BitWriter):
+    return BitReader.from_writer(bits)
+  if isinstance(bits, str):
+    return BitReader.from_string(bits)
+  return BitReader(bits, length)
+
+if __name__ == "__main__":
+  writer = BitWriter()
+  writer.write_string("0001")
+  writer.write(5, 3)
+  print(writer, len(writer), writer.to_bytes())
+  reader = BitReader(writer.to_bytes(), len(writer))
+  print(reader.read(4), reader.read(3), reader.remaining())
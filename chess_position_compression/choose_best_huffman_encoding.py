@@ -0,0 +1,205 @@
+
+from time import perf_counter 
+from . import instrumentation 
+from .bitstream import BitWriter, as_reader, build_decode_table, read_symbol 
+from .utility import board_from_symbols, board_metadata, get_square_symbols, HUFFMAN_CODE_BITS 
+from .huffman import encode_board_to_huffman, read_board_from_huffman, write_huffman, huffman_size 
+from .huffman_symmetry import encode_board_to_huffman_symmetry, read_board_from_huffman_symmetry, write_huffman_symmetry, huffman_symmetry_size, get_mirror_file_mask 
+from .huffman_default import encode_board_to_huffman_default, read_board_from_huffman_default, write_huffman_default, huffman_default_size, get_default_square_mask 
+from .huffman_piececentric import encode_board_to_huffman_piececentric, read_board_from_huffman_piececentric, write_huffman_piececentric, huffman_piececentric_size
+from .range_coding import encode_board_to_range_coded, read_board_from_range_coded, write_range_coded, range_coded_size, has_context_model 
+from .opening_dictionary import encode_board_to_opening_dictionary, read_board_from_opening_dictionary, write_opening_dictionary, opening_dictionary_size, has_opening_dictionary 
+from .codebook import BUILTIN_CODEBOOK_ID, register_codebook_cache
+
+# Encodings the best-of encoding chooses from, in order of preference between equal sizes. 
+# The opening dictionary comes first, so its hits get the shortest selector. 
+ENCODING_ORDER = [
+  encode_board_to_opening_dictionary,
+  encode_board_to_huffman,
+  encode_board_to_huffman_symmetry,
+  encode_board_to_huffman_default,
+  encode_board_to_huffman_piececentric,
+  encode_board_to_range_coded
+]
+
+# Name of each encoding function, for instrumentation (see instrumentation.py). 
+ENCODING_NAMES = {
+  encode_board_to_huffman: "huffman",
+  encode_board_to_huffman_symmetry: "symmetry",
+  encode_board_to_huffman_default: "default",
+  encode_board_to_huffman_piececentric: "piececentric",
+  encode_board_to_range_coded: "range",
+  encode_board_to_opening_dictionary: "dictionary"
+}
+
+# Encodings only used with codebooks that hold their tables: encoding function -> function checking a codebook id. 
+CODEBOOK_ENCODINGS = {
+  encode_board_to_range_coded: has_context_model,
+  encode_board_to_opening_dictionary: has_opening_dictionary
+}
+
+# Reading function of each encoding function. 
+READ_FNS = {
+  encode_board_to_huffman: read_board_from_huffman,
+  encode_board_to_huffman_symmetry: read_board_from_huffman_symmetry,
+  encode_board_to_huffman_default: read_board_from_huffman_default,
+  encode_board_to_huffman_piececentric: read_board_from_huffman_piececentric,
+  encode_board_to_range_coded: read_board_from_range_coded,
+  encode_board_to_opening_dictionary: read_board_from_opening_dictionary
+}
+
+# Reading functions that take a codebook id. 
+CODEBOOK_READ_FNS = (read_board_from_huffman_piececentric, read_board_from_range_coded, read_board_from_opening_dictionary)
+
+def get_selector_codes(encoding_list):
+  """ 
+  Returns {encoding function: selector code}. The n-th encoding gets n ones then a zero, and the last just ones, 
+  so four encodings get 0, 10, 110 and 111. 
+  """
+  codes = {}
+  for index, encode_fn in enumerate(encoding_list):
+    if index == len(encoding_list) - 1:
+      codes[encode_fn] = ((1 << index) - 1, index)
+    else:
+      codes[encode_fn] = (((1 << index) - 1) << 1, index + 1)
+  return codes
+
+def get_available_encodings(codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Returns the encodings the best-of encoding chooses from with the codebook. """
+  return [encode_fn for encode_fn in ENCODING_ORDER if encode_fn not in CODEBOOK_ENCODINGS or CODEBOOK_ENCODINGS[encode_fn](codebook_id)]
+
+# Selector code written in front of the encoding, for each encoding function, with the built-in codebook. 
+ENCODING_DICT = get_selector_codes(get_available_encodings())
+
+# Codebook id -> (selector codes, selector decode table). 
+SELECTORS = register_codebook_cache({
+  BUILTIN_CODEBOOK_ID: (ENCODING_DICT, build_decode_table({READ_FNS[encode_fn]: code for encode_fn, code in ENCODING_DICT.items()}))
+})
+
+def get_selectors(codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Returns (selector codes, selector decode table) of the codebook. """
+  if codebook_id not in SELECTORS:
+    encoding_dict = get_selector_codes(get_available_encodings(codebook_id))
+    SELECTORS[codebook_id] = (encoding_dict, build_decode_table({READ_FNS[encode_fn]: code for encode_fn, code in encoding_dict.items()}))
+  return SELECTORS[codebook_id]
+
+@instrumentation.instrumented("encode.best")
+def encode_board_to_huffman_best_opt(board, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Format [Opt?] [Rest of encoding] 
+  The board is analysed once, the size of every encoding is computed without writing it, 
+  and only the smallest encoding is written. 
+  Returns a BitWriter. 
+  """
+  return write_huffman_best_opt(*analyse_board(board), codebook_id=codebook_id)
+
+def analyse_board(board):
+  """ 
+  Computes everything the encodings are built from. 
+  Returns (metadata bits, symbol of every square, code of every square, mirror mask, default square bitboard). 
+  """
+  if instrumentation.ENABLED:
+    return analyse_board_instrumented(board)
+  symbols = get_square_symbols(board)
+  codes = [HUFFMAN_CODE_BITS[symbol] for symbol in symbols]
+  return board_metadata(board), symbols, codes, get_mirror_file_mask(board), get_default_square_mask(board)
+
+def analyse_board_instrumented(board):
+  """ analyse_board, timing every stage. """
+  start = perf_counter()
+  symbols = get_square_symbols(board)
+  start = instrumentation.record("best.square_symbols", start)
+  codes = [HUFFMAN_CODE_BITS[symbol] for symbol in symbols]
+  start = instrumentation.record("best.square_codes", start)
+  metadata = board_metadata(board)
+  start = instrumentation.record("best.metadata", start)
+  mirror_mask = get_mirror_file_mask(board)
+  start = instrumentation.record("best.mirror_mask", start)
+  default_mask = get_default_square_mask(board)
+  instrumentation.record("best.default_mask", start)
+  return metadata, symbols, codes, mirror_mask, default_mask
+
+def get_encoding_sizes(metadata, symbols, codes, mirror_mask, default_mask, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ 
+  Returns {encoding function: number of bits including the selector}, leaving out encodings that can't be used. 
+  """
+  encoding_dict = get_selectors(codebook_id)[0]
+  sizes = {}
+  # Keys are added in ENCODING_ORDER. 
+  if encode_board_to_opening_dictionary in encoding_dict:
+    sizes[encode_board_to_opening_dictionary] = opening_dictionary_size(metadata, symbols, codebook_id)
+  sizes[encode_board_to_huffman] = huffman_size(metadata, codes)
+  sizes[encode_board_to_huffman_symmetry] = huffman_symmetry_size(metadata, codes, mirror_mask)
+  sizes[encode_board_to_huffman_default] = huffman_default_size(metadata, codes, default_mask)
+  sizes[encode_board_to_huffman_piececentric] = huffman_piececentric_size(metadata, symbols, codebook_id)
+  if encode_board_to_range_coded in encoding_dict:
+    # Unlike the others, the arithmetic coded size is only known by running the coder. 
+    sizes[encode_board_to_range_coded] = range_coded_size(metadata, symbols, codebook_id)
+  return {encode_fn: size + encoding_dict[encode_fn][1] for encode_fn, size in sizes.items() if size is not None}
+
+def write_huffman_best_opt(metadata, symbols, codes, mirror_mask, default_mask, writer=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Writes the smallest encoding from the output of analyse_board. Returns a BitWriter. """
+  if writer is None:
+    writer = BitWriter()
+  enabled = instrumentation.ENABLED
+  if enabled:
+    start = perf_counter()
+  sizes = get_encoding_sizes(metadata, symbols, codes, mirror_mask, default_mask, codebook_id)
+  # min() keeps the first of equally sized encodings, in ENCODING_ORDER. 
+  best_encode_fn = min(sizes, key=sizes.get)
+  if enabled:
+    instrumentation.record("best.sizes", start)
+    instrumentation.increment("best.wins." + ENCODING_NAMES[best_encode_fn])
+    start = perf_counter()
+    write_best_encoding(best_encode_fn, metadata, symbols, codes, mirror_mask, default_mask, writer, codebook_id)
+    instrumentation.record("best.write." + ENCODING_NAMES[best_encode_fn], start)
+    return writer
+  return write_best_encoding(best_encode_fn, metadata, symbols, codes, mirror_mask, default_mask, writer, codebook_id)
+
+def write_best_encoding(best_encode_fn, metadata, symbols, codes, mirror_mask, default_mask, writer, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Writes the selector and encoding of best_encode_fn. Returns writer. """
+  writer.write_code(get_selectors(codebook_id)[0][best_encode_fn])
+  if best_encode_fn is encode_board_to_huffman:
+    return write_huffman(metadata, codes, writer)
+  if best_encode_fn is encode_board_to_huffman_symmetry:
+    return write_huffman_symmetry(metadata, codes, mirror_mask, writer)
+  if best_encode_fn is encode_board_to_huffman_default:
+    return write_huffman_default(metadata, codes, default_mask, writer)
+  if best_encode_fn is encode_board_to_huffman_piececentric:
+    return write_huffman_piececentric(metadata, symbols, writer, codebook_id)
+  if best_encode_fn is encode_board_to_opening_dictionary:
+    return write_opening_dictionary(metadata, symbols, writer, codebook_id)
+  return write_range_coded(metadata, symbols, writer, codebook_id)
+
+def encode_boards_to_huffman_best_opt(boards, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Encodes every board with encode_board_to_huffman_best_opt. Returns a list of BitWriters. """
+  return [write_huffman_best_opt(*analyse_board(board), codebook_id=codebook_id) for board in boards]
+
+def best_encode_fn_from_list(board, encoding_list, encoding_dict):
+  """
+  Returns the best encoding from the list. 
+  """
+  return min(encoding_list, key=lambda encoding : len(encoding(board)) + encoding_dict[encoding][1])
+
+def read_board_from_huffman_best_opt(reader, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Reads an encoding from encode_board_to_huffman_best_opt. Returns (metadata, symbols). """
+  read_fn = read_symbol(reader, get_selectors(codebook_id)[1])
+  if read_fn in CODEBOOK_READ_FNS:
+    return read_fn(reader, codebook_id)
+  return read_fn(reader)
+
+def decode_board_from_huffman_best_opt(bits, length=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ 
+  Decodes bits (see bitstream.as_reader) from encode_board_to_huffman_best_opt. 
+  Returns a chess.Board. 
+  """
+  metadata, symbols = read_board_from_huffman_best_opt(as_reader(bits, length), codebook_id)
+  return board_from_symbols(symbols, metadata)
+
+def decode_boards_from_huffman_best_opt(encodings, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Decodes every (bytes, number of bits) from encode_board_to_huffman_best_opt. Returns a list of chess.Boards. """
+  boards = []
+  for data, length in encodings:
+    metadata, symbols = read_board_from_huffman_best_opt(as_reader(data, length), codebook_id)
+    boards.append(board_from_symbols(symbols, metadata))
+  return boards
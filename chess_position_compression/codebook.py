@@ -0,0 +1,196 @@
+
+"""
+Huffman code training and versioned codebook files.
+Codes are built with a heap in O(n log n), optionally limited to a maximum length, and assigned canonically.
+A codebook is a set of named code tables saved as <id>.json in the codebook directory, so the encoders and
+decoders can load tables by id instead of using hard-coded dicts. Codebook 0 is the tables hard-coded in the
+scheme modules. The codebook directory is $CHESS_CODEBOOK_PATH, or else ~/.chess_position_compression/codebooks;
+training and loading both use it, and set_codebook_directory changes it for a running process.
+"""
+
+import heapq
+import json
+import os
+
+CODEBOOK_FORMAT = "chess-position-compression-codebook"
+CODEBOOK_VERSION = 1
+BUILTIN_CODEBOOK_ID = 0
+CODEBOOK_PATH_VARIABLE = "CHESS_CODEBOOK_PATH"
+DEFAULT_CODEBOOK_DIRECTORY = os.path.join(os.path.expanduser("~"), ".chess_position_compression", "codebooks")
+DEFAULT_MAX_LENGTH = 16
+
+def huffman_code_lengths(freqs):
+  """
+  Returns {symbol: code length} of a Huffman code for {symbol: frequency}.
+  Ties are broken by the order of freqs, so the result is deterministic.
+  """
+  if len(freqs) == 1:
+    return {symbol: 1 for symbol in freqs}
+  # Heap items are (frequency, tie breaker, symbols under the node).
+  heap = [(freq, index, [symbol]) for index, (symbol, freq) in enumerate(freqs.items())]
+  heapq.heapify(heap)
+  lengths = {symbol: 0 for symbol in freqs}
+  tie_breaker = len(heap)
+  while len(heap) > 1:
+    freq1, _, symbols1 = heapq.heappop(heap)
+    freq2, _, symbols2 = heapq.heappop(heap)
+    # Every symbol under the merged node gets one bit longer.
+    for symbol in symbols1:
+      lengths[symbol] += 1
+    for symbol in symbols2:
+      lengths[symbol] += 1
+    # Merging the smaller list into the larger one keeps the total work O(n log n).
+    if len(symbols1) < len(symbols2):
+      symbols1, symbols2 = symbols2, symbols1
+    symbols1.extend(symbols2)
+    heapq.heappush(heap, (freq1 + freq2, tie_breaker, symbols1))
+    tie_breaker += 1
+  return lengths
+
+def limit_code_lengths(lengths, max_length):
+  """
+  Returns {symbol: code length} with no code longer than max_length, still satisfying the Kraft inequality.
+  Long codes are shortened to max_length, then the deepest codes shorter than max_length are lengthened until
+  the code is valid again, then any slack is given back to the shortest codes.
+  """
+  if len(lengths) > 1 << max_length:
+    raise ValueError("Can't fit {} symbols in codes of at most {} bits.".format(len(lengths), max_length))
+  lengths = {symbol: min(length, max_length) for symbol, length in lengths.items()}
+  capacity = 1 << max_length
+  used = sum([1 << (max_length - length) for length in lengths.values()])
+  # Symbols from shortest to longest code, in a stable order.
+  order = sorted(lengths, key=lambda symbol: lengths[symbol])
+  while used > capacity:
+    symbol = max((symbol for symbol in order if lengths[symbol] < max_length), key=lambda symbol: lengths[symbol])
+    used -= 1 << (max_length - lengths[symbol] - 1)
+    lengths[symbol] += 1
+  for symbol in sorted(lengths, key=lambda symbol: lengths[symbol]):
+    while lengths[symbol] > 1 and used + (1 << (max_length - lengths[symbol])) <= capacity:
+      used += 1 << (max_length - lengths[symbol])
+      lengths[symbol] -= 1
+  return lengths
+
+def canonical_codes(lengths):
+  """
+  Returns {symbol: code string} of the canonical code with the given lengths.
+  Codes are assigned in order of length, then of the order of lengths.
+  """
+  order = {symbol: index for index, symbol in enumerate(lengths)}
+  codes = {}
+  code = 0
+  previous_length = 0
+  for symbol in sorted(lengths, key=lambda symbol: (lengths[symbol], order[symbol])):
+    code <<= lengths[symbol] - previous_length
+    previous_length = lengths[symbol]
+    codes[symbol] = format(code, "0{}b".format(previous_length))
+    code += 1
+  return codes
+
+def train_code(freqs, max_length=None):
+  """ Returns {symbol: code string} of a canonical Huffman code for {symbol: frequency}. """
+  lengths = huffman_code_lengths(freqs)
+  if max_length is not None:
+    lengths = limit_code_lengths(lengths, max_length)
+  return canonical_codes(lengths)
+
+def get_codebook_directory():
+  """ Returns the directory of the codebook files: $CHESS_CODEBOOK_PATH, or else DEFAULT_CODEBOOK_DIRECTORY. """
+  return os.environ.get(CODEBOOK_PATH_VARIABLE) or DEFAULT_CODEBOOK_DIRECTORY
+
+def set_codebook_directory(directory):
+  """
+  Sets the codebook directory ($CHESS_CODEBOOK_PATH, so worker processes use it too), or the default if None,
+  and drops every table loaded from the previous one.
+  """
+  if directory is None:
+    os.environ.pop(CODEBOOK_PATH_VARIABLE, None)
+  else:
+    os.environ[CODEBOOK_PATH_VARIABLE] = directory
+  LOADED_CODEBOOKS.clear()
+  for cache in CODEBOOK_CACHES:
+    for codebook_id in [codebook_id for codebook_id in cache if codebook_id != BUILTIN_CODEBOOK_ID]:
+      del cache[codebook_id]
+
+def codebook_path(codebook_id):
+  return os.path.join(get_codebook_directory(), "{}.json".format(codebook_id))
+
+def save_codebook(codebook_id, tables, overwrite=False):
+  """
+  Saves {table name: {symbol: code string}} as codebook codebook_id.
+  Symbols are kept as ints or strings, as given.
+  Encodings only record the codebook id, so replacing a codebook makes everything encoded with it decode wrongly.
+  An existing codebook is therefore only replaced with overwrite=True.
+  """
+  if codebook_id == BUILTIN_CODEBOOK_ID:
+    raise ValueError("Codebook {} is the built-in codebook.".format(BUILTIN_CODEBOOK_ID))
+  path = codebook_path(codebook_id)
+  if not overwrite and os.path.exists(path):
+    raise ValueError("Codebook {} already exists; pass overwrite=True to replace it.".format(codebook_id))
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  contents = {
+    "format": CODEBOOK_FORMAT,
+    "version": CODEBOOK_VERSION,
+    "id": codebook_id,
+    "tables": {name: [[symbol, code] for symbol, code in table.items()] for name, table in tables.items()}
+  }
+  with open(path, "w") as f:
+    json.dump(contents, f, indent=1)
+  LOADED_CODEBOOKS.pop(path, None)
+  for cache in CODEBOOK_CACHES:
+    cache.pop(codebook_id, None)
+  return path
+
+def extend_codebook(base_codebook_id, codebook_id, tables):
+  """
+  Saves the tables of codebook base_codebook_id plus tables (adding or replacing them) as the new codebook codebook_id.
+  Returns the path. Tables are never added to an existing codebook: the best-of selector codes depend on which
+  tables a codebook holds, so that would change how everything already encoded with it is read.
+  """
+  existing = {} if base_codebook_id == BUILTIN_CODEBOOK_ID else load_codebook(base_codebook_id)
+  return save_codebook(codebook_id, dict(existing, **tables))
+
+# Codebook path -> tables, so each codebook file is only read once.
+LOADED_CODEBOOKS = {}
+
+# Codebook id -> tables built from a codebook, one dict per scheme module (see register_codebook_cache).
+CODEBOOK_CACHES = []
+
+def register_codebook_cache(cache):
+  """ Registers a dict of codebook id -> tables built from the codebook, so save_codebook drops the saved id. Returns the dict. """
+  CODEBOOK_CACHES.append(cache)
+  return cache
+
+def load_codebook(codebook_id):
+  """ Returns {table name: {symbol: code string}} of a codebook saved with save_codebook. """
+  key = codebook_path(codebook_id)
+  if key not in LOADED_CODEBOOKS:
+    with open(key) as f:
+      contents = json.load(f)
+    if contents.get("format") != CODEBOOK_FORMAT or contents.get("version") != CODEBOOK_VERSION:
+      raise ValueError("Codebook {} has an unsupported format.".format(codebook_id))
+    LOADED_CODEBOOKS[key] = {name: {symbol: code for symbol, code in table} for name, table in contents["tables"].items()}
+  return LOADED_CODEBOOKS[key]
+
+def count_piececentric_symbols(boards):
+  """
+  Counts what the piece-centric scheme encodes.
+  Returns (square difference frequencies, piece frequencies, start square frequencies).
+  Every possible symbol gets a count of at least one, so any board can be encoded.
+  """
+  from .corpus_statistics import collect_board_statistics
+  return collect_board_statistics(boards).piececentric_frequencies()
+
+def train_piececentric_codebook(boards, codebook_id, max_length=DEFAULT_MAX_LENGTH, overwrite=False):
+  """ Trains the piece-centric tables on boards and saves them as codebook codebook_id (see save_codebook). Returns the path. """
+  square_difs, pieces, start_squares = count_piececentric_symbols(boards)
+  return save_codebook(codebook_id, {
+    "square_difs": train_code(square_difs, max_length),
+    "piece_codes": train_code(pieces, max_length),
+    "start_square_codes": train_code(start_squares, max_length)
+  }, overwrite)
+
+if __name__ == "__main__":
+  import sys
+  from .load_games import iter_positions
+  codebook_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+  print("Saved", train_piececentric_codebook(iter_positions(100000, factor=10), codebook_id))
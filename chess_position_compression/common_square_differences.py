@@ -0,0 +1,215 @@
+
+"""
+Script for sampling games and finding the most common differences in distance between 
+occupied squares. 
+E.g., with a board of 
+0 0 0 
+0 1 0 
+0 0 1, 
+there is only one difference, which is 4. 
+This will be used for Huffman coding the deltas. 
+The statistics are counted with corpus_statistics.CorpusStatistics; the counts found so far are kept below as 
+PIECE_STATS and START_SQUARE_FREQS. Nothing runs on import; run the module to print them and their codes. 
+"""
+
+import chess 
+from .codebook import train_code 
+
+def get_differences(board): 
+  """ Returns a list of differences between occupied squares. """ 
+  squares = [square for square in chess.SQUARES if board.piece_at(square) is not None]
+  return [abs(squares[i] - squares[i + 1]) for i in range(len(squares) - 1)]
+
+def get_differences_dict(board):
+  """ Returns a dict of differences between occupied squares. """ 
+  difs_list = get_differences(board)
+  difs_dict = {}
+  for dif in difs_list:
+    if dif not in difs_dict:
+      difs_dict[dif] = 0
+    difs_dict[dif] += 1
+  return difs_dict 
+
+def get_differences_dict_from_board_list(board_list):
+  difs_dict = {} 
+  for board in board_list:
+    tmp_difs_dict = get_differences_dict(board)
+    for dif in tmp_difs_dict:
+      difs_dict[dif] = difs_dict.get(dif, 0) + tmp_difs_dict[dif]
+  return sorted(difs_dict.items(), key=lambda item: item[1], reverse=True)
+
+def huffman_code_difs(dif_freq_dict, verbose=False, defaults=True, max_length=None):
+  """
+  Returns a dictionary of Huffman codes for the differences. 
+  Differences are given in the form: {dif: freq, ...}, where dif is an int and freq is an int. 
+  First, for any int in the range 1..=63, if it's not in the dict, it's added with a frequency of 1. 
+  This is used to ensure that *any* possible encoding is possible. (2 kings are guaranteed to be on the board.) 
+  The codes are canonical Huffman codes built with a heap (see codebook.train_code), optionally limited to max_length bits. 
+  """
+  dif_freq_dict = dict(dif_freq_dict)
+  # Ensuring that all possible differences are in the dict. 
+  if defaults:
+    for i in range(1, 64):
+      if i not in dif_freq_dict:
+        dif_freq_dict[i] = 1
+
+  if verbose:
+    print("Dif freq dict:")
+    for key, value in dif_freq_dict.items():
+      print("{}: {}".format(key, value))
+
+  key_codes = train_code(dif_freq_dict, max_length)
+    
+  if verbose:
+    print("Key codes:")
+    for key, value in key_codes.items():
+      print("{}: {}".format(key, value))
+  
+  return sorted(key_codes.items(), key=lambda item: item[0])
+
+PIECE_STATS = {
+  "R": 3197, 
+  "p": 15022, 
+  "B": 1441, 
+  "K": 6330, 
+  "b": 1347, 
+  "k": 6330, 
+  "P": 14610, 
+  "r": 3345, 
+  "N": 865, 
+  "q": 984, 
+  "n": 932, 
+  "Q": 1058 
+}
+
+PIECE_CODES_U12 = {
+  "R": "0001",
+  "p": "11",
+  "B": "00001",
+  "K": "001",
+  "b": "00000",
+  "k": "010",
+  "P": "10",
+  "r": "0110",
+  "N": "011100",
+  "q": "011110",
+  "n": "011101",
+  "Q": "011111"
+}
+
+START_SQUARE_FREQS = {
+  8: 871,
+  14: 448,
+  13: 410,
+  6: 390,
+  9: 361,
+  4: 352,
+  0: 336,
+  2: 297,
+  10: 292,
+  1: 284,
+  5: 283,
+  16: 281,
+  3: 267,
+  21: 265,
+  11: 248,
+  12: 244,
+  7: 241,
+  15: 219,
+  22: 211,
+  17: 204,
+  18: 159,
+  20: 152,
+  19: 128,
+  24: 108,
+  25: 105,
+  23: 85,
+  27: 61,
+  26: 60,
+  28: 48,
+  30: 48,
+  29: 48,
+  34: 30,
+  33: 22,
+  36: 20,
+  32: 19,
+  31: 16,
+  35: 15,
+  37: 11,
+  43: 10,
+  45: 7,
+  38: 6,
+  44: 4,
+  41: 4,
+  42: 2,
+  40: 2,
+  39: 1,
+  47: 1
+}
+
+def sample_positions(n=50000, factor=10, max_pieces=12):
+  """ Returns the statistics of n unique random positions, keeping those with max_pieces pieces or fewer. """
+  from .load_games import load_random_positions
+  from .corpus_statistics import collect_board_statistics
+  positions = load_random_positions(n, factor=factor, unique=True)
+  statistics = collect_board_statistics(positions, max_pieces=max_pieces)
+  print("Proportion of positions with {} pieces or fewer: {}".format(max_pieces, statistics.positions / n))
+  return statistics
+
+def print_difference_stats(statistics, rows=20):
+  """ Prints the most common differences between occupied squares, with cumulative counts and percentages. """
+  num_difs = sorted([(dif, int(count)) for dif, count in enumerate(statistics.gaps) if count], key=lambda item: item[1], reverse=True)
+  total_difs = sum([count for _, count in num_difs])
+  print("Differences between occupied squares:")
+  for dif, count in num_difs[0:rows]:
+    print("{:3} | {}".format(dif, count))
+
+  print("Cumulative differences between occupied squares:")
+  curr_cum = 0
+  for dif, count in num_difs[0:rows]:
+    curr_cum += count
+    print("{:3} | {}".format(dif, curr_cum))
+
+  print("Non-cumulative percentages:")
+  for dif, count in num_difs[0:rows]:
+    print("{:3} | {}".format(dif, count / total_difs))
+  return dict(num_difs)
+
+def print_code_costs(num_difs):
+  """ Prints the bits needed for the differences with Huffman codes, against six bits each. """
+  res = huffman_code_difs(num_difs, verbose=True)
+  hc_digits_reqed = sum([len(code) * num_difs.get(dif, 0) for dif, code in res])
+  total_difs = sum(num_difs.values())
+  print("Huffman coding digits required: {}".format(hc_digits_reqed))
+  print("Six bits required: {}".format(6 * total_difs))
+  print("Total difs: {}".format(total_difs))
+  print("HC/total avg: {}".format(hc_digits_reqed / total_difs))
+
+def print_piece_stats(piece_stats=PIECE_STATS):
+  """ Prints the count of each piece relative to the number of black kings, and the pieces' Huffman codes. """
+  for piece, count in sorted(piece_stats.items(), key=lambda item: item[1], reverse=True):
+    print("{}: {}".format(piece, count / piece_stats['k']))
+  print(huffman_code_difs(piece_stats, verbose=True, defaults=False))
+
+def print_start_square_codes(start_square_freqs=START_SQUARE_FREQS):
+  """ Prints Huffman codes for the first occupied square. """
+  start_square_freqs = dict(start_square_freqs)
+  for i in range(0, 62):
+    if i not in start_square_freqs:
+      start_square_freqs[i] = 0
+  print("Start square huffman codes:")
+  ss_codes = huffman_code_difs(start_square_freqs, verbose=True, defaults=False)
+  for square, code in sorted(ss_codes, key=lambda item: item[0]):
+    print("{}: {}".format(square, code))
+
+if __name__ == "__main__":
+  import sys
+  if len(sys.argv) > 1 and sys.argv[1] == "sample":
+    # Recounts the statistics from random positions with 12 pieces or fewer. 
+    statistics = sample_positions()
+    print_code_costs(print_difference_stats(statistics))
+    print_piece_stats(statistics.to_dict()["pieces"])
+    print_start_square_codes({square: int(count) for square, count in enumerate(statistics.start_squares) if count})
+  else:
+    print_piece_stats()
+    print_start_square_codes()
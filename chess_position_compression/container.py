@@ -0,0 +1,180 @@
+
+"""
+On-disk container for encoded positions.
+A container is two files:
+  <path>      [header] [encoding 0] [encoding 1] ...
+              The header is 16 bytes: magic "CPCF", format version (u8), scheme id (u8), codebook id (u16), 8 reserved bytes.
+              Each encoding is packed into whole bytes (see bitstream.BitWriter.to_bytes).
+  <path>.idx  One fixed-width entry per position: byte offset of the encoding in <path> (u64) and its number of bits (u16).
+Optionally, <path>.mat holds every position's material signature (see material.py).
+Both files are only ever appended to, and are read through mmap, so any position can be read by id
+without reading the rest of the file.
+"""
+
+import mmap
+import os
+import struct
+from .bitstream import BitReader
+from .registry import get_scheme
+
+MAGIC = b"CPCF"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH8x")
+INDEX_ENTRY = struct.Struct("<QH")
+
+def index_path(path):
+  return path + ".idx"
+
+def read_header(path):
+  """ Returns (version, scheme id, codebook id) of the container at path. """
+  with open(path, "rb") as data:
+    magic, version, scheme_id, codebook_id = HEADER.unpack(data.read(HEADER.size))
+  if magic != MAGIC:
+    raise ValueError("{} is not a position container.".format(path))
+  if version != VERSION:
+    raise ValueError("Unsupported container version {}.".format(version))
+  return version, scheme_id, codebook_id
+
+class ContainerWriter:
+  """
+  Appends encodings to a container, creating it if it doesn't exist.
+  When appending to an existing container, the scheme and codebook must match its header.
+  With material=True, a material signature sidecar (see material.py) is kept alongside.
+  """
+
+  def __init__(self, path, scheme="best", codebook_id=0, material=False):
+    self.path = path
+    self.scheme = get_scheme(scheme)
+    if self.scheme.scheme_id is None:
+      raise ValueError("Scheme {} can't be stored in a container.".format(scheme))
+    self.scheme_id = self.scheme.scheme_id
+    self.codebook_id = codebook_id
+    if os.path.exists(path):
+      _, scheme_id, existing_codebook_id = read_header(path)
+      if (scheme_id, existing_codebook_id) != (self.scheme_id, codebook_id):
+        raise ValueError("{} holds scheme {} with codebook {}.".format(path, get_scheme(scheme_id).name, existing_codebook_id))
+      self.data = open(path, "ab")
+    else:
+      self.data = open(path, "wb")
+      self.data.write(HEADER.pack(MAGIC, VERSION, self.scheme_id, codebook_id))
+    self.index = open(index_path(path), "ab")
+    self.offset = self.data.tell()
+    self.count = self.index.tell() // INDEX_ENTRY.size
+    self.material = None
+    if material:
+      from .material import MaterialWriter, count_signatures
+      # Checked before opening the sidecar, so a failed check doesn't leave an empty one behind.
+      signatures = count_signatures(path)
+      if signatures != self.count:
+        self.close()
+        raise ValueError("{} has {} material signatures for {} positions.".format(path, signatures, self.count))
+      self.material = MaterialWriter(path)
+
+  def append(self, bits, signature=None):
+    """ Appends a BitWriter encoded with this container's scheme. Returns the position id. """
+    return self.append_encoding(bits.to_bytes(), len(bits), signature)
+
+  def append_encoding(self, encoding, length, signature=None):
+    """
+    Appends packed encoding bytes holding length bits, and the position's material signature
+    (see material.material_signature) if the container keeps them. Returns the position id.
+    """
+    if self.material is not None:
+      if signature is None:
+        raise ValueError("{} keeps material signatures, so appending needs the signature.".format(self.path))
+      self.material.append_signature(signature)
+    self.data.write(encoding)
+    self.index.write(INDEX_ENTRY.pack(self.offset, length))
+    self.offset += len(encoding)
+    self.count += 1
+    return self.count - 1
+
+  def append_board(self, board):
+    """ Encodes and appends a chess.Board. Returns the position id. """
+    signature = None
+    if self.material is not None:
+      from .material import material_signature
+      signature = material_signature(board)
+    return self.append(self.scheme.encode_board(board, self.codebook_id), signature)
+
+  def flush(self):
+    self.data.flush()
+    self.index.flush()
+    if self.material is not None:
+      self.material.flush()
+
+  def close(self):
+    self.data.close()
+    self.index.close()
+    if self.material is not None:
+      self.material.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+def map_file(path):
+  """ Returns a read only mmap of the file, or empty bytes for an empty file (which can't be mapped). """
+  with open(path, "rb") as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class ContainerReader:
+  """ Random access to the positions in a container by position id. """
+
+  def __init__(self, path):
+    _, self.scheme_id, self.codebook_id = read_header(path)
+    self.scheme = get_scheme(self.scheme_id).name
+    self.data = map_file(path)
+    self.index = map_file(index_path(path))
+
+  def __len__(self):
+    return len(self.index) // INDEX_ENTRY.size
+
+  def get_bits(self, position_id):
+    """ Returns (encoding bytes, number of bits) of the position. """
+    if not 0 <= position_id < len(self):
+      raise IndexError("Position id {} out of range.".format(position_id))
+    offset, length = INDEX_ENTRY.unpack_from(self.index, position_id * INDEX_ENTRY.size)
+    return self.data[offset:offset + (length + 7) // 8], length
+
+  def get_reader(self, position_id):
+    return BitReader(*self.get_bits(position_id))
+
+  def get_board(self, position_id):
+    """ Decodes the position into a chess.Board. """
+    return get_scheme(self.scheme_id).decode_bits(*self.get_bits(position_id), codebook_id=self.codebook_id)
+
+  def __getitem__(self, position_id):
+    return self.get_board(position_id)
+
+  def __iter__(self):
+    for position_id in range(len(self)):
+      yield self.get_board(position_id)
+
+  def close(self):
+    for mapped in (self.data, self.index):
+      if isinstance(mapped, mmap.mmap):
+        mapped.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+if __name__ == "__main__":
+  import chess
+  import sys
+  path = sys.argv[1] if len(sys.argv) > 1 else "positions.cpc"
+  board = chess.Board()
+  with ContainerWriter(path) as writer:
+    for move in ["e2e4", "e7e5", "g1f3"]:
+      board.push_uci(move)
+      print("Appended", writer.append_board(board))
+  with ContainerReader(path) as reader:
+    print(len(reader), "positions")
+    print(reader[len(reader) - 1])
@@ -0,0 +1,171 @@
+
+"""
+Vectorised corpus statistics for training the code tables.
+Positions are given as an (N, 12) uint64 array of bitboards, one column per piece in BITBOARD_SYMBOLS order
+(see boards_to_bitboards), and every statistic is gathered with NumPy in one pass over each chunk:
+  gaps          histogram of the differences between consecutive occupied squares (what the piece-centric
+                scheme codes with its square difference table)
+  start_squares histogram of the first occupied square
+  pieces        count of every piece symbol
+  piece_counts  histogram of the number of pieces on the board
+CorpusStatistics results can be merged, so shards (files, processes, machines) can be counted separately and
+combined, and they can be saved as JSON.
+"""
+
+import json
+import numpy as np
+import chess
+
+# Piece symbol of each bitboard column, in the same order as huffman_batch.SYMBOLS.
+BITBOARD_SYMBOLS = ["P", "N", "B", "R", "Q", "K", "p", "n", "b", "r", "q", "k"]
+BITBOARD_PIECES = [(chess.Piece.from_symbol(symbol).piece_type, chess.Piece.from_symbol(symbol).color) for symbol in BITBOARD_SYMBOLS]
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+def boards_to_bitboards(boards):
+  """ Returns the (N, 12) uint64 bitboard array of chess.Boards. """
+  boards = list(boards)
+  bitboards = np.zeros((len(boards), len(BITBOARD_PIECES)), dtype=np.uint64)
+  for index, board in enumerate(boards):
+    bitboards[index] = [board.pieces_mask(piece_type, color) for piece_type, color in BITBOARD_PIECES]
+  return bitboards
+
+def unpack_squares(bitboards):
+  """ Returns an (N, 64) array of the bits of N bitboards, indexed by square. """
+  as_bytes = np.ascontiguousarray(bitboards, dtype="<u8").view(np.uint8).reshape(len(bitboards), 8)
+  return np.unpackbits(as_bytes, axis=1, bitorder="little")
+
+def count_bits(bitboards):
+  """ Returns the number of set bits of every bitboard. """
+  if hasattr(np, "bitwise_count"):
+    return np.bitwise_count(bitboards)
+  return unpack_squares(bitboards.reshape(-1)).sum(axis=1).reshape(bitboards.shape)
+
+class CorpusStatistics:
+  """ Mergeable statistics of a set of positions. """
+
+  def __init__(self):
+    self.positions = 0
+    self.gaps = np.zeros(64, dtype=np.int64)
+    self.start_squares = np.zeros(64, dtype=np.int64)
+    self.pieces = np.zeros(len(BITBOARD_SYMBOLS), dtype=np.int64)
+    self.piece_counts = np.zeros(65, dtype=np.int64)
+
+  def update(self, bitboards, max_pieces=None):
+    """
+    Adds (N, 12) bitboards, optionally only the positions with at most max_pieces pieces.
+    Returns self.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    occupancy = np.bitwise_or.reduce(bitboards, axis=1)
+    piece_counts = count_bits(occupancy).astype(np.int64)
+    if max_pieces is not None:
+      keep = piece_counts <= max_pieces
+      bitboards, occupancy, piece_counts = bitboards[keep], occupancy[keep], piece_counts[keep]
+    occupied = unpack_squares(occupancy)
+    self.positions += len(occupied)
+    self.piece_counts += np.bincount(piece_counts, minlength=65)
+    self.pieces += count_bits(bitboards).sum(axis=0, dtype=np.int64)
+    nonempty = piece_counts > 0
+    self.start_squares += np.bincount(occupied[nonempty].argmax(axis=1), minlength=64)
+    # Occupied squares in row-major order, so consecutive entries of the same row are consecutive pieces.
+    rows, columns = np.nonzero(occupied)
+    same_row = rows[1:] == rows[:-1]
+    self.gaps += np.bincount((columns[1:] - columns[:-1])[same_row], minlength=64)
+    return self
+
+  def merge(self, other):
+    """ Adds the counts of other. Returns self. """
+    self.positions += other.positions
+    self.gaps += other.gaps
+    self.start_squares += other.start_squares
+    self.pieces += other.pieces
+    self.piece_counts += other.piece_counts
+    return self
+
+  def __add__(self, other):
+    return CorpusStatistics().merge(self).merge(other)
+
+  def __eq__(self, other):
+    return self.to_dict() == other.to_dict()
+
+  def piececentric_frequencies(self):
+    """
+    Returns (square difference frequencies, piece frequencies, start square frequencies) as
+    codebook.count_piececentric_symbols does, every possible symbol counted at least once.
+    """
+    square_difs = {dif: int(self.gaps[dif]) + 1 for dif in range(1, 64)}
+    pieces = {symbol: int(count) + 1 for symbol, count in zip(BITBOARD_SYMBOLS, self.pieces)}
+    start_squares = {square: int(self.start_squares[square]) + 1 for square in chess.SQUARES}
+    return square_difs, pieces, start_squares
+
+  def to_dict(self):
+    return {
+      "positions": self.positions,
+      "gaps": self.gaps.tolist(),
+      "start_squares": self.start_squares.tolist(),
+      "pieces": dict(zip(BITBOARD_SYMBOLS, self.pieces.tolist())),
+      "piece_counts": self.piece_counts.tolist()
+    }
+
+  @classmethod
+  def from_dict(cls, contents):
+    statistics = cls()
+    statistics.positions = contents["positions"]
+    statistics.gaps[:] = contents["gaps"]
+    statistics.start_squares[:] = contents["start_squares"]
+    statistics.pieces[:] = [contents["pieces"][symbol] for symbol in BITBOARD_SYMBOLS]
+    statistics.piece_counts[:] = contents["piece_counts"]
+    return statistics
+
+  def save(self, path):
+    with open(path, "w") as f:
+      json.dump(self.to_dict(), f)
+
+  @classmethod
+  def load(cls, path):
+    with open(path) as f:
+      return cls.from_dict(json.load(f))
+
+def collect_statistics(bitboards, chunk_size=DEFAULT_CHUNK_SIZE, max_pieces=None):
+  """
+  Returns the CorpusStatistics of an (N, 12) bitboard array, e.g. one memory-mapped with
+  np.load(path, mmap_mode="r"), counted chunk by chunk so memory use stays bounded.
+  """
+  statistics = CorpusStatistics()
+  for start in range(0, len(bitboards), chunk_size):
+    statistics.update(bitboards[start:start + chunk_size], max_pieces)
+  return statistics
+
+def collect_board_statistics(boards, chunk_size=DEFAULT_CHUNK_SIZE, max_pieces=None):
+  """ Returns the CorpusStatistics of an iterable of chess.Boards, converting them chunk by chunk. """
+  statistics = CorpusStatistics()
+  chunk = []
+  for board in boards:
+    chunk.append(board)
+    if len(chunk) == chunk_size:
+      statistics.update(boards_to_bitboards(chunk), max_pieces)
+      chunk = []
+  if chunk:
+    statistics.update(boards_to_bitboards(chunk), max_pieces)
+  return statistics
+
+def collect_file_statistics(paths, chunk_size=DEFAULT_CHUNK_SIZE, max_pieces=None, processes=None):
+  """
+  Returns the merged CorpusStatistics of .npy files of (N, 12) bitboards, one file per process.
+  """
+  from multiprocessing import Pool
+  with Pool(processes) as pool:
+    shards = pool.starmap(collect_npy_statistics, [(path, chunk_size, max_pieces) for path in paths])
+  return sum(shards, CorpusStatistics())
+
+def collect_npy_statistics(path, chunk_size=DEFAULT_CHUNK_SIZE, max_pieces=None):
+  return collect_statistics(np.load(path, mmap_mode="r"), chunk_size, max_pieces)
+
+if __name__ == "__main__":
+  import sys
+  from .load_games import iter_positions
+  statistics = collect_board_statistics(iter_positions(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
+  print("Positions:", statistics.positions)
+  print("Pieces:", statistics.to_dict()["pieces"])
+  print("Most common gaps:", np.argsort(statistics.gaps)[::-1][:10].tolist())
+  print("Most common start squares:", np.argsort(statistics.start_squares)[::-1][:10].tolist())
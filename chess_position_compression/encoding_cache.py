@@ -0,0 +1,141 @@
+
+"""
+Bounded LRU memoisation of encodings and decodings.
+Encodings are cached by the board's Zobrist hash (see utility.zobrist_key) plus its metadata (turn, castling
+rights and legal en passant square). Like position_store.PositionStore, a hash match is checked against the
+cached board's bitboards, so a hash collision is a miss rather than a wrong encoding.
+Decodings are cached by the encoding's bytes and number of bits.
+Hits return copies, so callers can modify what they get back.
+"""
+
+from collections import OrderedDict
+import chess
+from . import instrumentation
+from .bitstream import BitWriter, as_reader
+from .utility import zobrist_key
+from .choose_best_huffman_encoding import encode_board_to_huffman_best_opt, decode_board_from_huffman_best_opt
+from .codebook import BUILTIN_CODEBOOK_ID
+
+DEFAULT_MAX_SIZE = 100000
+
+class LRUCache:
+  """ Dict with at most max_size items, evicting the least recently used. Counts hits, misses and evictions. """
+
+  def __init__(self, max_size=DEFAULT_MAX_SIZE, name="cache"):
+    if max_size < 1:
+      raise ValueError("Cache size must be at least 1.")
+    self.max_size = max_size
+    # Name counted under in instrumentation, e.g. "cache.encode.hits".
+    self.name = name
+    self.items = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __len__(self):
+    return len(self.items)
+
+  def get(self, key, default=None, valid=None):
+    """ 
+    Returns the value of key, marking it most recently used, or default. 
+    If given, valid(value) is checked, and an invalid value counts as a miss. 
+    """
+    value = self.items.get(key, default)
+    if value is default or (valid is not None and not valid(value)):
+      self.misses += 1
+      if instrumentation.ENABLED:
+        instrumentation.increment(self.name + ".misses")
+      return default
+    self.items.move_to_end(key)
+    self.hits += 1
+    if instrumentation.ENABLED:
+      instrumentation.increment(self.name + ".hits")
+    return value
+
+  def put(self, key, value):
+    self.items[key] = value
+    self.items.move_to_end(key)
+    if len(self.items) > self.max_size:
+      self.items.popitem(last=False)
+      self.evictions += 1
+
+  def clear(self):
+    self.items.clear()
+
+  def stats(self):
+    """ Returns {"size", "max_size", "hits", "misses", "evictions", "hit_rate"}. """
+    lookups = self.hits + self.misses
+    return {
+      "size": len(self.items),
+      "max_size": self.max_size,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "hit_rate": self.hits / lookups if lookups else 0.0
+    }
+
+def get_board_bitboards(board):
+  return (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings, board.occupied_co[chess.WHITE])
+
+def get_board_key(board):
+  """ Returns (Zobrist hash, turn, castling rights, legal en passant square) of the board. """
+  ep_square = board.ep_square if board.ep_square is not None and board.has_legal_en_passant() else None
+  return (zobrist_key(board), board.turn, board.clean_castling_rights(), ep_square)
+
+class CachedCodec:
+  """
+  Memoised encode and decode, e.g.
+    codec = CachedCodec(max_size=10000)
+    bits = codec.encode(board)
+    board = codec.decode(bits.to_bytes(), len(bits))
+  Defaults to choose_best_huffman_encoding; encode_fn and decode_fn can be any scheme's
+  encode_board_to_* and decode_board_from_* that take codebook_id.
+  """
+
+  def __init__(self, max_size=DEFAULT_MAX_SIZE, encode_fn=encode_board_to_huffman_best_opt,
+               decode_fn=decode_board_from_huffman_best_opt, codebook_id=BUILTIN_CODEBOOK_ID):
+    self.encode_fn = encode_fn
+    self.decode_fn = decode_fn
+    self.codebook_id = codebook_id
+    self.encodings = LRUCache(max_size, "cache.encode")
+    self.boards = LRUCache(max_size, "cache.decode")
+
+  def encode(self, board):
+    """ Returns the encoding of the board as a BitWriter. """
+    key = get_board_key(board)
+    bitboards = get_board_bitboards(board)
+    # A cached board with different bitboards is a Zobrist collision. 
+    cached = self.encodings.get(key, valid=lambda cached: cached[0] == bitboards)
+    if cached is not None:
+      return BitWriter().write(cached[1], cached[2])
+    bits = self.encode_fn(board, codebook_id=self.codebook_id)
+    self.encodings.put(key, (bitboards, bits.value, bits.length))
+    return bits
+
+  def decode(self, bits, length=None):
+    """ Decodes bits (see bitstream.as_reader) to a chess.Board. """
+    reader = as_reader(bits, length)
+    # The bits themselves, without any padding after the encoding. 
+    key = (reader.value >> (reader.total - reader.length), reader.length)
+    board = self.boards.get(key)
+    if board is None:
+      board = self.decode_fn(reader, codebook_id=self.codebook_id)
+      self.boards.put(key, board.copy(stack=False))
+      return board
+    return board.copy(stack=False)
+
+  def clear(self):
+    self.encodings.clear()
+    self.boards.clear()
+
+  def stats(self):
+    """ Returns {"encode": encoding cache stats, "decode": decoding cache stats} (see LRUCache.stats). """
+    return {"encode": self.encodings.stats(), "decode": self.boards.stats()}
+
+if __name__ == "__main__":
+  from .load_games import iter_positions
+  codec = CachedCodec(max_size=10000)
+  for board in iter_positions(20000):
+    bits = codec.encode(board)
+    codec.decode(bits)
+  print(codec.stats())
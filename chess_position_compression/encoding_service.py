@@ -0,0 +1,275 @@
+
+"""
+Local asyncio encode/decode service.
+Requests from all connections are queued and grouped into micro-batches (up to batch_size requests, waiting at
+most max_delay seconds for a batch to fill), which run through the batch paths of choose_best_huffman_encoding
+in a worker thread, so the event loop keeps accepting requests meanwhile.
+The request queue and every connection's queue of unanswered requests are bounded. When they are full, the
+service stops reading from the connection, so clients are slowed down by TCP (or unix socket) backpressure
+instead of the service buffering without limit.
+Protocol, one request per line, answered in order per connection (requests may be pipelined):
+  E <fen>             ->  OK <encoding as hex> <number of bits>
+  D <hex> <bits>      ->  OK <fen>
+  anything else/bad   ->  ERR <message>
+A line longer than the stream limit (64 KiB) is skipped and answered with ERR.
+Usage:
+  python -m chess_position_compression.encoding_service [--host 127.0.0.1] [--port 8765] [--unix path] [--batch-size 64] [--max-delay 0.002]
+"""
+
+import argparse
+import asyncio
+import chess
+from .choose_best_huffman_encoding import encode_boards_to_huffman_best_opt, decode_boards_from_huffman_best_opt
+from .codebook import BUILTIN_CODEBOOK_ID
+
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY = 0.002
+DEFAULT_MAX_QUEUE = 4096
+DEFAULT_MAX_PIPELINE = 256
+
+def encode_fens(fens, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Encodes a batch of FENs. Returns a list of (bytes, number of bits), or the exception for a bad FEN. """
+  results = [None] * len(fens)
+  boards, indices = [], []
+  for index, fen in enumerate(fens):
+    try:
+      boards.append(chess.Board(fen))
+      indices.append(index)
+    except ValueError as e:
+      results[index] = e
+  for index, bits in zip(indices, encode_boards_to_huffman_best_opt(boards, codebook_id)):
+    results[index] = (bits.to_bytes(), len(bits))
+  return results
+
+def decode_encodings(encodings, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Decodes a batch of (bytes, number of bits). Returns a list of FENs, or the exception for a bad encoding. """
+  try:
+    return [board.fen() for board in decode_boards_from_huffman_best_opt(encodings, codebook_id)]
+  except ValueError:
+    # Decode one at a time to find which encodings are bad.
+    results = []
+    for encoding in encodings:
+      try:
+        results.append(decode_boards_from_huffman_best_opt([encoding], codebook_id)[0].fen())
+      except ValueError as e:
+        results.append(e)
+    return results
+
+def run_batch(batch, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Runs a batch of (kind, payload) requests. Returns their results in order. """
+  results = [None] * len(batch)
+  for kind, fn in (("E", encode_fens), ("D", decode_encodings)):
+    indices = [index for index, (request_kind, _) in enumerate(batch) if request_kind == kind]
+    if indices:
+      for index, result in zip(indices, fn([batch[index][1] for index in indices], codebook_id)):
+        results[index] = result
+  return results
+
+def parse_request(line):
+  """ Returns (kind, payload) of a request line. Raises ValueError for a malformed request. """
+  kind, _, rest = line.strip().partition(" ")
+  if kind == "E" and rest:
+    return kind, rest
+  if kind == "D":
+    parts = rest.split()
+    if len(parts) == 2:
+      data, length = bytes.fromhex(parts[0]), int(parts[1])
+      if not 0 <= length <= len(data) * 8:
+        raise ValueError("Bit length {} doesn't fit {} bytes.".format(length, len(data)))
+      return kind, (data, length)
+  raise ValueError("Malformed request.")
+
+def format_response(result):
+  if isinstance(result, Exception):
+    return "ERR {}\n".format(result)
+  if isinstance(result, tuple):
+    return "OK {} {}\n".format(result[0].hex(), result[1])
+  return "OK {}\n".format(result)
+
+def error_future(error):
+  """ Returns a future already holding error, answered as ERR. """
+  future = asyncio.get_running_loop().create_future()
+  future.set_result(error)
+  return future
+
+async def skip_line(reader, consumed):
+  """ Discards the rest of a line over the stream limit, given the bytes of it the LimitOverrunError says are buffered. """
+  try:
+    while True:
+      await reader.readexactly(consumed)
+      try:
+        await reader.readuntil(b"\n")
+        return
+      except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+  except asyncio.IncompleteReadError:
+    pass
+
+class MicroBatcher:
+  """ Queues requests and runs them in batches. """
+
+  def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY, max_queue=DEFAULT_MAX_QUEUE, codebook_id=BUILTIN_CODEBOOK_ID):
+    self.batch_size = batch_size
+    self.max_delay = max_delay
+    self.codebook_id = codebook_id
+    self.queue = asyncio.Queue(max_queue)
+    self.batches = 0
+    self.requests = 0
+
+  async def submit(self, kind, payload):
+    """ Queues a request, waiting while the queue is full. Returns a future of its result. """
+    future = asyncio.get_running_loop().create_future()
+    await self.queue.put((kind, payload, future))
+    return future
+
+  async def next_batch(self):
+    """ Waits for a request, then collects more until the batch is full or max_delay has passed. """
+    batch = [await self.queue.get()]
+    deadline = asyncio.get_running_loop().time() + self.max_delay
+    while len(batch) < self.batch_size:
+      timeout = deadline - asyncio.get_running_loop().time()
+      if timeout <= 0:
+        break
+      try:
+        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+      except asyncio.TimeoutError:
+        break
+    return batch
+
+  async def run(self):
+    loop = asyncio.get_running_loop()
+    while True:
+      batch = await self.next_batch()
+      try:
+        results = await loop.run_in_executor(None, run_batch, [(kind, payload) for kind, payload, _ in batch], self.codebook_id)
+      except Exception as e:
+        results = [e] * len(batch)
+      for (_, _, future), result in zip(batch, results):
+        if not future.cancelled():
+          future.set_result(result)
+      self.batches += 1
+      self.requests += len(batch)
+
+class EncodingService:
+  """ Serves the protocol on connections, through one MicroBatcher. """
+
+  def __init__(self, batcher, max_pipeline=DEFAULT_MAX_PIPELINE):
+    self.batcher = batcher
+    self.max_pipeline = max_pipeline
+
+  async def handle_connection(self, reader, writer):
+    # Futures of the connection's unanswered requests, in order.
+    pending = asyncio.Queue(self.max_pipeline)
+    responder = asyncio.create_task(self.respond(pending, writer))
+    try:
+      while True:
+        try:
+          line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+          # The last line, without a newline.
+          line = e.partial
+        except asyncio.LimitOverrunError as e:
+          await skip_line(reader, e.consumed)
+          await pending.put(error_future(ValueError("Request line too long.")))
+          continue
+        if not line:
+          break
+        try:
+          future = await self.batcher.submit(*parse_request(line.decode()))
+        except ValueError as e:
+          future = error_future(e)
+        await pending.put(future)
+    except ConnectionError:
+      pass
+    finally:
+      await pending.put(None)
+      await responder
+
+  async def respond(self, pending, writer):
+    connected = True
+    while True:
+      future = await pending.get()
+      if future is None:
+        break
+      result = await future
+      # After the client goes away, keep taking results so the reading side never waits on a full queue. 
+      if connected:
+        try:
+          writer.write(format_response(result).encode())
+          await writer.drain()
+        except ConnectionError:
+          connected = False
+    writer.close()
+
+async def start_service(host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, batch_size=DEFAULT_BATCH_SIZE,
+                        max_delay=DEFAULT_MAX_DELAY, max_queue=DEFAULT_MAX_QUEUE, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Starts the service. Returns (asyncio server, batcher task). """
+  batcher = MicroBatcher(batch_size, max_delay, max_queue, codebook_id)
+  service = EncodingService(batcher)
+  if unix_path is not None:
+    server = await asyncio.start_unix_server(service.handle_connection, unix_path)
+  else:
+    server = await asyncio.start_server(service.handle_connection, host, port)
+  return server, asyncio.create_task(batcher.run())
+
+class EncodingClient:
+  """
+  Client of the service, e.g.
+    client = await EncodingClient.connect(port=8765)
+    data, length = await client.encode(fen)
+    fen = await client.decode(data, length)
+  One request at a time; use several clients for concurrency.
+  """
+
+  def __init__(self, reader, writer):
+    self.reader = reader
+    self.writer = writer
+    self.lock = asyncio.Lock()
+
+  @classmethod
+  async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    if unix_path is not None:
+      return cls(*await asyncio.open_unix_connection(unix_path))
+    return cls(*await asyncio.open_connection(host, port))
+
+  async def request(self, line):
+    """ Sends a request line. Returns the response after "OK". Raises ValueError on an error response. """
+    async with self.lock:
+      self.writer.write((line + "\n").encode())
+      await self.writer.drain()
+      response = (await self.reader.readline()).decode().rstrip("\n")
+    status, _, rest = response.partition(" ")
+    if status != "OK":
+      raise ValueError(rest or "Connection closed.")
+    return rest
+
+  async def encode(self, fen):
+    """ Returns (encoding bytes, number of bits) of the FEN. """
+    data, length = (await self.request("E " + fen)).split()
+    return bytes.fromhex(data), int(length)
+
+  async def decode(self, data, length):
+    """ Returns the FEN of an encoding. """
+    return await self.request("D {} {}".format(data.hex(), length))
+
+  async def close(self):
+    self.writer.close()
+    await self.writer.wait_closed()
+
+async def serve(args):
+  server, batcher_task = await start_service(args.host, args.port, args.unix, args.batch_size, args.max_delay, args.max_queue, args.codebook)
+  print("Serving on", args.unix or "{}:{}".format(args.host, args.port))
+  async with server:
+    await asyncio.gather(server.serve_forever(), batcher_task)
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Serves encoding and decoding of positions.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+  parser.add_argument("--unix", default=None, help="Unix socket path, instead of TCP.")
+  parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+  parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY)
+  parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE)
+  parser.add_argument("--codebook", type=int, default=BUILTIN_CODEBOOK_ID)
+  asyncio.run(serve(parser.parse_args()))
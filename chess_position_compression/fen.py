@@ -0,0 +1,199 @@
+
+"""
+FEN helpers, and a fast path between FEN and the encodings.
+encode_fen parses the FEN straight into the metadata bits and the symbol of every square that the encoders
+are built from, and decode_to_fen writes the decoded symbols straight back out as a FEN, so no chess.Board
+is built. The output is bit for bit the same as the chess.Board based encoders and decoders. Only FENs with a
+pseudo-legal en passant capture, which needs a legality check, or with unusual castling or promoted piece
+markers, are handed to chess.Board.
+"""
+
+import chess
+from .bitstream import BitWriter, as_reader
+from .utility import HUFFMAN_CODE_BITS, board_metadata, get_square_symbols
+from .huffman import write_huffman, read_board_from_huffman
+from .huffman_symmetry import write_huffman_symmetry, read_board_from_huffman_symmetry, get_mirror_file_mask_from_symbols
+from .huffman_default import write_huffman_default, read_board_from_huffman_default, get_default_square_mask_from_symbols
+from .huffman_piececentric import write_huffman_piececentric, read_board_from_huffman_piececentric
+from .range_coding import write_range_coded, read_board_from_range_coded
+from .opening_dictionary import write_opening_dictionary, read_board_from_opening_dictionary
+from .choose_best_huffman_encoding import write_huffman_best_opt, read_board_from_huffman_best_opt
+from .codebook import BUILTIN_CODEBOOK_ID
+
+def get_fen_list(board_list):
+  return [get_fen(board) for board in board_list]
+
+def get_fen(board):
+  return board.fen()
+
+FILE_NAMES = "abcdefgh"
+DIGITS = {str(number): number for number in range(1, 9)}
+PIECE_CHARACTERS = set("PNBRQKpnbrqk")
+
+def parse_placement(placement):
+  """ Returns the symbol of every square ("s" for empty), indexed by square, of a FEN's piece placement field. """
+  rows = placement.split("/")
+  if len(rows) != 8:
+    raise ValueError("expected 8 rows in position part of fen: {!r}".format(placement))
+  symbols = []
+  # FEN rows go from the 8th rank down, squares from the 1st rank up.
+  for row in reversed(rows):
+    row_symbols = []
+    previous_was_digit = False
+    for character in row:
+      if character in DIGITS:
+        if previous_was_digit:
+          raise ValueError("two subsequent digits in position part of fen: {!r}".format(placement))
+        row_symbols.extend("s" * DIGITS[character])
+        previous_was_digit = True
+      elif character in PIECE_CHARACTERS:
+        row_symbols.append(character)
+        previous_was_digit = False
+      else:
+        raise ValueError("invalid character in position part of fen: {!r}".format(placement))
+    if len(row_symbols) != 8:
+      raise ValueError("expected 8 columns per row in position part of fen: {!r}".format(placement))
+    symbols.extend(row_symbols)
+  return symbols
+
+def has_castling_right(symbols, castling_part, color, kingside):
+  """
+  Returns if chess.Board would give the side the castling right: the flag (or the rook's file letter) is in the
+  castling field, the king is on e1/e8 and the rook on its corner.
+  """
+  rank = 0 if color == chess.WHITE else 56
+  king, rook = ("K", "R") if color == chess.WHITE else ("k", "r")
+  flags = "kh" if kingside else "qa"
+  if color == chess.WHITE:
+    flags = flags.upper()
+  return (symbols[rank + 4] == king and symbols[rank + (7 if kingside else 0)] == rook and
+          (flags[0] in castling_part or flags[1] in castling_part))
+
+def has_ep_capturer(symbols, turn, ep_square):
+  """ Returns if a pawn of the side to move stands next to where the en passant square's pawn is. """
+  if turn == chess.WHITE:
+    pawn, capture_rank, ep_rank = "P", 32, 5
+  else:
+    pawn, capture_rank, ep_rank = "p", 24, 2
+  if ep_square >> 3 != ep_rank or symbols[ep_square] != "s":
+    return False
+  file_index = ep_square & 7
+  return ((file_index > 0 and symbols[capture_rank + file_index - 1] == pawn) or
+          (file_index < 7 and symbols[capture_rank + file_index + 1] == pawn))
+
+def fen_to_symbols(fen):
+  """
+  Parses a FEN into (board metadata bits, symbol of every square), as utility.board_metadata and
+  utility.get_square_symbols would give for chess.Board(fen).
+  Raises ValueError for an invalid FEN.
+  """
+  parts = fen.split()
+  if not parts:
+    raise ValueError("empty fen")
+  if len(parts) > 6:
+    raise ValueError("fen string has more parts than expected: {!r}".format(fen))
+  # Missing fields default as in chess.Board: white to move, no castling rights, no en passant square.
+  placement, turn_part, castling_part, ep_part = (parts + ["w", "-", "-"][len(parts) - 1:])[:4]
+  if "~" in placement or (castling_part != "-" and not set(castling_part) <= set("KQkqAHah")):
+    # Promoted piece markers and unusual castling flags follow chess.Board's rules exactly.
+    board = chess.Board(fen)
+    return board_metadata(board), get_square_symbols(board)
+  symbols = parse_placement(placement)
+  if turn_part not in ("w", "b"):
+    raise ValueError("expected 'w' or 'b' for turn part of fen: {!r}".format(fen))
+  turn = turn_part == "w"
+  if not chess.FEN_CASTLING_REGEX.match(castling_part):
+    raise ValueError("invalid castling part in fen: {!r}".format(fen))
+  for clock in parts[4:]:
+    if not clock.isdigit():
+      raise ValueError("invalid clock in fen: {!r}".format(fen))
+
+  metadata = BitWriter()
+  metadata.write_bit(turn)
+  if symbols.count("K") > 1 or symbols.count("k") > 1:
+    # chess.Board's castling rules depend on which of several kings it finds.
+    board = chess.Board(fen)
+    return board_metadata(board), symbols
+  for color, kingside in ((chess.WHITE, True), (chess.WHITE, False), (chess.BLACK, True), (chess.BLACK, False)):
+    metadata.write_bit(has_castling_right(symbols, castling_part, color, kingside))
+
+  if ep_part == "-":
+    return metadata.write(0, 1), symbols
+  if len(ep_part) != 2 or ep_part[0] not in FILE_NAMES or ep_part[1] not in "12345678":
+    raise ValueError("invalid en passant part in fen: {!r}".format(fen))
+  ep_square = chess.parse_square(ep_part)
+  if not has_ep_capturer(symbols, turn, ep_square):
+    return metadata.write(0, 1), symbols
+  # A capture is possible, but it may leave the king in check.
+  if chess.Board(fen).has_legal_en_passant():
+    return metadata.write(0b1000 | (ep_square & 7), 4), symbols
+  return metadata.write(0, 1), symbols
+
+def symbols_to_fen(symbols, metadata):
+  """
+  Returns the FEN of a list of 64 symbols and metadata from utility.read_board_metadata,
+  as utility.board_from_symbols(symbols, metadata).fen() would.
+  """
+  turn, castling, ep_file = metadata
+  rows = []
+  for rank_start in range(56, -8, -8):
+    row = ""
+    empty = 0
+    for symbol in symbols[rank_start:rank_start + 8]:
+      if symbol == "s":
+        empty += 1
+        continue
+      if empty:
+        row += str(empty)
+        empty = 0
+      row += symbol
+    rows.append(row + str(empty) if empty else row)
+  castling_part = ""
+  for index, (flag, king_square, rook_square) in enumerate((("K", 4, 7), ("Q", 4, 0), ("k", 60, 63), ("q", 60, 56))):
+    # chess.Board only keeps rights with the king and rook in place.
+    king, rook = ("K", "R") if flag.isupper() else ("k", "r")
+    if castling & (0b1000 >> index) and symbols[king_square] == king and symbols[rook_square] == rook:
+      castling_part += flag
+  ep_part = "-" if ep_file is None else FILE_NAMES[ep_file] + ("6" if turn == chess.WHITE else "3")
+  return "{} {} {} {} 0 1".format("/".join(rows), "w" if turn else "b", castling_part or "-", ep_part)
+
+def write_best(metadata, symbols, writer, codebook_id):
+  codes = [HUFFMAN_CODE_BITS[symbol] for symbol in symbols]
+  return write_huffman_best_opt(metadata, symbols, codes, get_mirror_file_mask_from_symbols(symbols),
+                                get_default_square_mask_from_symbols(symbols), writer, codebook_id)
+
+# Scheme name (as in registry.SCHEMES) -> (function writing the encoding from metadata bits, symbols, a writer
+# and a codebook id; function reading (metadata, symbols) from a reader and a codebook id).
+FEN_SCHEMES = {
+  "huffman": (
+    lambda metadata, symbols, writer, codebook_id: write_huffman(metadata, [HUFFMAN_CODE_BITS[symbol] for symbol in symbols], writer),
+    lambda reader, codebook_id: read_board_from_huffman(reader)),
+  "symmetry": (
+    lambda metadata, symbols, writer, codebook_id: write_huffman_symmetry(
+      metadata, [HUFFMAN_CODE_BITS[symbol] for symbol in symbols], get_mirror_file_mask_from_symbols(symbols), writer),
+    lambda reader, codebook_id: read_board_from_huffman_symmetry(reader)),
+  "default": (
+    lambda metadata, symbols, writer, codebook_id: write_huffman_default(
+      metadata, [HUFFMAN_CODE_BITS[symbol] for symbol in symbols], get_default_square_mask_from_symbols(symbols), writer),
+    lambda reader, codebook_id: read_board_from_huffman_default(reader)),
+  "piececentric": (write_huffman_piececentric, read_board_from_huffman_piececentric),
+  "range": (write_range_coded, read_board_from_range_coded),
+  "dictionary": (write_opening_dictionary, read_board_from_opening_dictionary),
+  "best": (write_best, read_board_from_huffman_best_opt)
+}
+
+def encode_fen(fen, scheme="best", codebook_id=BUILTIN_CODEBOOK_ID, writer=None):
+  """ Encodes a FEN with the named scheme (see FEN_SCHEMES), the same as encoding chess.Board(fen). Returns a BitWriter. """
+  if writer is None:
+    writer = BitWriter()
+  metadata, symbols = fen_to_symbols(fen)
+  return FEN_SCHEMES[scheme][0](metadata, symbols, writer, codebook_id)
+
+def decode_to_fen(bits, length=None, scheme="best", codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Decodes bits (see bitstream.as_reader) of the named scheme straight to a FEN. """
+  metadata, symbols = FEN_SCHEMES[scheme][1](as_reader(bits, length), codebook_id)
+  return symbols_to_fen(symbols, metadata)
+
+if __name__ == "__main__":
+  from .load_games import load_random_positions
+  print(get_fen_list(load_random_positions()))
@@ -0,0 +1,148 @@
+
+"""
+Whole-game compression.
+Instead of encoding every position, a game is stored as a keyframe position every K plies
+(encoded with choose_best_huffman_encoding.encode_board_to_huffman_best_opt, with the codebook in the header) and,
+in between, each move as its index into the list of legal moves, written with just enough bits for the number of
+legal moves.
+Format:
+  [number of plies: 16 bits] [K: 8 bits] [codebook id: 16 bits]
+  [bit offset of keyframes 1.. from the end of this table: 32 bits each]
+  then per keyframe: [keyframe position] [up to K move indices]
+Any ply can be read by decoding the nearest keyframe before it and replaying at most K moves.
+"""
+
+import chess
+from .bitstream import BitWriter, as_reader
+from .utility import board_from_symbols
+from .choose_best_huffman_encoding import encode_board_to_huffman_best_opt, read_board_from_huffman_best_opt
+from .codebook import BUILTIN_CODEBOOK_ID
+
+KEYFRAME_INTERVAL = 16
+PLY_BITS = 16
+INTERVAL_BITS = 8
+CODEBOOK_ID_BITS = 16
+OFFSET_BITS = 32
+
+def move_index_bits(number_of_moves):
+  """ Returns the number of bits used for a move index with number_of_moves legal moves. """
+  return (number_of_moves - 1).bit_length()
+
+def write_move(board, move, writer):
+  """ Writes the index of move in the board's legal moves. Returns writer. """
+  legal_moves = list(board.legal_moves)
+  return writer.write(legal_moves.index(move), move_index_bits(len(legal_moves)))
+
+def read_move(board, reader):
+  """ Reads a move written by write_move. Returns the chess.Move. """
+  legal_moves = list(board.legal_moves)
+  index = reader.read(move_index_bits(len(legal_moves)))
+  if index >= len(legal_moves):
+    raise ValueError("Move index {} out of range for {} legal moves.".format(index, len(legal_moves)))
+  return legal_moves[index]
+
+def get_number_of_keyframes(plies, keyframe_interval):
+  return max(1, (plies + keyframe_interval - 1) // keyframe_interval)
+
+def encode_game(board, moves, keyframe_interval=KEYFRAME_INTERVAL, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Encodes the game starting at board and playing moves (e.g. game.board() and game.mainline_moves()),
+  with keyframes encoded using codebook codebook_id. Returns a BitWriter.
+  """
+  board = board.copy(stack=False)
+  moves = list(moves)
+  if len(moves) >= 1 << PLY_BITS:
+    raise ValueError("Can only encode games of up to {} plies.".format((1 << PLY_BITS) - 1))
+  if not 1 <= keyframe_interval < 1 << INTERVAL_BITS:
+    raise ValueError("Keyframe interval must be 1-{}.".format((1 << INTERVAL_BITS) - 1))
+  if not 0 <= codebook_id < 1 << CODEBOOK_ID_BITS:
+    raise ValueError("Codebook id must be 0-{}.".format((1 << CODEBOOK_ID_BITS) - 1))
+  segments = []
+  for start in range(0, get_number_of_keyframes(len(moves), keyframe_interval) * keyframe_interval, keyframe_interval):
+    segment = encode_board_to_huffman_best_opt(board, codebook_id)
+    for move in moves[start:start + keyframe_interval]:
+      write_move(board, move, segment)
+      board.push(move)
+    segments.append(segment)
+  writer = BitWriter()
+  writer.write(len(moves), PLY_BITS)
+  writer.write(keyframe_interval, INTERVAL_BITS)
+  writer.write(codebook_id, CODEBOOK_ID_BITS)
+  offset = 0
+  for segment in segments[:-1]:
+    offset += len(segment)
+    writer.write(offset, OFFSET_BITS)
+  for segment in segments:
+    writer.extend(segment)
+  return writer
+
+def encode_chess_game(game, keyframe_interval=KEYFRAME_INTERVAL, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Encodes the mainline of a chess.pgn.Game. Returns a BitWriter. """
+  return encode_game(game.board(), game.mainline_moves(), keyframe_interval, codebook_id)
+
+class GameReader:
+  """
+  Random access to the plies of a game written by encode_game.
+  bits may be a BitReader positioned at the start of the game, e.g. after other data in the same stream.
+  """
+
+  def __init__(self, bits, length=None):
+    self.reader = as_reader(bits, length)
+    self.plies = self.reader.read(PLY_BITS)
+    self.keyframe_interval = self.reader.read(INTERVAL_BITS)
+    self.codebook_id = self.reader.read(CODEBOOK_ID_BITS)
+    number_of_keyframes = get_number_of_keyframes(self.plies, self.keyframe_interval)
+    offsets = [0] + [self.reader.read(OFFSET_BITS) for _ in range(number_of_keyframes - 1)]
+    self.keyframe_positions = [self.reader.pos + offset for offset in offsets]
+
+  def __len__(self):
+    """ Number of positions, including the starting position. """
+    return self.plies + 1
+
+  def read_keyframe(self, keyframe_index):
+    """ Returns the keyframe's chess.Board, leaving the reader at the keyframe's first move. """
+    self.reader.pos = self.keyframe_positions[keyframe_index]
+    metadata, symbols = read_board_from_huffman_best_opt(self.reader, self.codebook_id)
+    return board_from_symbols(symbols, metadata)
+
+  def board_at(self, ply):
+    """ Returns the chess.Board after ply moves. """
+    if not 0 <= ply <= self.plies:
+      raise IndexError("Ply {} out of range for a game of {} plies.".format(ply, self.plies))
+    keyframe_index = min(ply // self.keyframe_interval, len(self.keyframe_positions) - 1)
+    board = self.read_keyframe(keyframe_index)
+    for _ in range(ply - keyframe_index * self.keyframe_interval):
+      board.push(read_move(board, self.reader))
+    return board
+
+  def moves(self):
+    """ Returns every move of the game. """
+    moves = []
+    for keyframe_index in range(len(self.keyframe_positions)):
+      board = self.read_keyframe(keyframe_index)
+      for _ in range(min(self.keyframe_interval, self.plies - len(moves))):
+        move = read_move(board, self.reader)
+        board.push(move)
+        moves.append(move)
+    return moves
+
+  def __iter__(self):
+    """ Yields the board after every ply, starting with the starting position. """
+    board = self.read_keyframe(0)
+    yield board.copy(stack=False)
+    for ply in range(1, self.plies + 1):
+      keyframe_index, moves_since_keyframe = divmod(ply - 1, self.keyframe_interval)
+      # Moving on to the next segment, which starts with a keyframe of the current position. 
+      if moves_since_keyframe == 0 and keyframe_index > 0:
+        board = self.read_keyframe(keyframe_index)
+      board.push(read_move(board, self.reader))
+      yield board.copy(stack=False)
+
+if __name__ == "__main__":
+  from .load_games import iter_games
+  total_plies, total_bits = 0, 0
+  for game in iter_games(100):
+    bits = encode_chess_game(game)
+    total_plies += len(GameReader(bits))
+    total_bits += len(bits)
+  print("Positions:", total_plies, "Bytes per position:", total_bits / 8 / total_plies)
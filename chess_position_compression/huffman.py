@@ -0,0 +1,101 @@
+
+import chess 
+from .instrumentation import instrumented 
+from .bitstream import BitWriter, as_reader 
+from .utility import board_metadata, huffman_encode_squares, decode_huffman_piece_info, read_board_metadata, read_huffman_symbols, board_from_symbols, get_square_codes, write_square_codes, square_codes_size 
+
+def huffman_piece_info(board, writer=None):
+  """
+  64-164 bits for standard chess game. 
+  Each piece is encoded as a sequence of bits from its Huffman code. 
+  The Huffman codes are based on the starting position of chess. 
+  Returns a BitWriter. 
+  """
+  return huffman_encode_squares(board, writer=writer)
+
+def return_num_bits(bits):
+  return len(bits)
+
+def return_num_bytes(bits):
+  return len(bits)/8
+
+def return_binary(bits):
+  """ Returns the packed bytes. Use together with the number of bits, as the last byte is zero padded. """
+  return bits.to_bytes()
+
+def return_string(bits):
+  """ Returns a string of "0"/"1" characters. Only meant for debugging. """
+  return bits.to_string()
+
+CALLBACK_DICT = {
+  "bits": return_num_bits,
+  "bytes": return_num_bytes,
+  "binary": return_binary,
+  "string": return_string
+}
+
+@instrumented("encode.huffman")
+def encode_board_to_huffman(board, option=None, writer=None):
+  """ 
+  Format: [board metadata] [huffman piece info] 
+  70-173 bits = 21.625 bytes for standard chess game (worst case). 
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  writer = write_huffman(board_metadata(board), get_square_codes(board), writer)
+  if option is not None:
+    return CALLBACK_DICT[option](writer)
+  return writer
+
+def write_huffman(metadata, codes, writer):
+  """ 
+  Writes the encoding from board metadata bits and the code of every square (see utility.get_square_codes). 
+  Returns writer. 
+  """
+  writer.extend(metadata)
+  return write_square_codes(codes, chess.SQUARES, writer)
+
+def huffman_size(metadata, codes):
+  """ Returns the number of bits write_huffman would write. """
+  return len(metadata) + square_codes_size(codes, chess.SQUARES)
+
+def read_board_from_huffman(reader):
+  """ Reads an encoding from encode_board_to_huffman. Returns (metadata, symbols). """
+  metadata = read_board_metadata(reader)
+  return metadata, read_huffman_symbols(reader, 64)
+
+def decode_board_from_huffman(bits, length=None):
+  """ 
+  Decodes bits (see bitstream.as_reader) from encode_board_to_huffman. 
+  Returns a chess.Board. 
+  """
+  return board_from_symbols(*reversed(read_board_from_huffman(as_reader(bits, length))))
+  
+if __name__ == "__main__":
+
+  print("Testing huffman piece info.")
+  print(huffman_piece_info(chess.Board()))
+  
+  print("Testing decode huffman piece info.")
+  print(decode_huffman_piece_info(huffman_piece_info(chess.Board())))
+  
+  print("Testing encode huffman.")
+  print(encode_board_to_huffman(chess.Board()))
+  print("bits:", encode_board_to_huffman(chess.Board(), option='bits'))
+  print("bytes:", encode_board_to_huffman(chess.Board(), option='bytes'))
+  print(encode_board_to_huffman(chess.Board(), option='binary'))
+  
+  print("Testing decode huffman.")
+  print(decode_board_from_huffman(encode_board_to_huffman(chess.Board())).fen())
+  
+  # Testing mirror. 
+  board = chess.Board()
+  print(board)
+  board = board.mirror()
+  print(board)
+  board = chess.Board()
+  board.push_uci("e2e4")
+  print(board)
+  board = board.mirror()
+  print(board)
@@ -0,0 +1,152 @@
+
+"""
+Batch encoding of many positions at once with NumPy.
+Positions are given as an (N, 64) uint8 array of piece indices (see SYMBOLS) plus metadata columns,
+and the output is one contiguous byte buffer with an offsets array.
+Each position is padded to a whole number of bytes, and is bit-identical to the single board encoders
+(huffman.encode_board_to_huffman, huffman_symmetry.encode_board_to_huffman_symmetry and
+huffman_default.encode_board_to_huffman_default) followed by BitWriter.to_bytes().
+"""
+
+import chess
+import numpy as np
+from .utility import HUFFMAN_CODE_BITS, get_square_symbols, castling_rights
+from .huffman_default import DEFAULT_SYMBOLS
+from .huffman_symmetry import SWAPPED_SYMBOLS
+
+# Piece index of each symbol. 0 is an empty square.
+SYMBOLS = ["s", "P", "N", "B", "R", "Q", "K", "p", "n", "b", "r", "q", "k"]
+SYMBOL_INDICES = {symbol: index for index, symbol in enumerate(SYMBOLS)}
+
+CODE_VALUES = np.array([HUFFMAN_CODE_BITS[symbol][0] for symbol in SYMBOLS], dtype=np.uint8)
+CODE_LENGTHS = np.array([HUFFMAN_CODE_BITS[symbol][1] for symbol in SYMBOLS], dtype=np.uint8)
+SWAPPED_INDICES = np.array([SYMBOL_INDICES[SWAPPED_SYMBOLS[symbol]] for symbol in SYMBOLS], dtype=np.uint8)
+DEFAULT_INDICES = np.array([SYMBOL_INDICES[symbol] for symbol in DEFAULT_SYMBOLS], dtype=np.uint8)
+
+# Order squares are written in by the symmetry scheme: the first four ranks, then the upper four squares file by file.
+SYMMETRY_ORDER = np.array(list(range(32)) + [chess.square(file_index, rank_index) for file_index in range(8) for rank_index in range(4, 8)])
+
+# Longest token in bits. Codes are at most 6 bits, en passant 4 bits and padding 7 bits.
+MAX_TOKEN_LENGTH = 8
+
+SCHEMES = ("huffman", "symmetry", "default")
+
+def boards_to_arrays(boards):
+  """
+  Converts chess.Boards into the arrays taken by encode_batch.
+  Returns (pieces, turn, castling, ep_file):
+    pieces   (N, 64) uint8 piece indices by square
+    turn     (N,) uint8, 1 for white
+    castling (N,) uint8, the 4 castling bits as written by utility.castling_rights
+    ep_file  (N,) int8, the file of a legal en passant capture or -1
+  """
+  pieces = np.zeros((len(boards), 64), dtype=np.uint8)
+  turn = np.zeros(len(boards), dtype=np.uint8)
+  castling = np.zeros(len(boards), dtype=np.uint8)
+  ep_file = np.full(len(boards), -1, dtype=np.int8)
+  for index, board in enumerate(boards):
+    pieces[index] = [SYMBOL_INDICES[symbol] for symbol in get_square_symbols(board)]
+    turn[index] = board.turn
+    castling[index] = castling_rights(board).value
+    if board.has_legal_en_passant():
+      ep_file[index] = board.ep_square % 8
+  return pieces, turn, castling, ep_file
+
+def metadata_tokens(turn, castling, ep_file):
+  """ Returns (values, lengths) of the board metadata tokens, each (N, 3). """
+  has_ep = ep_file >= 0
+  values = np.stack([turn, castling, np.where(has_ep, 0b1000 | ep_file.clip(0), 0)], axis=1).astype(np.uint8)
+  lengths = np.stack([np.ones_like(turn), np.full_like(turn, 4), np.where(has_ep, 4, 1)], axis=1).astype(np.uint8)
+  return values, lengths
+
+def mask_tokens(mask):
+  """ Returns (values, lengths) writing an (N, M) bool array as M single bits. """
+  return mask.astype(np.uint8), np.ones(mask.shape, dtype=np.uint8)
+
+def get_mirror_files(pieces):
+  """ Returns an (N, 8) bool array of the mirrored files (see utility.is_file_mirrored). """
+  ranks = pieces.reshape(-1, 8, 8)
+  return (ranks[:, 0:4, :] == SWAPPED_INDICES[ranks[:, 7:3:-1, :]]).all(axis=1)
+
+def scheme_tokens(scheme, pieces, turn, castling, ep_file):
+  """ Returns (values, lengths), each (N, T), of every token of the scheme. Tokens of length 0 are skipped. """
+  values, lengths = metadata_tokens(turn, castling, ep_file)
+  token_values, token_lengths = [values], [lengths]
+  if scheme == "huffman":
+    token_values.append(CODE_VALUES[pieces])
+    token_lengths.append(CODE_LENGTHS[pieces])
+  elif scheme == "symmetry":
+    mirror_files = get_mirror_files(pieces)
+    values, lengths = mask_tokens(mirror_files)
+    token_values.append(values)
+    token_lengths.append(lengths)
+    ordered = pieces[:, SYMMETRY_ORDER]
+    lengths = CODE_LENGTHS[ordered]
+    # The upper four squares of mirrored files are skipped.
+    lengths[:, 32:] *= ~np.repeat(mirror_files, 4, axis=1)
+    token_values.append(CODE_VALUES[ordered])
+    token_lengths.append(lengths)
+  elif scheme == "default":
+    default_squares = pieces == DEFAULT_INDICES
+    values, lengths = mask_tokens(default_squares)
+    token_values.append(values)
+    token_lengths.append(lengths)
+    token_values.append(CODE_VALUES[pieces])
+    token_lengths.append(CODE_LENGTHS[pieces] * ~default_squares)
+  else:
+    raise ValueError("Unknown scheme {}, expected one of {}.".format(scheme, SCHEMES))
+  return np.concatenate(token_values, axis=1), np.concatenate(token_lengths, axis=1)
+
+def pack_tokens(values, lengths):
+  """
+  Packs (N, T) tokens into bytes, padding each row to a whole number of bytes.
+  Returns (buffer, bit_lengths), where buffer is a uint8 array of all of the rows back to back.
+  """
+  bit_lengths = lengths.sum(axis=1, dtype=np.int64)
+  padding = (-bit_lengths % 8).astype(np.uint8)
+  values = np.concatenate([values, np.zeros((len(values), 1), dtype=np.uint8)], axis=1)
+  lengths = np.concatenate([lengths, padding[:, None]], axis=1)
+  # Bit j of each token, most significant first, and whether the token has a bit j.
+  positions = np.arange(MAX_TOKEN_LENGTH, dtype=np.int16)
+  shifts = lengths[..., None].astype(np.int16) - 1 - positions
+  bits = (values[..., None] >> shifts.clip(0).astype(np.uint8)) & 1
+  return np.packbits(bits[shifts >= 0]), bit_lengths
+
+def encode_batch(pieces, turn, castling, ep_file, scheme="huffman", chunk_size=65536):
+  """
+  Encodes N positions with the given scheme ("huffman", "symmetry" or "default").
+  Takes the arrays returned by boards_to_arrays.
+  Returns (buffer, offsets, bit_lengths):
+    buffer      uint8 array of every encoding back to back
+    offsets     (N + 1,) int64, encoding i is buffer[offsets[i]:offsets[i + 1]]
+    bit_lengths (N,) int64 exact number of bits of each encoding
+  """
+  pieces = np.asarray(pieces, dtype=np.uint8)
+  turn = np.asarray(turn, dtype=np.uint8)
+  castling = np.asarray(castling, dtype=np.uint8)
+  ep_file = np.asarray(ep_file, dtype=np.int8)
+  buffers, all_bit_lengths = [], []
+  # Chunking bounds the memory used by the per-bit intermediate arrays.
+  for start in range(0, len(pieces), chunk_size):
+    end = start + chunk_size
+    values, lengths = scheme_tokens(scheme, pieces[start:end], turn[start:end], castling[start:end], ep_file[start:end])
+    buffer, bit_lengths = pack_tokens(values, lengths)
+    buffers.append(buffer)
+    all_bit_lengths.append(bit_lengths)
+  if not buffers:
+    return np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+  bit_lengths = np.concatenate(all_bit_lengths)
+  offsets = np.zeros(len(bit_lengths) + 1, dtype=np.int64)
+  np.cumsum((bit_lengths + 7) // 8, out=offsets[1:])
+  return np.concatenate(buffers), offsets, bit_lengths
+
+def encode_boards_batch(boards, scheme="huffman"):
+  """ Encodes a list of chess.Boards. See encode_batch. """
+  return encode_batch(*boards_to_arrays(boards), scheme=scheme)
+
+if __name__ == "__main__":
+  board = chess.Board()
+  board.push_uci("e2e4")
+  for scheme in SCHEMES:
+    buffer, offsets, bit_lengths = encode_boards_batch([chess.Board(), board], scheme)
+    print(scheme, offsets, bit_lengths, buffer.tobytes().hex())
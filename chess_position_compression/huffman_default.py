@@ -0,0 +1,113 @@
+
+from .instrumentation import instrumented 
+from .bitstream import BitWriter, as_reader 
+from .utility import is_file_mirrored, huffman_encode_squares, board_metadata, read_board_metadata, read_huffman_symbols, board_from_symbols, get_square_codes, write_square_codes, square_codes_size 
+import chess 
+
+START_BOARD = chess.Board()
+
+# Symbol on each square in the starting position, "s" for empty. 
+DEFAULT_SYMBOLS = [START_BOARD.piece_at(square).symbol() if START_BOARD.piece_at(square) else "s" for square in chess.SQUARES]
+
+# Bitboard of each piece in the starting position, and of the squares that start empty. 
+DEFAULT_PIECE_MASKS = [(piece_type, color, START_BOARD.pieces_mask(piece_type, color)) for color in chess.COLORS for piece_type in chess.PIECE_TYPES]
+DEFAULT_EMPTY_MASK = chess.BB_ALL & ~START_BOARD.occupied
+
+# Every byte with its bits reversed, as a bytes.translate table. 
+REVERSED_BYTES = bytes([int("{:08b}".format(byte)[::-1], 2) for byte in range(256)])
+
+def reverse_bitboard(mask):
+  """ Returns the bitboard with its 64 bits in reverse order (a1 highest), reversing each byte's bits and the byte order. """
+  return int.from_bytes(mask.to_bytes(8, "little").translate(REVERSED_BYTES), "big")
+
+def get_default_square_mask(board):
+  """ Returns a bitboard of the squares that have not changed from default. """
+  mask = DEFAULT_EMPTY_MASK & ~board.occupied
+  for piece_type, color, default_mask in DEFAULT_PIECE_MASKS:
+    mask |= board.pieces_mask(piece_type, color) & default_mask
+  return mask
+
+def get_default_square_mask_from_symbols(symbols):
+  """ get_default_square_mask from the symbol of every square (see utility.get_square_symbols). """
+  mask = 0
+  for square, (symbol, default_symbol) in enumerate(zip(symbols, DEFAULT_SYMBOLS)):
+    if symbol == default_symbol:
+      mask |= 1 << square
+  return mask
+
+def get_nondefault_squares_to_encode(board, flip=False):
+  """
+  Gets a list of squares that have changed from default. 
+  If flip, gets the squares that have not changed from default instead. 
+  """
+  mask = get_default_square_mask(board)
+  if not flip:
+    mask ^= chess.BB_ALL
+  return list(chess.scan_forward(mask))
+
+def get_default_square_bits(board, writer=None):
+  """ Returns a BitWriter. (64 bits, a1 first.) """
+  if writer is None:
+    writer = BitWriter()
+  return write_default_square_mask(get_default_square_mask(board), writer)
+
+def write_default_square_mask(default_mask, writer):
+  """ Writes a bitboard of default squares as 64 bits, a1 first. Returns writer. """
+  # Bitboards hold a1 in the lowest bit, but a1 is written first. 
+  return writer.write(reverse_bitboard(default_mask), 64)
+
+@instrumented("encode.default")
+def encode_board_to_huffman_default(board, writer=None):
+  """
+  Format: [board metadata] [default piece bits] [huffman piece info] 
+  128-228 bits = 28.5 bytes for standard chess game (worst case).
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  return write_huffman_default(board_metadata(board), get_square_codes(board), get_default_square_mask(board), writer)
+
+def write_huffman_default(metadata, codes, default_mask, writer):
+  """ 
+  Writes the encoding from board metadata bits, the code of every square and the default square bitboard. 
+  Returns writer. 
+  """
+  writer.extend(metadata)
+  write_default_square_mask(default_mask, writer)
+  return write_square_codes(codes, chess.scan_forward(default_mask ^ chess.BB_ALL), writer)
+
+def huffman_default_size(metadata, codes, default_mask):
+  """ Returns the number of bits write_huffman_default would write. """
+  return len(metadata) + 64 + square_codes_size(codes, chess.scan_forward(default_mask ^ chess.BB_ALL))
+
+def read_board_from_huffman_default(reader):
+  """ Reads an encoding from encode_board_to_huffman_default. Returns (metadata, symbols). """
+  metadata = read_board_metadata(reader)
+  default_bits = reader.read(64)
+  nondefault_squares = list(chess.scan_forward(reverse_bitboard(default_bits) ^ chess.BB_ALL))
+  symbols = list(DEFAULT_SYMBOLS)
+  for square, symbol in zip(nondefault_squares, read_huffman_symbols(reader, len(nondefault_squares))):
+    symbols[square] = symbol
+  return metadata, symbols
+
+def decode_board_from_huffman_default(bits, length=None):
+  """ 
+  Decodes bits (see bitstream.as_reader) from encode_board_to_huffman_default. 
+  Returns a chess.Board. 
+  """
+  metadata, symbols = read_board_from_huffman_default(as_reader(bits, length))
+  return board_from_symbols(symbols, metadata)
+
+if __name__ == "__main__":
+  # Testing getting nondefault squares. 
+  board = chess.Board()
+  print(get_nondefault_squares_to_encode(board))
+  print("len:", len(get_nondefault_squares_to_encode(board)))
+  board.push_uci("e2e4")
+  print(get_nondefault_squares_to_encode(board))
+  print("len:", len(get_nondefault_squares_to_encode(board)))
+  
+  # Testing encode huffman default. 
+  print("Testing encode huffman default.")
+  print(encode_board_to_huffman_default(board))
+  print(decode_board_from_huffman_default(encode_board_to_huffman_default(board)))
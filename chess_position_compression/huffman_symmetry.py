@@ -0,0 +1,127 @@
+
+from .instrumentation import instrumented 
+from .bitstream import BitWriter, as_reader 
+from .utility import get_mirror_difference, huffman_encode_squares, board_metadata, read_board_metadata, read_huffman_symbols, board_from_symbols, get_square_codes, write_square_codes, square_codes_size 
+import chess 
+
+def get_symmetry_squares_from_mask(mirror_mask):
+  """ 
+  Gets the list of squares to encode for a mirror mask (see get_mirror_file_mask). 
+  Squares on the first four ranks, then the upper four squares of each file that isn't mirrored. 
+  """
+  squares = list(range(0, 32))
+  for file_index in range(8):
+    if not mirror_mask & (0x80 >> file_index):
+      for rank_index in range(4, 8):
+        squares.append(chess.square(file_index, rank_index))
+  return squares
+
+# Mirror mask for every byte of files with a differing square (bit n for file n). 
+MIRROR_MASKS = [sum([0x80 >> file_index for file_index in range(8) if not files & (1 << file_index)]) for files in range(256)]
+
+# Squares to encode for every possible mirror mask. 
+SYMMETRY_SQUARES = [get_symmetry_squares_from_mask(mirror_mask) for mirror_mask in range(256)]
+
+def get_symmetry_squares_to_encode(board):
+  """
+  Gets a list of squares required to encode when using symmetry. 
+  Only four squares in symmetric positions need to be encoded, otherwise all eight. 
+  """
+  return list(SYMMETRY_SQUARES[get_mirror_file_mask(board)])
+
+def get_mirror_file_indices(board, flip=False):
+  """ Gets a list of files that are mirrored. """
+  mirror_mask = get_mirror_file_mask(board)
+  return [file_index for file_index in range(8) if bool(mirror_mask & (0x80 >> file_index)) ^ flip]
+
+def get_mirror_file_mask(board):
+  """ 
+  Returns the mirrored files as an 8 bit int, with the a file as the highest bit. 
+  Computed in one pass over the piece bitboards (see utility.get_mirror_difference). 
+  """
+  difference = get_mirror_difference(board)
+  # Collapse every rank onto the first, so bit n is set if file n has a differing square. 
+  difference |= difference >> 32
+  difference |= difference >> 16
+  difference |= difference >> 8
+  return MIRROR_MASKS[difference & 0xFF]
+
+def get_mirror_file_mask_from_symbols(symbols):
+  """ get_mirror_file_mask from the symbol of every square (see utility.get_square_symbols). """
+  mirror_mask = 0
+  for file_index in range(8):
+    for rank_index in range(4):
+      if symbols[file_index + 8 * rank_index] != SWAPPED_SYMBOLS[symbols[file_index + 8 * (7 - rank_index)]]:
+        break
+    else:
+      mirror_mask |= 0x80 >> file_index
+  return mirror_mask
+
+def get_mirror_file_index_bits(board, writer=None):
+  """ Returns a BitWriter. (8 bits.) """
+  if writer is None:
+    writer = BitWriter()
+  return writer.write(get_mirror_file_mask(board), 8)
+
+@instrumented("encode.symmetry")
+def encode_board_to_huffman_symmetry(board, writer=None):
+  """
+  Format: [board metadata] [mirror files] [huffman piece info] 
+  78-181 bits = 24.5 bytes for standard chess game (worst case).
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  return write_huffman_symmetry(board_metadata(board), get_square_codes(board), get_mirror_file_mask(board), writer)
+
+def write_huffman_symmetry(metadata, codes, mirror_mask, writer):
+  """ 
+  Writes the encoding from board metadata bits, the code of every square and the mirror mask. 
+  Returns writer. 
+  """
+  writer.extend(metadata)
+  writer.write(mirror_mask, 8)
+  return write_square_codes(codes, SYMMETRY_SQUARES[mirror_mask], writer)
+
+def huffman_symmetry_size(metadata, codes, mirror_mask):
+  """ Returns the number of bits write_huffman_symmetry would write. """
+  return len(metadata) + 8 + square_codes_size(codes, SYMMETRY_SQUARES[mirror_mask])
+
+# Symbol with the opposite color, for filling in mirrored squares. 
+SWAPPED_SYMBOLS = {"s": "s", "p": "P", "P": "p", "r": "R", "R": "r", "n": "N", "N": "n", "b": "B", "B": "b", "q": "Q", "Q": "q", "k": "K", "K": "k"}
+
+def read_board_from_huffman_symmetry(reader):
+  """ Reads an encoding from encode_board_to_huffman_symmetry. Returns (metadata, symbols). """
+  metadata = read_board_metadata(reader)
+  mirror_bits = reader.read(8)
+  symbols = read_huffman_symbols(reader, 32) + ["s"] * 32
+  for file_index in range(8):
+    if mirror_bits & (0x80 >> file_index):
+      for rank_index in range(4, 8):
+        symbols[chess.square(file_index, rank_index)] = SWAPPED_SYMBOLS[symbols[chess.square(file_index, 7 - rank_index)]]
+  upper_squares = SYMMETRY_SQUARES[mirror_bits][32:]
+  for square, symbol in zip(upper_squares, read_huffman_symbols(reader, len(upper_squares))):
+    symbols[square] = symbol
+  return metadata, symbols
+
+def decode_board_from_huffman_symmetry(bits, length=None):
+  """ 
+  Decodes bits (see bitstream.as_reader) from encode_board_to_huffman_symmetry. 
+  Returns a chess.Board. 
+  """
+  metadata, symbols = read_board_from_huffman_symmetry(as_reader(bits, length))
+  return board_from_symbols(symbols, metadata)
+
+if __name__ == "__main__":
+  # Testing getting symmetry squares. 
+  board = chess.Board()
+  print(get_symmetry_squares_to_encode(board))
+  print("len:", len(get_symmetry_squares_to_encode(board)))
+  board.push_uci("e2e4")
+  print(get_symmetry_squares_to_encode(board))
+  print("len:", len(get_symmetry_squares_to_encode(board)))
+  
+  # Testing encode huffman symmetry. 
+  print("Testing encode huffman symmetry.")
+  print(encode_board_to_huffman_symmetry(chess.Board()))
+  
\ No newline at end of file
@@ -0,0 +1,213 @@
+
+"""
+Incremental encoding of the positions of a game.
+A move changes at most four squares, so instead of encoding every position from scratch, IncrementalEncoder keeps
+the piece info of the plain, symmetry and default square schemes as spliced ints: one (value, length) code slot
+per square, concatenated into a single int. Pushing a move finds the changed squares by comparing bitboards and
+splices just their slots (and, for symmetry, the upper squares of files whose mirroring changed), so the work is
+proportional to the squares changed rather than to the board. Encodings are bit for bit the same as
+encode_board_to_huffman, encode_board_to_huffman_symmetry and encode_board_to_huffman_default.
+"""
+
+import chess
+from .bitstream import BitWriter
+from .utility import HUFFMAN_CODE_BITS, board_metadata, get_square_symbols
+from .huffman_default import DEFAULT_SYMBOLS
+from .huffman_symmetry import SWAPPED_SYMBOLS
+
+INCREMENTAL_SCHEMES = ("huffman", "symmetry", "default")
+EMPTY_SLOT = (0, 0)
+
+# Symmetry slot of each square: the first four ranks in square order, then the upper squares file by file.
+SYMMETRY_SLOTS = list(range(32)) + [0] * 32
+for file_index in range(8):
+  for rank_index in range(4, 8):
+    SYMMETRY_SLOTS[chess.square(file_index, rank_index)] = 32 + 4 * file_index + rank_index - 4
+
+class SplicedCodes:
+  """
+  Codes in slots, kept concatenated in one int. An empty slot holds (0, 0).
+  The slot lengths are also kept in a Fenwick tree, so the position of a slot takes O(log slots) to find.
+  """
+
+  def __init__(self, codes):
+    self.values = [value for value, _ in codes]
+    self.lengths = [length for _, length in codes]
+    self.value = 0
+    for value, length in codes:
+      self.value = (self.value << length) | value
+    self.length = sum(self.lengths)
+    # tree[i] is the sum of the lengths of slots i - (i & -i) to i - 1.
+    self.tree = [0] + self.lengths
+    for index in range(1, len(self.tree)):
+      parent = index + (index & -index)
+      if parent < len(self.tree):
+        self.tree[parent] += self.tree[index]
+
+  def length_before(self, slot):
+    """ Returns the number of bits of the slots before slot. """
+    length = 0
+    while slot:
+      length += self.tree[slot]
+      slot &= slot - 1
+    return length
+
+  def set(self, slot, code):
+    """ Replaces the code in slot. """
+    value, length = code
+    old_length = self.lengths[slot]
+    if value == self.values[slot] and length == old_length:
+      return
+    # Number of bits after the slot.
+    after = self.length - self.length_before(slot) - old_length
+    low = self.value & ((1 << after) - 1)
+    high = self.value >> (after + old_length)
+    self.value = (((high << length) | value) << after) | low
+    self.length += length - old_length
+    self.values[slot], self.lengths[slot] = value, length
+    index = slot + 1
+    while index < len(self.tree):
+      self.tree[index] += length - old_length
+      index += index & -index
+
+  def write(self, writer):
+    return writer.write(self.value, self.length)
+
+def is_file_mirrored_in_symbols(symbols, file_index):
+  for rank_index in range(4):
+    if symbols[file_index + 8 * rank_index] != SWAPPED_SYMBOLS[symbols[file_index + 8 * (7 - rank_index)]]:
+      return False
+  return True
+
+def get_board_state(board):
+  """ Returns the bitboards that tell every square's piece apart. """
+  return (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings, board.occupied_co[chess.WHITE])
+
+class IncrementalEncoder:
+  """
+  Encodes a board and every position after pushed moves, e.g.
+    encoder = IncrementalEncoder(game.board())
+    for move in game.mainline_moves():
+      encoder.push(move)
+      bits = encoder.encode("default")
+  The encoder keeps its own copy of the board.
+  """
+
+  def __init__(self, board=None, schemes=INCREMENTAL_SCHEMES):
+    for scheme in schemes:
+      if scheme not in INCREMENTAL_SCHEMES:
+        raise ValueError("Unknown scheme {}, expected one of {}.".format(scheme, INCREMENTAL_SCHEMES))
+    self.board = chess.Board() if board is None else board.copy(stack=False)
+    self.schemes = schemes
+    self.reset()
+
+  def reset(self):
+    """ Rebuilds every slot from the board. """
+    self.symbols = get_square_symbols(self.board)
+    self.state = get_board_state(self.board)
+    self.metadata = board_metadata(self.board)
+    codes = [HUFFMAN_CODE_BITS[symbol] for symbol in self.symbols]
+    if "huffman" in self.schemes:
+      self.huffman = SplicedCodes(codes)
+    if "default" in self.schemes:
+      # A1 is the highest bit, as the mask is written a1 first.
+      self.default_mask = sum([1 << (63 - square) for square in chess.SQUARES if self.symbols[square] == DEFAULT_SYMBOLS[square]])
+      self.default = SplicedCodes([EMPTY_SLOT if self.symbols[square] == DEFAULT_SYMBOLS[square] else codes[square] for square in chess.SQUARES])
+    if "symmetry" in self.schemes:
+      self.mirror_mask = sum([0x80 >> file_index for file_index in range(8) if is_file_mirrored_in_symbols(self.symbols, file_index)])
+      slots = [None] * 64
+      for square in chess.SQUARES:
+        mirrored = square >= 32 and self.mirror_mask & (0x80 >> (square & 7))
+        slots[SYMMETRY_SLOTS[square]] = EMPTY_SLOT if mirrored else codes[square]
+      self.symmetry = SplicedCodes(slots)
+
+  def push(self, move):
+    """ Pushes a move onto the board and updates the encodings. Returns the changed squares. """
+    self.board.push(move)
+    state = get_board_state(self.board)
+    changed = 0
+    for before, after in zip(self.state, state):
+      changed |= before ^ after
+    self.state = state
+    self.metadata = board_metadata(self.board)
+    squares = list(chess.scan_forward(changed))
+    for square in squares:
+      self.set_square(square)
+    if "symmetry" in self.schemes:
+      self.update_mirror_files(squares)
+    return squares
+
+  def set_square(self, square):
+    piece = self.board.piece_at(square)
+    symbol = piece.symbol() if piece else "s"
+    self.symbols[square] = symbol
+    code = HUFFMAN_CODE_BITS[symbol]
+    if "huffman" in self.schemes:
+      self.huffman.set(square, code)
+    if "default" in self.schemes:
+      bit = 1 << (63 - square)
+      if symbol == DEFAULT_SYMBOLS[square]:
+        self.default_mask |= bit
+        self.default.set(square, EMPTY_SLOT)
+      else:
+        self.default_mask &= ~bit
+        self.default.set(square, code)
+    if "symmetry" in self.schemes:
+      if square < 32 or not self.mirror_mask & (0x80 >> (square & 7)):
+        self.symmetry.set(SYMMETRY_SLOTS[square], code)
+
+  def update_mirror_files(self, squares):
+    """ Rechecks the mirroring of the files of squares, filling or emptying the upper squares of files that changed. """
+    for file_index in {square & 7 for square in squares}:
+      file_bit = 0x80 >> file_index
+      mirrored = is_file_mirrored_in_symbols(self.symbols, file_index)
+      if mirrored == bool(self.mirror_mask & file_bit):
+        continue
+      self.mirror_mask ^= file_bit
+      for rank_index in range(4, 8):
+        square = chess.square(file_index, rank_index)
+        self.symmetry.set(SYMMETRY_SLOTS[square], EMPTY_SLOT if mirrored else HUFFMAN_CODE_BITS[self.symbols[square]])
+
+  def encode(self, scheme="huffman", writer=None):
+    """ Returns a BitWriter of the current position encoded with the scheme. """
+    if scheme not in self.schemes:
+      raise ValueError("The encoder doesn't keep scheme {}, only {}.".format(scheme, self.schemes))
+    if writer is None:
+      writer = BitWriter()
+    writer.extend(self.metadata)
+    if scheme == "huffman":
+      return self.huffman.write(writer)
+    if scheme == "default":
+      writer.write(self.default_mask, 64)
+      return self.default.write(writer)
+    writer.write(self.mirror_mask, 8)
+    return self.symmetry.write(writer)
+
+  def sizes(self):
+    """ Returns {scheme: number of bits} of the current position. """
+    sizes = {}
+    if "huffman" in self.schemes:
+      sizes["huffman"] = len(self.metadata) + self.huffman.length
+    if "symmetry" in self.schemes:
+      sizes["symmetry"] = len(self.metadata) + 8 + self.symmetry.length
+    if "default" in self.schemes:
+      sizes["default"] = len(self.metadata) + 64 + self.default.length
+    return sizes
+
+def encode_game_positions(game, scheme="huffman"):
+  """ Returns BitWriters of every position of the game's mainline, starting with the initial position. """
+  encoder = IncrementalEncoder(game.board(), (scheme,))
+  encodings = [encoder.encode(scheme)]
+  for move in game.mainline_moves():
+    encoder.push(move)
+    encodings.append(encoder.encode(scheme))
+  return encodings
+
+if __name__ == "__main__":
+  from .huffman_default import encode_board_to_huffman_default
+  board = chess.Board()
+  encoder = IncrementalEncoder(board)
+  for move in ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "e1g1"]:
+    print(move, "changed", encoder.push(chess.Move.from_uci(move)), encoder.sizes())
+    board.push_uci(move)
+    assert encoder.encode("default") == encode_board_to_huffman_default(board)
@@ -0,0 +1,135 @@
+
+"""
+Opt-in counters and cumulative timers for the encoding pipeline.
+Disabled by default: instrumented code only checks ENABLED, so the cost when disabled is one attribute lookup
+per stage. Once enabled, every stage counts its calls and adds up its time under a dotted name, e.g.
+  best.metadata         board_metadata in choose_best_huffman_encoding.analyse_board
+  best.write.symmetry   writing the symmetry encoding after best-of picked it
+  best.wins.symmetry    (count only) times best-of picked the symmetry encoding
+  encode.huffman        whole calls of huffman.encode_board_to_huffman
+Counts and times are per process, so each worker of parallel_ingest keeps its own. Within a process, updates,
+snapshots and resets hold LOCK, so threads (e.g. of encoding_service) don't lose counts.
+"""
+
+import threading
+from functools import wraps
+from time import perf_counter
+
+ENABLED = False
+# Name -> number of calls or events.
+COUNTS = {}
+# Name -> cumulative seconds.
+TIMES = {}
+LOCK = threading.Lock()
+
+def enable():
+  global ENABLED
+  ENABLED = True
+
+def disable():
+  global ENABLED
+  ENABLED = False
+
+def reset():
+  with LOCK:
+    COUNTS.clear()
+    TIMES.clear()
+
+def increment(name, amount=1):
+  """ Adds amount to the counter name. """
+  with LOCK:
+    COUNTS[name] = COUNTS.get(name, 0) + amount
+
+def record(name, start):
+  """
+  Counts a call of the stage name that started at start (a time.perf_counter value) and adds its time.
+  Returns the current time, so consecutive stages can be timed with one perf_counter call each:
+    start = perf_counter()
+    ...
+    start = record("first", start)
+    ...
+    start = record("second", start)
+  """
+  now = perf_counter()
+  with LOCK:
+    COUNTS[name] = COUNTS.get(name, 0) + 1
+    TIMES[name] = TIMES.get(name, 0.0) + now - start
+  return now
+
+def instrumented(name):
+  """ Decorator counting and timing the calls of a function under name while instrumentation is enabled. """
+  def decorator(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+      if not ENABLED:
+        return fn(*args, **kwargs)
+      start = perf_counter()
+      try:
+        return fn(*args, **kwargs)
+      finally:
+        record(name, start)
+    return wrapper
+  return decorator
+
+def snapshot(reset=False):
+  """
+  Returns {"counters": {name: count}, "timers": {name: seconds}} of everything recorded so far.
+  With reset, also resets the counts and times, so nothing recorded between the copy and the reset is lost.
+  """
+  with LOCK:
+    metrics = {"counters": dict(COUNTS), "timers": dict(TIMES)}
+    if reset:
+      COUNTS.clear()
+      TIMES.clear()
+  return metrics
+
+class PeriodicExporter:
+  """
+  Calls export(snapshot()) every interval seconds from a daemon thread, e.g. to push to a metrics system.
+  With reset_after, the counts and times are reset after every export, so each export holds one interval.
+  """
+
+  def __init__(self, export, interval=10.0, reset_after=False):
+    self.export = export
+    self.interval = interval
+    self.reset_after = reset_after
+    self.stopped = threading.Event()
+    self.thread = threading.Thread(target=self.run, daemon=True)
+
+  def run(self):
+    while not self.stopped.wait(self.interval):
+      self.export_now()
+
+  def export_now(self):
+    self.export(snapshot(reset=self.reset_after))
+
+  def start(self):
+    self.thread.start()
+    return self
+
+  def stop(self):
+    """ Stops the thread, exporting once more so nothing recorded is lost. """
+    self.stopped.set()
+    self.thread.join()
+    self.export_now()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, *exc_info):
+    self.stop()
+
+if __name__ == "__main__":
+  import chess
+  # Running as a script, this module is __main__, so use the instrumentation module the encoders import.
+  from . import instrumentation
+  from .choose_best_huffman_encoding import encode_board_to_huffman_best_opt
+  instrumentation.enable()
+  board = chess.Board()
+  for move in ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"]:
+    board.push_uci(move)
+    encode_board_to_huffman_best_opt(board)
+  metrics = instrumentation.snapshot()
+  for name, seconds in sorted(metrics["timers"].items()):
+    print("{:24} {:3} calls {:10.6f} s".format(name, metrics["counters"][name], seconds))
+  print({name: count for name, count in metrics["counters"].items() if name not in metrics["timers"]})
@@ -0,0 +1,77 @@
+
+import os
+import random 
+import chess.pgn 
+
+# Environment variable holding the default PGN path. 
+PGN_PATH_VARIABLE = "CHESS_PGN_PATH"
+
+def get_default_pgn_path():
+  """ 
+  Returns the PGN path used when none is given: $CHESS_PGN_PATH, or else path from an env.py on the import path. 
+  Looked up on first use, so importing this module needs neither. 
+  """ 
+  if PGN_PATH_VARIABLE in os.environ:
+    return os.environ[PGN_PATH_VARIABLE]
+  try:
+    from env import path
+  except ImportError as e:
+    raise ValueError("No PGN path given. Set {} or add an env.py defining path.".format(PGN_PATH_VARIABLE)) from e
+  return path
+
+def iter_games(n=None, pgn_path=None):
+  """ 
+  Yields the first n games (all games if n is None), one at a time. 
+  The PGN file is closed once the generator finishes or is closed. 
+  """ 
+  with open(pgn_path or get_default_pgn_path()) as pgn:
+    count = 0
+    while n is None or count < n:
+      game = chess.pgn.read_game(pgn)
+      if game is None:
+        return
+      yield game
+      count += 1
+
+def iter_positions(n=None, factor=0, pgn_path=None, rng=random):
+  """ 
+  Yields up to n positions (all positions if n is None), one at a time. 
+  Factor is the chance of a given position being used, as in load_random_positions; 0 yields every position. 
+  Positions are copied without their move stack, so memory use stays bounded however long the games are. 
+  Can be piped straight into the encoders, e.g. (encode_board_to_huffman_best_opt(board) for board in iter_positions()). 
+  """ 
+  count = 0
+  for game in iter_games(pgn_path=pgn_path):
+    board = game.board()
+    for move in game.mainline_moves():
+      board.push(move)
+      if factor and rng.randint(0, factor) != 0:
+        continue
+      yield board.copy(stack=False)
+      count += 1
+      if n is not None and count >= n:
+        return
+
+def load_random_positions(n=1000, factor=100, unique=False, rng=random):
+  """ 
+  Loads n random positions. 
+  Factor is the chance of a given position being used. 
+  Pass a seeded rng (e.g. random.Random(0)) for the same positions every time. 
+  """ 
+  positions = list(iter_positions(n, factor, rng=rng))
+  if unique:
+    from .position_store import unique_positions
+    return unique_positions(positions)
+  return positions, len(positions) 
+
+def load_positions(n=1000):
+  """ Loads first n positions. """ 
+  return list(iter_positions(n))
+
+def load_games(n=1000):
+  """ Loads first n games. """ 
+  return list(iter_games(n))
+
+if __name__ == "__main__":
+  for pos in iter_positions(1000):
+    print(pos)
@@ -0,0 +1,91 @@
+
+"""
+Load generator for encoding_service.py.
+Runs a number of concurrent clients, each sending its share of requests one after another, and reports
+throughput and p50/p99 latency. Positions come from a benchmark corpus (see benchmark.py) or, without one, from
+seeded random games.
+Usage:
+  python -m chess_position_compression.load_generator [--port 8765] [--unix path] [--clients 32] [--requests 5000] [--corpus corpus.json]
+                                                      [--decode] [--serve]
+With --serve, the service is started in the same process, which is handy but shares its CPU with the clients.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import chess
+from .encoding_service import EncodingClient, start_service, DEFAULT_PORT
+
+def random_fens(n, seed=0, max_plies=80):
+  """ Returns n FENs of positions reached by random moves from the starting position. """
+  rng = random.Random(seed)
+  fens = []
+  while len(fens) < n:
+    board = chess.Board()
+    for _ in range(rng.randint(0, max_plies)):
+      moves = list(board.legal_moves)
+      if not moves:
+        break
+      board.push(rng.choice(moves))
+    fens.append(board.fen())
+  return fens
+
+def percentile(sorted_values, fraction):
+  return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def run_client(fens, latencies, decode, host, port, unix_path):
+  client = await EncodingClient.connect(host, port, unix_path)
+  try:
+    for fen in fens:
+      start = time.perf_counter()
+      data, length = await client.encode(fen)
+      if decode:
+        await client.decode(data, length)
+      latencies.append(time.perf_counter() - start)
+  finally:
+    await client.close()
+
+async def generate_load(fens, clients=32, decode=False, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+  """ Sends every FEN, split between the clients. Returns {"requests", "seconds", "per_second", "p50_ms", "p99_ms"}. """
+  latencies = []
+  start = time.perf_counter()
+  await asyncio.gather(*[run_client(fens[index::clients], latencies, decode, host, port, unix_path) for index in range(clients)])
+  seconds = time.perf_counter() - start
+  latencies.sort()
+  return {
+    "requests": len(latencies),
+    "seconds": seconds,
+    "per_second": len(latencies) / seconds,
+    "p50_ms": percentile(latencies, 0.5) * 1000,
+    "p99_ms": percentile(latencies, 0.99) * 1000
+  }
+
+async def main(args):
+  if args.corpus:
+    from .benchmark import load_corpus
+    fens = [board.fen() for board in load_corpus(args.corpus)]
+    fens = (fens * (args.requests // len(fens) + 1))[:args.requests]
+  else:
+    fens = random_fens(args.requests, args.seed)
+  if args.serve:
+    server, batcher_task = await start_service(args.host, args.port, args.unix)
+  results = await generate_load(fens, args.clients, args.decode, args.host, args.port, args.unix)
+  if args.serve:
+    server.close()
+    batcher_task.cancel()
+  print(json.dumps(results, indent=1))
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Measures latency and throughput of the encoding service.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+  parser.add_argument("--unix", default=None)
+  parser.add_argument("--clients", type=int, default=32)
+  parser.add_argument("--requests", type=int, default=5000)
+  parser.add_argument("--corpus", default=None)
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--decode", action="store_true", help="Also decode every encoding, in the same request timing.")
+  parser.add_argument("--serve", action="store_true", help="Start the service in this process.")
+  asyncio.run(main(parser.parse_args()))
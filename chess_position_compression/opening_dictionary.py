@@ -0,0 +1,127 @@
+
+"""
+Opening dictionary encoding.
+The most frequent positions of a corpus (mostly well-known opening lines) are stored in a codebook
+(see codebook.py) as the "opening_positions" table of {index: EPD}. A position in the dictionary is encoded as
+just its index, written with enough bits for the dictionary size. Encoding is one dict lookup and decoding one
+list lookup. Positions that aren't in the dictionary can't be encoded, so the scheme is only used through
+choose_best_huffman_encoding, with codebooks that hold a dictionary.
+Format: [dictionary index]
+"""
+
+from collections import Counter
+import chess
+from .instrumentation import instrumented
+from .bitstream import BitWriter, BitReader, as_reader
+from .utility import board_metadata, get_square_symbols, read_board_metadata, board_from_symbols
+from .codebook import BUILTIN_CODEBOOK_ID, load_codebook, extend_codebook, register_codebook_cache
+
+DEFAULT_DICTIONARY_SIZE = 4096
+
+def get_position_key(metadata, symbols):
+  """ Returns the dictionary key of a position from its board metadata bits and the symbol of every square. """
+  return metadata.value, metadata.length, "".join(symbols)
+
+def get_board_key(board):
+  return get_position_key(board_metadata(board), get_square_symbols(board))
+
+class OpeningDictionary:
+  """ The positions of a dictionary, with their keys and decoded forms. """
+
+  def __init__(self, epds):
+    self.indices = {}
+    # Index -> (metadata, symbols) as read_board_from_opening_dictionary returns them.
+    self.positions = []
+    for epd in epds:
+      board = chess.Board()
+      board.set_epd(epd)
+      metadata = board_metadata(board)
+      symbols = get_square_symbols(board)
+      self.indices[get_position_key(metadata, symbols)] = len(self.positions)
+      self.positions.append((read_board_metadata(BitReader.from_writer(metadata)), symbols))
+    # Number of bits of an index.
+    self.index_bits = (len(self.positions) - 1).bit_length()
+
+  def __len__(self):
+    return len(self.positions)
+
+# Codebook id -> OpeningDictionary.
+OPENING_DICTIONARIES = register_codebook_cache({})
+
+def has_opening_dictionary(codebook_id):
+  """ Returns if the codebook holds an opening dictionary. """
+  if codebook_id == BUILTIN_CODEBOOK_ID:
+    return False
+  return "opening_positions" in load_codebook(codebook_id)
+
+def get_opening_dictionary(codebook_id):
+  if codebook_id not in OPENING_DICTIONARIES:
+    if not has_opening_dictionary(codebook_id):
+      raise ValueError("Codebook {} has no opening dictionary.".format(codebook_id))
+    table = load_codebook(codebook_id)["opening_positions"]
+    OPENING_DICTIONARIES[codebook_id] = OpeningDictionary([table[index] for index in range(len(table))])
+  return OPENING_DICTIONARIES[codebook_id]
+
+@instrumented("encode.dictionary")
+def encode_board_to_opening_dictionary(board, writer=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Format: [dictionary index]
+  Returns a BitWriter. Raises ValueError if the position isn't in the dictionary.
+  """
+  if writer is None:
+    writer = BitWriter()
+  return write_opening_dictionary(board_metadata(board), get_square_symbols(board), writer, codebook_id)
+
+def write_opening_dictionary(metadata, symbols, writer, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Writes the encoding from board metadata bits and the symbol of every square. Returns writer. """
+  dictionary = get_opening_dictionary(codebook_id)
+  index = dictionary.indices.get(get_position_key(metadata, symbols))
+  if index is None:
+    raise ValueError("The position isn't in the opening dictionary of codebook {}.".format(codebook_id))
+  return writer.write(index, dictionary.index_bits)
+
+def opening_dictionary_size(metadata, symbols, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Returns the number of bits write_opening_dictionary would write, or None if the position isn't in the dictionary. """
+  dictionary = get_opening_dictionary(codebook_id)
+  if get_position_key(metadata, symbols) not in dictionary.indices:
+    return None
+  return dictionary.index_bits
+
+def read_board_from_opening_dictionary(reader, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Reads an encoding from encode_board_to_opening_dictionary. Returns (metadata, symbols). """
+  dictionary = get_opening_dictionary(codebook_id)
+  index = reader.read(dictionary.index_bits)
+  if index >= len(dictionary):
+    raise ValueError("Dictionary index {} out of range for {} positions.".format(index, len(dictionary)))
+  metadata, symbols = dictionary.positions[index]
+  return metadata, list(symbols)
+
+def decode_board_from_opening_dictionary(bits, length=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Decodes bits (see bitstream.as_reader) from encode_board_to_opening_dictionary.
+  Returns a chess.Board.
+  """
+  metadata, symbols = read_board_from_opening_dictionary(as_reader(bits, length), codebook_id)
+  return board_from_symbols(symbols, metadata)
+
+def count_positions(boards):
+  """ Returns a Counter of the EPDs (with the en passant square only if it's legal) of boards. """
+  return Counter(board.epd(en_passant="legal") for board in boards)
+
+def train_opening_dictionary(boards, codebook_id, base_codebook_id=BUILTIN_CODEBOOK_ID, size=DEFAULT_DICTIONARY_SIZE, min_count=2):
+  """
+  Saves the (up to) size most frequent positions of boards that occur at least min_count times as the opening
+  dictionary of the new codebook codebook_id, along with the tables of codebook base_codebook_id (see
+  codebook.extend_codebook). Returns the path.
+  """
+  epds = [epd for epd, count in count_positions(boards).most_common(size) if count >= min_count]
+  if not epds:
+    raise ValueError("No position occurs {} times.".format(min_count))
+  return extend_codebook(base_codebook_id, codebook_id, {"opening_positions": dict(enumerate(epds))})
+
+if __name__ == "__main__":
+  import sys
+  from .load_games import iter_positions
+  codebook_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+  base_codebook_id = int(sys.argv[2]) if len(sys.argv) > 2 else BUILTIN_CODEBOOK_ID
+  print("Saved", train_opening_dictionary(iter_positions(), codebook_id, base_codebook_id))
@@ -0,0 +1,116 @@
+
+"""
+Parallel ingestion of large PGN files.
+The file is split into byte ranges that start at game boundaries, each range is parsed and encoded in a
+process pool, and the results are merged back in file order, so the output is the same as a serial pass.
+"""
+
+import io
+import os
+import chess.pgn
+from multiprocessing import Pool
+from .choose_best_huffman_encoding import encode_board_to_huffman_best_opt
+
+SHARD_SIZE = 64 * 1024 * 1024
+# Bytes read at a time when reading a line backwards.
+BLOCK_SIZE = 256
+
+def is_blank(line):
+  return line.strip() == b""
+
+def follows_blank_line(pgn, line_start):
+  """
+  Returns if the line starting at byte offset line_start of the binary file pgn follows a blank line
+  (or starts the file). The line before is read backwards in blocks, so a long line isn't read whole.
+  """
+  end = line_start - 1
+  while end > 0:
+    start = max(0, end - BLOCK_SIZE)
+    pgn.seek(start)
+    block = pgn.read(end - start)
+    previous_start = block.rfind(b"\n") + 1
+    if not is_blank(block[previous_start:]):
+      return False
+    if previous_start > 0:
+      return True
+    end = start
+  return True
+
+def find_game_start(pgn, offset):
+  """
+  Returns the byte offset of the first game that starts at or after offset in the binary file pgn,
+  or the file size if there is none.
+  A game starts at a tag line ("[...") that follows a blank line, so the tag lines inside a header aren't game starts.
+  """
+  if offset == 0:
+    return 0
+  # Starting one byte early, so a game starting exactly at offset is found.
+  pgn.seek(offset - 1)
+  pgn.readline()
+  position = pgn.tell()
+  previous_blank = follows_blank_line(pgn, position)
+  pgn.seek(position)
+  while True:
+    line = pgn.readline()
+    if not line or (line.startswith(b"[") and previous_blank):
+      return position
+    previous_blank = is_blank(line)
+    position += len(line)
+
+def find_shard_boundaries(pgn_path, num_shards=None):
+  """
+  Splits the file into about num_shards byte ranges starting at game boundaries.
+  If num_shards is None, uses ranges of about SHARD_SIZE bytes.
+  Returns a list of (start, end) byte offsets.
+  """
+  size = os.path.getsize(pgn_path)
+  if num_shards is None:
+    num_shards = max(1, size // SHARD_SIZE)
+  with open(pgn_path, "rb") as pgn:
+    boundaries = sorted(set([find_game_start(pgn, size * index // num_shards) for index in range(num_shards)] + [size]))
+  return list(zip(boundaries[:-1], boundaries[1:]))
+
+def encode_shard(args):
+  """
+  Parses the games in one byte range and encodes every position.
+  Returns a list of (encoding bytes, number of bits) in file order.
+  """
+  pgn_path, start, end, encode_fn = args
+  with open(pgn_path, "rb") as pgn:
+    pgn.seek(start)
+    text = pgn.read(end - start).decode("utf-8", errors="replace")
+  stream = io.StringIO(text)
+  encodings = []
+  while True:
+    game = chess.pgn.read_game(stream)
+    if game is None:
+      return encodings
+    board = game.board()
+    for move in game.mainline_moves():
+      board.push(move)
+      bits = encode_fn(board)
+      encodings.append((bits.to_bytes(), len(bits)))
+
+def iter_ingest(pgn_path, encode_fn=encode_board_to_huffman_best_opt, processes=None, num_shards=None):
+  """
+  Encodes every position of every game in the PGN file using a process pool.
+  encode_fn must be a module level function (so it can be pickled) returning a BitWriter.
+  Yields one list of (encoding bytes, number of bits) per shard, in file order.
+  """
+  shards = [(pgn_path, start, end, encode_fn) for start, end in find_shard_boundaries(pgn_path, num_shards)]
+  with Pool(processes) as pool:
+    for encodings in pool.imap(encode_shard, shards):
+      yield encodings
+
+def ingest(pgn_path, encode_fn=encode_board_to_huffman_best_opt, processes=None, num_shards=None):
+  """ Returns a list of (encoding bytes, number of bits) for every position, in file order. See iter_ingest. """
+  return [encoding for encodings in iter_ingest(pgn_path, encode_fn, processes, num_shards) for encoding in encodings]
+
+if __name__ == "__main__":
+  import sys
+  import time
+  start_time = time.time()
+  encodings = ingest(sys.argv[1])
+  print("Positions:", len(encodings))
+  print("Average bytes:", sum([length for _, length in encodings]) / max(1, len(encodings)) / 8)
+  print("Seconds:", time.time() - start_time)
@@ -0,0 +1,150 @@
+
+"""
+On-disk lookup index from position keys to position ids of a container (see container.py).
+An index file is a sorted array of 64-bit keys and the matching array of position ids:
+  [header] [key 0] [key 1] ... [id 0] [id 1] ...
+  The header is 16 bytes: magic "CPIX", format version (u8), key kind (u8), 2 reserved bytes, number of entries (u64).
+  Keys and ids are u64, keys in ascending order (ids ascending between equal keys).
+The file is memory-mapped (see container.map_file) and searched with np.searchsorted, so a lookup is a binary
+search over the mapped keys without loading the index. Keys are either
+  zobrist   the board's Zobrist hash, with the en passant square only if the capture is legal, as the encodings
+            store it (see utility.zobrist_key)
+  encoding  the first 8 bytes of the BLAKE2b hash of the packed encoding and its number of bits, which can be
+            built from a container without decoding any position
+Different positions can share a key, so find_position checks the candidates' encodings.
+"""
+
+import hashlib
+import os
+import struct
+import numpy as np
+import chess
+from .utility import zobrist_key
+from .registry import get_scheme
+from .container import ContainerReader, map_file
+
+MAGIC = b"CPIX"
+VERSION = 1
+HEADER = struct.Struct("<4sBB2xQ")
+KEY_KINDS = {"zobrist": 0, "encoding": 1}
+KEY_KIND_NAMES = {kind: name for name, kind in KEY_KINDS.items()}
+
+def encoding_key(encoding, length):
+  """ Returns the key of packed encoding bytes holding length bits. """
+  digest = hashlib.blake2b(bytes(encoding), digest_size=8)
+  digest.update(length.to_bytes(2, "little"))
+  return int.from_bytes(digest.digest(), "little")
+
+def index_file_path(path):
+  return path + ".pidx"
+
+class PositionIndex:
+  """ Sorted keys and their position ids, in memory or memory-mapped from an index file. """
+
+  def __init__(self, keys, ids, key_kind="zobrist"):
+    if key_kind not in KEY_KINDS:
+      raise ValueError("Unknown key kind {}, expected one of {}.".format(key_kind, list(KEY_KINDS)))
+    self.keys = keys
+    self.ids = ids
+    self.key_kind = key_kind
+
+  @classmethod
+  def build(cls, keys, ids=None, key_kind="zobrist"):
+    """ Builds an index from keys in any order, with ids (position i if None). """
+    keys = np.asarray(keys, dtype=np.uint64)
+    ids = np.arange(len(keys), dtype=np.uint64) if ids is None else np.asarray(ids, dtype=np.uint64)
+    if len(keys) != len(ids):
+      raise ValueError("Got {} keys for {} ids.".format(len(keys), len(ids)))
+    order = np.lexsort((ids, keys))
+    return cls(keys[order], ids[order], key_kind)
+
+  def __len__(self):
+    return len(self.keys)
+
+  def find(self, key):
+    """ Returns the ids of the positions with the key, as an array. """
+    key = np.uint64(key)
+    return self.ids[self.keys.searchsorted(key, "left"):self.keys.searchsorted(key, "right")]
+
+  def __contains__(self, key):
+    key = np.uint64(key)
+    start = self.keys.searchsorted(key)
+    return start < len(self.keys) and self.keys[start] == key
+
+  def find_many(self, keys):
+    """ Returns (start, end) arrays: the ids of keys[i] are ids[start[i]:end[i]]. """
+    keys = np.asarray(keys, dtype=np.uint64)
+    return self.keys.searchsorted(keys, "left"), self.keys.searchsorted(keys, "right")
+
+  def duplicate_groups(self):
+    """ Returns a list of id arrays, one for every key held by more than one position. """
+    if len(self.keys) < 2:
+      return []
+    same = self.keys[1:] == self.keys[:-1]
+    # Starts and ends of the runs of equal keys.
+    starts = np.flatnonzero(same & ~np.concatenate(([False], same[:-1])))
+    ends = np.flatnonzero(same & ~np.concatenate((same[1:], [False]))) + 2
+    return [self.ids[start:end] for start, end in zip(starts, ends)]
+
+  def save(self, path):
+    with open(path, "wb") as f:
+      f.write(HEADER.pack(MAGIC, VERSION, KEY_KINDS[self.key_kind], len(self.keys)))
+      f.write(np.ascontiguousarray(self.keys, dtype="<u8").tobytes())
+      f.write(np.ascontiguousarray(self.ids, dtype="<u8").tobytes())
+
+  @classmethod
+  def load(cls, path):
+    """ Maps an index file written by save. """
+    with open(path, "rb") as f:
+      magic, version, key_kind, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+      raise ValueError("{} is not a position index.".format(path))
+    if version != VERSION:
+      raise ValueError("Unsupported position index version {}.".format(version))
+    mapped = map_file(path)
+    keys = np.frombuffer(mapped, dtype="<u8", count=count, offset=HEADER.size)
+    ids = np.frombuffer(mapped, dtype="<u8", count=count, offset=HEADER.size + 8 * count)
+    return cls(keys, ids, KEY_KIND_NAMES[key_kind])
+
+def get_container_keys(reader, key_kind="zobrist"):
+  """ Returns the keys of every position of a ContainerReader, in position id order. """
+  keys = np.zeros(len(reader), dtype=np.uint64)
+  for position_id in range(len(reader)):
+    if key_kind == "encoding":
+      keys[position_id] = encoding_key(*reader.get_bits(position_id))
+    else:
+      keys[position_id] = zobrist_key(reader.get_board(position_id))
+  return keys
+
+def build_container_index(path, key_kind="zobrist", index_path=None):
+  """ Indexes every position of the container at path and saves the index to index_path (<path>.pidx if None). Returns the index. """
+  with ContainerReader(path) as reader:
+    index = PositionIndex.build(get_container_keys(reader, key_kind), key_kind=key_kind)
+  index.save(index_path or index_file_path(path))
+  return index
+
+def get_board_key(board, key_kind, scheme, codebook_id):
+  """ Returns (key, (encoding bytes, number of bits)) of a board in a container with the scheme and codebook. """
+  bits = get_scheme(scheme).encode_board(board, codebook_id)
+  encoding = (bits.to_bytes(), len(bits))
+  if key_kind == "encoding":
+    return encoding_key(*encoding), encoding
+  return zobrist_key(board), encoding
+
+def find_position(index, reader, board):
+  """ Returns the position id of the board in the container of reader (which index indexes), or None if it isn't there. """
+  key, encoding = get_board_key(board, index.key_kind, reader.scheme, reader.codebook_id)
+  for position_id in index.find(key):
+    if reader.get_bits(int(position_id)) == encoding:
+      return int(position_id)
+  return None
+
+if __name__ == "__main__":
+  import sys
+  path = sys.argv[1] if len(sys.argv) > 1 else "positions.cpc"
+  if not os.path.exists(index_file_path(path)):
+    print("Indexed", len(build_container_index(path)), "positions")
+  index = PositionIndex.load(index_file_path(path))
+  with ContainerReader(path) as reader:
+    for fen in sys.argv[2:] or [chess.STARTING_FEN]:
+      print(fen, "->", find_position(index, reader, chess.Board(fen)))
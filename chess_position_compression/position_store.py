@@ -0,0 +1,137 @@
+
+"""
+Deduplicating store of positions.
+Positions are keyed by their Zobrist hash (see utility.zobrist_key), with the encodings compared on
+a hash match so that hash collisions can't merge different positions. Each unique position is encoded and
+kept exactly once, and games are stored as lists of position ids.
+"""
+
+import struct
+import chess
+from .utility import zobrist_key
+from .container import ContainerWriter, ContainerReader
+from .choose_best_huffman_encoding import encode_board_to_huffman_best_opt
+
+GAME_LENGTH = struct.Struct("<I")
+
+def games_path(path):
+  return path + ".games"
+
+def same_position(board, other):
+  """ Returns if the boards have the same pieces, turn, castling rights and legal en passant square. """
+  return (
+    board.occupied_co[chess.WHITE] == other.occupied_co[chess.WHITE] and
+    board.occupied_co[chess.BLACK] == other.occupied_co[chess.BLACK] and
+    board.pawns == other.pawns and board.knights == other.knights and board.bishops == other.bishops and
+    board.rooks == other.rooks and board.queens == other.queens and board.kings == other.kings and
+    board.turn == other.turn and
+    board.clean_castling_rights() == other.clean_castling_rights() and
+    (board.ep_square if board.has_legal_en_passant() else None) == (other.ep_square if other.has_legal_en_passant() else None)
+  )
+
+def unique_positions(boards):
+  """ Returns the boards with repeated positions (see same_position) removed, keeping the first of each. """
+  seen = {}
+  positions = []
+  for board in boards:
+    same_hash = seen.setdefault(zobrist_key(board), [])
+    if any(same_position(board, other) for other in same_hash):
+      continue
+    same_hash.append(board)
+    positions.append(board)
+  return positions
+
+class PositionStore:
+  """
+  Hash-consed positions: every unique position gets one position id and one stored encoding.
+  Encodings use choose_best_huffman_encoding.encode_board_to_huffman_best_opt.
+  """
+
+  def __init__(self):
+    # Zobrist hash -> ids of the positions with that hash (more than one only on a collision).
+    self.ids_by_hash = {}
+    # Position id -> (encoding bytes, number of bits).
+    self.encodings = []
+    # Game -> list of position ids.
+    self.games = []
+
+  def __len__(self):
+    return len(self.encodings)
+
+  def add(self, board):
+    """ Returns the position id of the board, storing it if it hasn't been seen. """
+    bits = encode_board_to_huffman_best_opt(board)
+    encoding = (bits.to_bytes(), len(bits))
+    same_hash = self.ids_by_hash.setdefault(zobrist_key(board), [])
+    for position_id in same_hash:
+      if self.encodings[position_id] == encoding:
+        return position_id
+    self.encodings.append(encoding)
+    same_hash.append(len(self.encodings) - 1)
+    return len(self.encodings) - 1
+
+  def find(self, board):
+    """ Returns the position id of the board, or None if it isn't stored. """
+    same_hash = self.ids_by_hash.get(zobrist_key(board))
+    if not same_hash:
+      return None
+    bits = encode_board_to_huffman_best_opt(board)
+    encoding = (bits.to_bytes(), len(bits))
+    for position_id in same_hash:
+      if self.encodings[position_id] == encoding:
+        return position_id
+    return None
+
+  def add_game(self, game):
+    """
+    Stores every position of the game's mainline, starting with the initial position.
+    Returns the game's index.
+    """
+    board = game.board()
+    position_ids = [self.add(board)]
+    for move in game.mainline_moves():
+      board.push(move)
+      position_ids.append(self.add(board))
+    self.games.append(position_ids)
+    return len(self.games) - 1
+
+  def save(self, path):
+    """
+    Writes the unique positions to a container at path (see container.py) in position id order,
+    and the games to <path>.games as a u32 length followed by u32 position ids per game.
+    """
+    with ContainerWriter(path, scheme="best") as writer:
+      if writer.count:
+        raise ValueError("{} already holds positions.".format(path))
+      for encoding, length in self.encodings:
+        writer.append_encoding(encoding, length)
+    with open(games_path(path), "wb") as games:
+      for position_ids in self.games:
+        games.write(GAME_LENGTH.pack(len(position_ids)))
+        games.write(struct.pack("<{}I".format(len(position_ids)), *position_ids))
+
+  @classmethod
+  def load(cls, path):
+    """ Reads a store written by save. """
+    store = cls()
+    with ContainerReader(path) as reader:
+      for position_id in range(len(reader)):
+        store.encodings.append(reader.get_bits(position_id))
+        store.ids_by_hash.setdefault(zobrist_key(reader.get_board(position_id)), []).append(position_id)
+    with open(games_path(path), "rb") as games:
+      data = games.read()
+    offset = 0
+    while offset < len(data):
+      (length,) = GAME_LENGTH.unpack_from(data, offset)
+      offset += GAME_LENGTH.size
+      store.games.append(list(struct.unpack_from("<{}I".format(length), data, offset)))
+      offset += 4 * length
+    return store
+
+if __name__ == "__main__":
+  from .load_games import iter_games
+  store = PositionStore()
+  total = 0
+  for game in iter_games(100):
+    total += len(store.games[store.add_game(game)])
+  print("Positions:", total, "Unique:", len(store))
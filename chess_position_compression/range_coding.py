@@ -0,0 +1,230 @@
+
+"""
+Context-modelled arithmetic coding of positions.
+Squares are scanned in the same order as huffman.encode_board_to_huffman, but each symbol is arithmetic coded
+with probabilities conditioned on its context: the square itself and whether the squares to its west and
+south (already decoded) are occupied. This spends fractions of a bit on frequent symbols, such as empty
+squares and pawns, where a Huffman code has to spend at least one whole bit.
+The context model is trained from a corpus and stored in a codebook (see codebook.py) as the "context_model" table.
+Format: [board metadata] [arithmetic coded squares]
+"""
+
+import chess
+from .instrumentation import instrumented
+from .bitstream import BitWriter, as_reader
+from .utility import HUFFMAN_CODES, board_metadata, get_square_symbols, read_board_metadata, board_from_symbols
+from .codebook import BUILTIN_CODEBOOK_ID, load_codebook, register_codebook_cache, count_piececentric_symbols, train_code, save_codebook, DEFAULT_MAX_LENGTH
+
+SYMBOLS = list(HUFFMAN_CODES)
+SYMBOL_INDICES = {symbol: index for index, symbol in enumerate(SYMBOLS)}
+NUMBER_OF_CONTEXTS = 64 * 4
+
+# Coder precision. Frequency totals must stay well below QUARTER so every symbol keeps a nonempty range.
+PRECISION = 32
+WHOLE = 1 << PRECISION
+HALF = WHOLE >> 1
+QUARTER = WHOLE >> 2
+MAX_TOTAL = 1 << 16
+
+def get_context(symbols, square):
+  """ Returns the context of square: the square, and if its west and south neighbours are occupied. """
+  west = square & 7 and symbols[square - 1] != "s"
+  south = square >= 8 and symbols[square - 8] != "s"
+  return square * 4 + (2 if west else 0) + (1 if south else 0)
+
+def build_model(freqs):
+  """
+  Builds a model from a list of NUMBER_OF_CONTEXTS lists of symbol frequencies (in SYMBOLS order).
+  Frequencies are scaled to a total of at most MAX_TOTAL, keeping every symbol at least 1.
+  Returns a list of (cumulative frequencies, total) per context.
+  """
+  model = []
+  for context_freqs in freqs:
+    total = sum(context_freqs)
+    scaled = [max(1, freq * (MAX_TOTAL - len(SYMBOLS)) // total) for freq in context_freqs]
+    cumulative = [0]
+    for freq in scaled:
+      cumulative.append(cumulative[-1] + freq)
+    model.append((cumulative, cumulative[-1]))
+  return model
+
+# Without a trained model, every context uses the probabilities implied by the Huffman code lengths.
+PRIOR_MODEL = build_model([[1 << (16 - len(HUFFMAN_CODES[symbol])) for symbol in SYMBOLS]] * NUMBER_OF_CONTEXTS)
+
+# Codebook id -> model.
+CONTEXT_MODELS = register_codebook_cache({})
+
+def has_context_model(codebook_id):
+  """ Returns if the codebook holds a trained context model. """
+  if codebook_id == BUILTIN_CODEBOOK_ID:
+    return False
+  return "context_model" in load_codebook(codebook_id)
+
+def get_context_model(codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Returns the codebook's context model, or the Huffman prior if it doesn't have one. """
+  if codebook_id not in CONTEXT_MODELS:
+    if has_context_model(codebook_id):
+      table = load_codebook(codebook_id)["context_model"]
+      CONTEXT_MODELS[codebook_id] = build_model([table[context] for context in range(NUMBER_OF_CONTEXTS)])
+    else:
+      CONTEXT_MODELS[codebook_id] = PRIOR_MODEL
+  return CONTEXT_MODELS[codebook_id]
+
+def write_range_coded_squares(symbols, writer, model):
+  """ Arithmetic codes the symbol of every square. Returns writer. """
+  low, high, pending = 0, WHOLE - 1, 0
+  value, length = writer.value, writer.length
+  for square in chess.SQUARES:
+    cumulative, total = model[get_context(symbols, square)]
+    index = SYMBOL_INDICES[symbols[square]]
+    width = high - low + 1
+    high = low + width * cumulative[index + 1] // total - 1
+    low = low + width * cumulative[index] // total
+    while True:
+      if high < HALF:
+        value = (value << (pending + 1)) | ((1 << pending) - 1)
+        length += pending + 1
+        pending = 0
+      elif low >= HALF:
+        value = ((value << 1 | 1) << pending)
+        length += pending + 1
+        pending = 0
+        low -= HALF
+        high -= HALF
+      elif low >= QUARTER and high < HALF + QUARTER:
+        pending += 1
+        low -= QUARTER
+        high -= QUARTER
+      else:
+        break
+      low <<= 1
+      high = (high << 1) | 1
+  # Two more bits (plus pending ones) pick a point that stays in the final range whatever bits follow.
+  pending += 1
+  if low < QUARTER:
+    value = (value << (pending + 1)) | ((1 << pending) - 1)
+  else:
+    value = ((value << 1 | 1) << pending)
+  length += pending + 1
+  writer.value, writer.length = value, length
+  return writer
+
+def read_range_coded_squares(reader, model):
+  """ Reads the symbols written by write_range_coded_squares. Returns a list of 64 symbols. """
+  data, total_bits, start = reader.value, reader.total, reader.pos
+
+  def bit_at(position):
+    # Reading past the end gives zeros, which the coder's termination allows for.
+    return (data >> (total_bits - 1 - position)) & 1 if position < total_bits else 0
+
+  code = 0
+  for position in range(start, start + PRECISION):
+    code = (code << 1) | bit_at(position)
+  next_position = start + PRECISION
+  low, high, pending = 0, WHOLE - 1, 0
+  symbols = ["s"] * 64
+  for square in chess.SQUARES:
+    cumulative, total = model[get_context(symbols, square)]
+    width = high - low + 1
+    count = ((code - low + 1) * total - 1) // width
+    index = 0
+    while cumulative[index + 1] <= count:
+      index += 1
+    symbols[square] = SYMBOLS[index]
+    high = low + width * cumulative[index + 1] // total - 1
+    low = low + width * cumulative[index] // total
+    while True:
+      if high < HALF:
+        pending = 0
+      elif low >= HALF:
+        pending = 0
+        low -= HALF
+        high -= HALF
+        code -= HALF
+      elif low >= QUARTER and high < HALF + QUARTER:
+        pending += 1
+        low -= QUARTER
+        high -= QUARTER
+        code -= QUARTER
+      else:
+        break
+      low <<= 1
+      high = (high << 1) | 1
+      code = (code << 1) | bit_at(next_position)
+      next_position += 1
+  # The encoder wrote one bit per shift plus two final bits.
+  end = next_position - PRECISION + 2
+  if end > reader.length:
+    raise ValueError("Range coded squares run past the end of the bits.")
+  # The encoder ends with its pending bits and two more: a 0 then ones if low < QUARTER, else a 1 then zeros.
+  # Any other ending isn't an encoding of the decoded squares.
+  ending = 0
+  for position in range(end - pending - 2, end):
+    ending = (ending << 1) | bit_at(position)
+  if ending != ((1 << (pending + 1)) - 1 if low < QUARTER else 1 << (pending + 1)):
+    raise ValueError("Bits don't end like range coded squares.")
+  reader.pos = end
+  return symbols
+
+@instrumented("encode.range")
+def encode_board_to_range_coded(board, writer=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Format: [board metadata] [arithmetic coded squares]
+  Returns a BitWriter.
+  """
+  if writer is None:
+    writer = BitWriter()
+  return write_range_coded(board_metadata(board), get_square_symbols(board), writer, codebook_id)
+
+def write_range_coded(metadata, symbols, writer, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Writes the encoding from board metadata bits and the symbol of every square. Returns writer. """
+  writer.extend(metadata)
+  return write_range_coded_squares(symbols, writer, get_context_model(codebook_id))
+
+def range_coded_size(metadata, symbols, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Returns the number of bits write_range_coded would write. """
+  return len(metadata) + len(write_range_coded_squares(symbols, BitWriter(), get_context_model(codebook_id)))
+
+def read_board_from_range_coded(reader, codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Reads an encoding from encode_board_to_range_coded. Returns (metadata, symbols). """
+  metadata = read_board_metadata(reader)
+  return metadata, read_range_coded_squares(reader, get_context_model(codebook_id))
+
+def decode_board_from_range_coded(bits, length=None, codebook_id=BUILTIN_CODEBOOK_ID):
+  """
+  Decodes bits (see bitstream.as_reader) from encode_board_to_range_coded.
+  Returns a chess.Board.
+  """
+  metadata, symbols = read_board_from_range_coded(as_reader(bits, length), codebook_id)
+  return board_from_symbols(symbols, metadata)
+
+def count_contexts(boards):
+  """ Returns NUMBER_OF_CONTEXTS lists of symbol counts, starting every count at 1. """
+  counts = [[1] * len(SYMBOLS) for _ in range(NUMBER_OF_CONTEXTS)]
+  for board in boards:
+    symbols = get_square_symbols(board)
+    for square in chess.SQUARES:
+      counts[get_context(symbols, square)][SYMBOL_INDICES[symbols[square]]] += 1
+  return counts
+
+def train_codebook(boards, codebook_id, max_length=DEFAULT_MAX_LENGTH, overwrite=False):
+  """
+  Trains the piece-centric tables and the context model on boards, and saves them as codebook codebook_id
+  (see codebook.save_codebook). Returns the path.
+  """
+  boards = list(boards)
+  square_difs, pieces, start_squares = count_piececentric_symbols(boards)
+  counts = count_contexts(boards)
+  return save_codebook(codebook_id, {
+    "square_difs": train_code(square_difs, max_length),
+    "piece_codes": train_code(pieces, max_length),
+    "start_square_codes": train_code(start_squares, max_length),
+    "context_model": {context: counts[context] for context in range(NUMBER_OF_CONTEXTS)}
+  }, overwrite)
+
+if __name__ == "__main__":
+  board = chess.Board()
+  board.push_uci("e2e4")
+  bits = encode_board_to_range_coded(board)
+  print(bits, len(bits))
+  print(decode_board_from_range_coded(bits))
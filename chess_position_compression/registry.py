@@ -0,0 +1,98 @@
+
+"""
+Registry of the encoding schemes.
+Every scheme is registered by name with the module and function names of its encoder and decoder, its scheme id
+in container headers (see container.py), and whether it takes a codebook id. Nothing is imported until a scheme
+is first used: the module (and the code tables it builds) is loaded by the first access to the encoder or decoder,
+so short-lived processes only pay for the schemes they use.
+"""
+
+from importlib import import_module
+from .codebook import BUILTIN_CODEBOOK_ID
+
+class Scheme:
+  """ A registered scheme. Its module is imported on first use of encode or decode. """
+
+  def __init__(self, name, module, encode_name, decode_name, scheme_id=None, uses_codebook=False):
+    self.name = name
+    self.module_name = module
+    self.encode_name = encode_name
+    self.decode_name = decode_name
+    self.scheme_id = scheme_id
+    self.uses_codebook = uses_codebook
+    self.functions = None
+
+  def load(self):
+    """ Imports the scheme's module if it isn't yet. Returns (encoding function, decoding function). """
+    if self.functions is None:
+      module = import_module("." + self.module_name, __package__)
+      self.functions = (getattr(module, self.encode_name), getattr(module, self.decode_name))
+    return self.functions
+
+  @property
+  def encode(self):
+    """ Encoding function, taking a chess.Board (and a codebook_id if uses_codebook) and returning a BitWriter. """
+    return self.load()[0]
+
+  @property
+  def decode(self):
+    """ Decoding function, taking bits and a length (and a codebook_id if uses_codebook) and returning a chess.Board. """
+    return self.load()[1]
+
+  def encode_board(self, board, codebook_id=BUILTIN_CODEBOOK_ID):
+    if self.uses_codebook:
+      return self.encode(board, codebook_id=codebook_id)
+    return self.encode(board)
+
+  def decode_bits(self, bits, length=None, codebook_id=BUILTIN_CODEBOOK_ID):
+    if self.uses_codebook:
+      return self.decode(bits, length, codebook_id=codebook_id)
+    return self.decode(bits, length)
+
+  def selector_code(self, codebook_id=BUILTIN_CODEBOOK_ID):
+    """ Returns the selector code of the scheme in the best-of encoding with the codebook, or None if it isn't chosen from. """
+    from .choose_best_huffman_encoding import get_selectors
+    return get_selectors(codebook_id)[0].get(self.encode)
+
+  def __repr__(self):
+    return "Scheme({!r})".format(self.name)
+
+# Scheme name -> Scheme.
+SCHEMES = {}
+
+def get_scheme_ids():
+  """ Returns {container scheme id: scheme name}. """
+  return {scheme.scheme_id: name for name, scheme in SCHEMES.items() if scheme.scheme_id is not None}
+
+def register_scheme(name, module, encode_name, decode_name, scheme_id=None, uses_codebook=False):
+  """ Registers a scheme. Returns the Scheme. """
+  if name in SCHEMES:
+    raise ValueError("Scheme {} is already registered.".format(name))
+  if scheme_id is not None and scheme_id in get_scheme_ids():
+    raise ValueError("Scheme id {} is already registered.".format(scheme_id))
+  SCHEMES[name] = Scheme(name, module, encode_name, decode_name, scheme_id, uses_codebook)
+  return SCHEMES[name]
+
+register_scheme("huffman", "huffman", "encode_board_to_huffman", "decode_board_from_huffman", 0)
+register_scheme("symmetry", "huffman_symmetry", "encode_board_to_huffman_symmetry", "decode_board_from_huffman_symmetry", 1)
+register_scheme("default", "huffman_default", "encode_board_to_huffman_default", "decode_board_from_huffman_default", 2)
+register_scheme("piececentric", "huffman_piececentric", "encode_board_to_huffman_piececentric", "decode_board_from_huffman_piececentric", 3, True)
+register_scheme("best", "choose_best_huffman_encoding", "encode_board_to_huffman_best_opt", "decode_board_from_huffman_best_opt", 4, True)
+register_scheme("range", "range_coding", "encode_board_to_range_coded", "decode_board_from_range_coded", 5, True)
+register_scheme("dictionary", "opening_dictionary", "encode_board_to_opening_dictionary", "decode_board_from_opening_dictionary", None, True)
+
+def get_scheme(name):
+  """ Returns the Scheme registered as name, or with the container scheme id name. """
+  if not isinstance(name, str):
+    name = get_scheme_ids().get(name, name)
+  if name not in SCHEMES:
+    raise ValueError("Unknown scheme {}, expected one of {}.".format(name, list(SCHEMES)))
+  return SCHEMES[name]
+
+def encode(board, scheme="best", codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Encodes a chess.Board with the named scheme. Returns a BitWriter. """
+  return get_scheme(scheme).encode_board(board, codebook_id)
+
+def decode(bits, length=None, scheme="best", codebook_id=BUILTIN_CODEBOOK_ID):
+  """ Decodes bits (see bitstream.as_reader) of the named scheme. Returns a chess.Board. """
+  return get_scheme(scheme).decode_bits(bits, length, codebook_id)
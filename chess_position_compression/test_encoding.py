@@ -14,20 +14,25 @@ piece-centric will likely perform well, while default square will perform poorly
 Naturally, shorter move games will favor default square, so should try sampling longer games extra as one of the tests. 
 """
 
-from load_games import load_random_positions, load_positions, load_games 
-from huffman import encode_board_to_huffman 
-from huffman_symmetry import encode_board_to_huffman_symmetry 
-from fen import get_fen 
-from choose_best_huffman_encoding import encode_board_to_huffman_best_opt 
-from huffman_default import encode_board_to_huffman_default 
-from huffman_piececentric import encode_board_to_huffman_piececentric 
+import random 
+from .load_games import load_random_positions, load_positions, load_games 
+from .registry import get_scheme 
 
-def test_average_size(fn, n=1000, factor=100):
-  """ Returns the average size of the encoded boards. """ 
-  positions = load_random_positions(n, factor, unique=True)
+def load_samples(n=1000, factor=100, iterations=10, seed=0):
+  """ 
+  Loads iterations samples of n random positions, each with its own seeded random generator, so the 
+  PGN is only parsed once per sample and the samples are the same every run. 
+  For timings, see benchmark.py. 
+  """ 
+  return [load_random_positions(n, factor, unique=True, rng=random.Random(seed + i)) for i in range(iterations)]
+
+def test_average_size(fn, n=1000, factor=100, positions=None):
+  """ Returns the average size of the encoded boards. Loads n random positions if positions is None. """ 
+  if positions is None:
+    positions = load_random_positions(n, factor, unique=True)
   return sum([len(fn(board)) for board in positions])/len(positions)
 
-def compare_huffmans(fns, n=1000, factor=100, truncate_len=10, divide_by=None):
+def compare_huffmans(fns, n=1000, factor=100, truncate_len=10, divide_by=None, seed=0):
   """
   Gets the list of sizes for each of the functions, and calculates 
   how many times each function beats each other function. 
@@ -38,7 +43,7 @@ def compare_huffmans(fns, n=1000, factor=100, truncate_len=10, divide_by=None):
   if divide_by is None:
     divide_by = [1 for _ in range(len(fns))]
   res_dict = {}
-  positions = load_random_positions(n, factor, unique=True)
+  positions = load_random_positions(n, factor, unique=True, rng=random.Random(seed))
   for (fn, divide_by) in list(zip(fns, divide_by)):
     res_dict[fn.__name__] = [len(fn(board))/divide_by for board in positions]
 
@@ -64,11 +69,11 @@ def compare_huffmans(fns, n=1000, factor=100, truncate_len=10, divide_by=None):
     
   return res_dict
 
-def print_averages(fn, n=1000, factor=10, iterations=10, divide_by=1, verbose=True):
+def print_averages(fn, n=1000, factor=10, iterations=10, divide_by=1, verbose=True, seed=0):
   bit_sum = 0
   bit_sums = []
-  for _ in range(iterations):
-    size_of_curr_position_compressed = test_average_size(fn, n, factor) / divide_by
+  for positions in load_samples(n, factor, iterations, seed):
+    size_of_curr_position_compressed = test_average_size(fn, positions=positions) / divide_by
     print(size_of_curr_position_compressed)
     bit_sum += size_of_curr_position_compressed
     bit_sums.append(size_of_curr_position_compressed)
@@ -101,11 +106,15 @@ def build_table_string(res_dict, iterations=10, column_size=30):
 
   return table_string
 
-def print_as_table(fn_list, n=1000, factor=10, iterations=10, divide_by_list=None, column_size=30):
+def print_as_table(fn_list, n=1000, factor=10, iterations=10, divide_by_list=None, column_size=30, seed=0):
   """ 
   Prints the average size of the encoded boards for each function in fn_list. 
   fn_list is a list of functions. 
+  Every function is measured on the same samples, which are loaded once. 
   """ 
+  if divide_by_list is None:
+    divide_by_list = [1 for _ in range(len(fn_list))]
+  samples = load_samples(n, factor, iterations, seed)
   res_dict = {}
   for fn in fn_list:
     res_dict[fn.__name__] = ([], None)
@@ -114,8 +123,8 @@ def print_as_table(fn_list, n=1000, factor=10, iterations=10, divide_by_list=Non
     bit_sums = []
     bit_sum = 0
     avg = None 
-    for _ in range(iterations):
-      size_of_curr_position_compressed = test_average_size(fn, n, factor) / divide_by
+    for positions in samples:
+      size_of_curr_position_compressed = test_average_size(fn, positions=positions) / divide_by
       bit_sum += size_of_curr_position_compressed
       bit_sums.append(size_of_curr_position_compressed)
       if len(bit_sums) == iterations:
@@ -124,8 +133,13 @@ def print_as_table(fn_list, n=1000, factor=10, iterations=10, divide_by_list=Non
       res_dict[fn.__name__] = (bit_sums, avg)
       print(build_table_string(res_dict, iterations, column_size))
       
-fn_list = [get_fen, encode_board_to_huffman, encode_board_to_huffman_symmetry, encode_board_to_huffman_best_opt, encode_board_to_huffman_default, encode_board_to_huffman_piececentric]
-divide_by = [1, 8, 8, 8, 8, 8]
+def get_fn_list(schemes=("huffman", "symmetry", "best", "default", "piececentric")):
+  """ Returns FEN's and the named schemes' encoding functions (see registry.py), and what to divide their sizes by for bytes. """ 
+  from .fen import get_fen 
+  fn_list = [get_fen] + [get_scheme(name).encode for name in schemes]
+  return fn_list, [1] + [8 for _ in schemes]
+
+# fn_list, divide_by = get_fn_list()
 # print_as_table(fn_list, n=100, divide_by_list=divide_by)
 
 # print_as_table(fn_list, n=1000, divide_by_list=divide_by, iterations=10)
@@ -0,0 +1,266 @@
+
+import chess 
+import chess.polyglot
+from .bitstream import BitWriter, as_reader, code_table, build_decode_table 
+
+HUFFMAN_CODES = {
+  "s": "1",
+  "p": "011", 
+  "P": "010", 
+  "r": "00111", 
+  "R": "00110",
+  "n": "00101",
+  "N": "00100",
+  "b": "00011",
+  "B": "00010",
+  "q": "000011",
+  "Q": "000010",
+  "k": "000001",
+  "K": "000000"
+}
+
+HUFFMAN_CODE_BITS = code_table(HUFFMAN_CODES)
+HUFFMAN_DECODE_TABLE = build_decode_table(HUFFMAN_CODE_BITS)
+
+# Castling rights in the order they are written by castling_rights(). 
+CASTLING_SQUARES = [chess.BB_H1, chess.BB_A1, chess.BB_H8, chess.BB_A8]
+
+def huffman_encode_square(board, square):
+  """ Returns the (value, length) code of the piece at square. """
+  piece = board.piece_at(square)
+  if piece is None:
+    return HUFFMAN_CODE_BITS["s"]
+  else:
+    return HUFFMAN_CODE_BITS[piece.symbol()]
+
+# (piece type, color, symbol) for every piece, for reading pieces off the bitboards. 
+PIECE_SYMBOLS = [(piece_type, color, chess.Piece(piece_type, color).symbol()) for color in chess.COLORS for piece_type in chess.PIECE_TYPES]
+
+def get_square_symbols(board):
+  """ 
+  Returns the symbol of every square ("s" for empty), indexed by square. 
+  Reads the pieces off the bitboards rather than calling piece_at per square. 
+  """
+  symbols = ["s"] * 64
+  for piece_type, color, symbol in PIECE_SYMBOLS:
+    for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+      symbols[square] = symbol
+  return symbols
+
+def get_square_codes(board):
+  """ Returns the (value, length) code of every square, indexed by square. """
+  return [HUFFMAN_CODE_BITS[symbol] for symbol in get_square_symbols(board)]
+
+def write_square_codes(codes, squares, writer):
+  """ Writes codes[square] for each of squares. Returns writer. """
+  value, length = writer.value, writer.length
+  for square in squares:
+    code_value, code_length = codes[square]
+    value = (value << code_length) | code_value
+    length += code_length
+  writer.value, writer.length = value, length
+  return writer
+
+def square_codes_size(codes, squares):
+  """ Returns the number of bits write_square_codes would write. """
+  return sum([codes[square][1] for square in squares])
+
+def huffman_encode_squares(board, squares=None, writer=None):
+  """
+  Writes the huffman encoding of the pieces at the provided list of squares. 
+  If squares is None, encodes the whole board. 
+  Returns a BitWriter. 
+  """
+  if squares is None:
+    squares = chess.SQUARES 
+  if writer is None:
+    writer = BitWriter()
+
+  return write_square_codes(get_square_codes(board), squares, writer)
+
+def read_huffman_symbols(reader, count):
+  """ 
+  Reads count Huffman coded symbols from reader. 
+  Returns a list of symbols, with "s" for empty squares. 
+  """
+  table, max_length = HUFFMAN_DECODE_TABLE
+  mask = (1 << max_length) - 1
+  # Peeking inline, as this is the hot loop of every decoder. 
+  value, total, pos = reader.value, reader.total, reader.pos
+  symbols = []
+  for _ in range(count):
+    shift = total - pos - max_length
+    symbol, length = table[((value >> shift) if shift >= 0 else (value << -shift)) & mask]
+    pos += length
+    symbols.append(symbol)
+  if pos > reader.length:
+    raise ValueError("Tried to read {} bits with only {} remaining.".format(pos - reader.pos, reader.remaining()))
+  reader.pos = pos
+  return symbols
+
+def decode_huffman_piece_info(info, length=None, count=None):
+  """ 
+  Takes in bits (see bitstream.as_reader) and returns a list of pieces and/or Nones. 
+  If count is None, decodes until the end of the bits. 
+  """
+  reader = as_reader(info, length)
+  table, max_length = HUFFMAN_DECODE_TABLE
+  tuples = []
+  while (reader.remaining() if count is None else len(tuples) < count):
+    symbol, code_length = table[reader.peek(max_length)]
+    reader.skip(code_length)
+    if symbol == "s":
+      tuples.append(None)
+    else:
+      tuples.append(chess.Piece.from_symbol(symbol))
+  return tuples
+
+# (piece type, color) of each symbol. 
+SYMBOL_PIECES = {symbol: (chess.Piece.from_symbol(symbol).piece_type, chess.Piece.from_symbol(symbol).color) for symbol in HUFFMAN_CODES if symbol != "s"}
+
+def board_from_symbols(symbols, metadata):
+  """ 
+  Builds a chess.Board from a list of 64 symbols (by square, "s" for empty) and metadata from read_board_metadata. 
+  """
+  piece_masks = [0] * 7
+  color_masks = [0, 0]
+  for square, symbol in enumerate(symbols):
+    if symbol != "s":
+      piece_type, color = SYMBOL_PIECES[symbol]
+      piece_masks[piece_type] |= 1 << square
+      color_masks[color] |= 1 << square
+  board = chess.Board(None)
+  board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings = piece_masks[1:]
+  board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK] = color_masks[1], color_masks[0]
+  board.occupied = color_masks[0] | color_masks[1]
+  set_board_metadata(board, metadata)
+  return board
+
+def get_mirror_difference(board):
+  """
+  Returns a bitboard of the squares whose piece differs from the board's mirror (see chess.Board.mirror), 
+  i.e. from the vertically flipped square's piece with its colour swapped. 
+  A file is mirrored when none of its squares are set. 
+  """
+  white, black = board.occupied_co
+  difference = 0
+  for pieces in (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings):
+    difference |= (pieces & white) ^ chess.flip_vertical(pieces & black)
+  # Also differs where only the flipped square's piece is white, which the loop counts on the other half. 
+  return difference | chess.flip_vertical(difference)
+
+def is_file_mirrored(board, file_index):
+  """
+  Returns if the file is mirrored. 
+  """
+  return not get_mirror_difference(board) & chess.BB_FILES[file_index]
+
+def en_passant(board, writer=None):
+  """
+  [en passant] is 1-4 bits. 
+    0     => Can en passant? 
+    1..3? => Which file? 
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  if board.has_legal_en_passant():
+    return writer.write(0b1000 | (board.ep_square % 8), 4)
+  else:
+    return writer.write(0, 1)
+
+def zobrist_key(board):
+  """
+  Returns the Zobrist hash (chess.polyglot.zobrist_hash) of the board, ignoring an en passant square without a legal
+  capture as en_passant does, so positions that encode the same hash the same.
+  """
+  if board.ep_square is not None and not board.has_legal_en_passant():
+    board = board.copy(stack=False)
+    board.ep_square = None
+  return chess.polyglot.zobrist_hash(board)
+  
+def castling_rights(board, writer=None):
+  """ 
+  [castling rights] is 4 bits. 
+    0 => white kingside 
+    1 => white queenside 
+    2 => black kingside 
+    3 => black queenside 
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  writer.write_bit(board.has_kingside_castling_rights(chess.WHITE))
+  writer.write_bit(board.has_queenside_castling_rights(chess.WHITE))
+  writer.write_bit(board.has_kingside_castling_rights(chess.BLACK))
+  writer.write_bit(board.has_queenside_castling_rights(chess.BLACK))
+  return writer
+  
+def board_metadata(board, writer=None):
+  """
+  6-9 bits. [turn] [castling rights] [en passant] 
+  Returns a BitWriter. 
+  """
+  if writer is None:
+    writer = BitWriter()
+  writer.write_bit(board.turn)
+  castling_rights(board, writer)
+  return en_passant(board, writer)
+
+def read_board_metadata(reader):
+  """
+  Reads the bits written by board_metadata. 
+  Returns (turn, castling rights as a 4 bit int, en passant file or None). 
+  """
+  turn = bool(reader.read(1))
+  castling = reader.read(4)
+  ep_file = reader.read(3) if reader.read(1) else None
+  return turn, castling, ep_file
+
+def set_board_metadata(board, metadata):
+  """ Sets the turn, castling rights and en passant square of board from read_board_metadata. """
+  turn, castling, ep_file = metadata
+  board.turn = turn
+  board.castling_rights = chess.BB_EMPTY
+  for index, castling_square in enumerate(CASTLING_SQUARES):
+    if castling & (0b1000 >> index):
+      board.castling_rights |= castling_square
+  if ep_file is None:
+    board.ep_square = None
+  else:
+    board.ep_square = chess.square(ep_file, 5 if turn == chess.WHITE else 2)
+  return board
+
+if __name__ == "__main__":
+  def make_en_passant_position(file):
+    board = chess.Board()
+    # Won't work for h file. 
+    board.push_uci("{}2{}4".format(chr(ord(file)+1), chr(ord(file)+1)))
+    board.push_uci("h7h6")
+    board.push_uci("{}4{}5".format(chr(ord(file)+1), chr(ord(file)+1)))
+    board.push_uci("{}7{}5".format(file, file))
+    return board
+
+  print("Testing no en passant.")
+  print(en_passant(chess.Board()))
+
+  print("Testing en passant.")
+  for file in "abcdefg":
+    print("file {}:".format(file), en_passant(make_en_passant_position(file)))
+    
+  print("Testing castling rights.")
+  print(castling_rights(chess.Board()))
+  
+  print("Testing board metadata.")
+  print(board_metadata(chess.Board()))
+  
+  board = chess.Board()
+  board.push_uci("e2e4")
+  print(board_metadata(board))
+
+  # Testing is file mirrored. 
+  board = chess.Board()
+  print("is_file_mirrored:", is_file_mirrored(board, 0))
+  board.push_uci("e2e4")
+  print("is_file_mirrored:", is_file_mirrored(board, 0))
+  print("is_file_mirrored:", is_file_mirrored(board, 4))
@@ -0,0 +1,40 @@
+
+"""
+Shared fixtures. Every test gets its own empty codebook directory, so trained codebooks never land outside tmp_path.
+"""
+
+import random
+import chess
+import pytest
+from chess_position_compression.codebook import set_codebook_directory
+
+@pytest.fixture(autouse=True)
+def codebook_directory(tmp_path):
+  """ Points the codebook directory at tmp_path/codebooks for the test. Returns its path. """
+  directory = str(tmp_path / "codebooks")
+  set_codebook_directory(directory)
+  yield directory
+  set_codebook_directory(None)
+
+def play_random_boards(count, seed=0, max_plies=80, sample=1.0):
+  """
+  Returns count positions from random games of 1 to max_plies plies, keeping each position with probability sample.
+  Short games repeat their opening positions. Games end early on checkmate or stalemate.
+  """
+  rng = random.Random(seed)
+  boards = []
+  while len(boards) < count:
+    board = chess.Board()
+    for _ in range(rng.randint(1, max_plies)):
+      moves = list(board.legal_moves)
+      if not moves:
+        break
+      board.push(rng.choice(moves))
+      if rng.random() < sample:
+        boards.append(board.copy(stack=False))
+  return boards[:count]
+
+@pytest.fixture
+def random_boards():
+  """ Returns play_random_boards. """
+  return play_random_boards
@@ -0,0 +1,60 @@
+
+"""
+Codebooks are referred to by id only, so saving must never change how something already encoded with an existing
+codebook id is read. Codebooks are saved to and loaded from the test's codebook directory (see conftest.py).
+"""
+
+import os
+import chess
+import pytest
+from chess_position_compression.codebook import codebook_path, save_codebook, load_codebook, set_codebook_directory
+from chess_position_compression.choose_best_huffman_encoding import get_selectors
+from chess_position_compression.opening_dictionary import train_opening_dictionary
+from chess_position_compression.range_coding import train_codebook
+from chess_position_compression.registry import encode, decode
+
+BASE_ID = 1
+DICTIONARY_ID = 2
+
+def test_save_refuses_existing_id():
+  save_codebook(BASE_ID, {"square_difs": {1: "0", 2: "1"}})
+  with pytest.raises(ValueError):
+    save_codebook(BASE_ID, {"square_difs": {1: "1", 2: "0"}})
+  save_codebook(BASE_ID, {"square_difs": {1: "1", 2: "0"}}, overwrite=True)
+
+def test_dictionary_goes_to_new_id(random_boards):
+  boards = random_boards(400)
+  train_codebook(boards, BASE_ID)
+  selectors = get_selectors(BASE_ID)[0]
+  stored = [encode(board, "best", BASE_ID) for board in boards]
+  with pytest.raises(ValueError):
+    train_opening_dictionary(boards, BASE_ID)
+  train_opening_dictionary(boards, DICTIONARY_ID, BASE_ID)
+  assert get_selectors(BASE_ID)[0] == selectors
+  assert len(get_selectors(DICTIONARY_ID)[0]) == len(selectors) + 1
+  for board, bits in zip(boards, stored):
+    assert decode(bits.to_bytes(), len(bits), "best", BASE_ID).epd(en_passant="legal") == board.epd(en_passant="legal")
+    bits = encode(board, "best", DICTIONARY_ID)
+    assert decode(bits.to_bytes(), len(bits), "best", DICTIONARY_ID).epd(en_passant="legal") == board.epd(en_passant="legal")
+
+def test_save_drops_cached_tables(random_boards):
+  boards = random_boards(200, seed=1)
+  train_codebook(boards, BASE_ID)
+  with_model = get_selectors(BASE_ID)[0]
+  tables = dict(load_codebook(BASE_ID))
+  del tables["context_model"]
+  save_codebook(BASE_ID, tables, overwrite=True)
+  assert len(get_selectors(BASE_ID)[0]) == len(with_model) - 1
+
+def test_loaders_use_the_codebook_directory(tmp_path, codebook_directory, random_boards):
+  boards = random_boards(200, seed=2)
+  path = train_codebook(boards, BASE_ID)
+  assert os.path.dirname(path) == codebook_directory
+  for scheme in ("piececentric", "range", "best"):
+    bits = encode(boards[-1], scheme, BASE_ID)
+    assert decode(bits.to_bytes(), len(bits), scheme, BASE_ID).board_fen() == boards[-1].board_fen()
+  # Another directory has its own codebooks, and nothing loaded from the first is kept.
+  set_codebook_directory(str(tmp_path / "other"))
+  assert not os.path.exists(codebook_path(BASE_ID))
+  with pytest.raises(FileNotFoundError):
+    encode(boards[-1], "piececentric", BASE_ID)
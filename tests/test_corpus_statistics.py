@@ -0,0 +1,67 @@
+
+"""
+The vectorised corpus statistics must count what a plain loop over the boards counts, however the corpus is split.
+"""
+
+import numpy as np
+import chess
+from chess_position_compression.corpus_statistics import (CorpusStatistics, BITBOARD_SYMBOLS, boards_to_bitboards,
+  collect_statistics, collect_board_statistics, collect_file_statistics)
+
+def naive_statistics(boards, max_pieces=None):
+  """ Returns CorpusStatistics.to_dict counted one board and one square at a time. """
+  gaps = [0] * 64
+  start_squares = [0] * 64
+  pieces = {symbol: 0 for symbol in BITBOARD_SYMBOLS}
+  piece_counts = [0] * 65
+  positions = 0
+  for board in boards:
+    squares = [square for square in chess.SQUARES if board.piece_at(square)]
+    if max_pieces is not None and len(squares) > max_pieces:
+      continue
+    positions += 1
+    piece_counts[len(squares)] += 1
+    for square in squares:
+      pieces[board.piece_at(square).symbol()] += 1
+    if squares:
+      start_squares[squares[0]] += 1
+    for square, next_square in zip(squares, squares[1:]):
+      gaps[next_square - square] += 1
+  return {"positions": positions, "gaps": gaps, "start_squares": start_squares, "pieces": pieces, "piece_counts": piece_counts}
+
+def corpus(random_boards):
+  """ Random positions plus an empty board and boards with a piece on a1 or h8 only. """
+  return random_boards(400, max_plies=200) + [chess.Board(None), chess.Board("8/8/8/8/8/8/8/K7 w - - 0 1"), chess.Board("7k/8/8/8/8/8/8/8 w - - 0 1")]
+
+def test_counts_match_naive_count(random_boards):
+  boards = corpus(random_boards)
+  assert collect_board_statistics(boards).to_dict() == naive_statistics(boards)
+  assert collect_board_statistics(boards, max_pieces=20).to_dict() == naive_statistics(boards, max_pieces=20)
+
+def test_piececentric_frequencies(random_boards):
+  boards = corpus(random_boards)
+  square_difs, pieces, start_squares = collect_board_statistics(boards).piececentric_frequencies()
+  naive = naive_statistics(boards)
+  assert square_difs == {dif: naive["gaps"][dif] + 1 for dif in range(1, 64)}
+  assert pieces == {symbol: count + 1 for symbol, count in naive["pieces"].items()}
+  assert start_squares == {square: naive["start_squares"][square] + 1 for square in chess.SQUARES}
+
+def test_merged_runs_match_one_run(random_boards, tmp_path):
+  boards = corpus(random_boards)
+  bitboards = boards_to_bitboards(boards)
+  whole = collect_statistics(bitboards)
+  assert collect_statistics(bitboards, chunk_size=7) == whole
+  assert collect_statistics(bitboards[:150]) + collect_statistics(bitboards[150:]) == whole
+  merged = CorpusStatistics().merge(collect_board_statistics(boards[:1])).merge(collect_board_statistics(boards[1:], chunk_size=50))
+  assert merged == whole
+  paths = []
+  for index, part in enumerate(np.array_split(bitboards, 3)):
+    paths.append(str(tmp_path / "part{}.npy".format(index)))
+    np.save(paths[-1], part)
+  assert collect_file_statistics(paths, processes=2) == whole
+
+def test_save_load_round_trip(random_boards, tmp_path):
+  statistics = collect_board_statistics(corpus(random_boards))
+  path = str(tmp_path / "statistics.json")
+  statistics.save(path)
+  assert CorpusStatistics.load(path) == statistics
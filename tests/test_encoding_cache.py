@@ -0,0 +1,38 @@
+
+"""
+Cached encodings and decodings must be the uncached ones, hit or miss.
+"""
+
+import chess
+from chess_position_compression.encoding_cache import LRUCache, CachedCodec
+from chess_position_compression.choose_best_huffman_encoding import encode_board_to_huffman_best_opt, decode_board_from_huffman_best_opt
+
+def test_lru_cache_evicts_least_recently_used():
+  cache = LRUCache(2)
+  cache.put("a", 1)
+  cache.put("b", 2)
+  assert cache.get("a") == 1
+  cache.put("c", 3)
+  assert cache.get("b") is None
+  assert (cache.get("a"), cache.get("c")) == (1, 3)
+  assert cache.stats()["evictions"] == 1
+
+def test_codec_matches_uncached(random_boards):
+  codec = CachedCodec(max_size=50)
+  # Short games, so early positions repeat.
+  for board in random_boards(600, max_plies=12):
+    bits = codec.encode(board)
+    assert bits == encode_board_to_huffman_best_opt(board)
+    decoded = codec.decode(bits.to_bytes(), len(bits))
+    assert decoded == decode_board_from_huffman_best_opt(bits.to_bytes(), len(bits))
+    # Hits are copies.
+    decoded.push(next(iter(decoded.legal_moves), chess.Move.null()))
+  stats = codec.stats()
+  assert stats["encode"]["hits"] > 0 and stats["decode"]["hits"] > 0
+  assert stats["encode"]["evictions"] > 0
+
+def test_pseudo_legal_en_passant_hits():
+  codec = CachedCodec()
+  bits = codec.encode(chess.Board("4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 1"))
+  assert codec.encode(chess.Board("4k3/8/8/K2pP2r/8/8/8/8 w - - 0 1")) == bits
+  assert codec.stats()["encode"]["hits"] == 1
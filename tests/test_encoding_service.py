@@ -0,0 +1,42 @@
+
+"""
+The service answers every request line in order, including malformed and over-long ones, and keeps the connection usable.
+"""
+
+import asyncio
+import chess
+from chess_position_compression.encoding_service import start_service, EncodingClient
+
+async def with_service(tmp_path, test):
+  unix_path = str(tmp_path / "service.sock")
+  server, batcher_task = await start_service(unix_path=unix_path)
+  client = await EncodingClient.connect(unix_path=unix_path)
+  try:
+    await test(client)
+  finally:
+    await client.close()
+    server.close()
+    batcher_task.cancel()
+
+async def request_lines(client, lines):
+  """ Sends the lines pipelined. Returns the response lines. """
+  client.writer.write(b"".join(lines))
+  await client.writer.drain()
+  return [(await client.reader.readline()).decode().rstrip("\n") for _ in lines]
+
+def test_round_trip(tmp_path):
+  async def test(client):
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    data, length = await client.encode(fen)
+    assert chess.Board(await client.decode(data, length)).board_fen() == chess.Board(fen).board_fen()
+  asyncio.run(with_service(tmp_path, test))
+
+def test_long_line_is_answered_with_error(tmp_path):
+  async def test(client):
+    long_lines = [b"E " + b"x" * 100000 + b"\n", b"E " + b"x" * 70000 + b"\n"]
+    responses = await request_lines(client, [b"X\n", long_lines[0], b"E " + chess.STARTING_FEN.encode() + b"\n", long_lines[1]])
+    assert [response.split()[0] for response in responses] == ["ERR", "ERR", "OK", "ERR"]
+    assert "too long" in responses[1]
+    data, length = await client.encode(chess.STARTING_FEN)
+    assert responses[2] == "OK {} {}".format(data.hex(), length)
+  asyncio.run(with_service(tmp_path, test))
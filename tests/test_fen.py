@@ -0,0 +1,60 @@
+
+"""
+Encoding a FEN directly must give bit for bit the encoding of chess.Board(fen), and decoding to a FEN must give
+back the position, for FENs that need chess.Board's clean-up rules.
+"""
+
+import chess
+import pytest
+from chess_position_compression.fen import FEN_SCHEMES, encode_fen, decode_to_fen
+from chess_position_compression.registry import encode, decode
+from chess_position_compression.codebook import BUILTIN_CODEBOOK_ID
+from chess_position_compression.opening_dictionary import train_opening_dictionary
+
+DICTIONARY_CODEBOOK_ID = 1
+
+FENS = [
+  chess.STARTING_FEN,
+  # Castling flags without the rook or the king on its square.
+  "r3k3/8/8/8/8/8/8/4K2R w KQkq - 0 1",
+  "4k3/8/8/8/8/8/8/R2K3R w KQkq - 0 1",
+  "rnbqkbn1/pppppppp/8/8/8/8/PPPPPPPP/1NBQKBNR b KQkq - 3 9",
+  # Shredder-FEN and X-FEN flags.
+  "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w HAha - 0 1",
+  "r3k2r/8/8/8/8/8/8/R3K2R b AHah - 0 1",
+  "1r2k1r1/8/8/8/8/8/8/1R2K1R1 w GBgb - 0 1",
+  "r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1",
+  # A legal en passant capture, a pinned capturer, and an en passant square without a capturer.
+  "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1",
+  "4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 1",
+  "4k3/8/8/8/3Pp3/8/8/4K2B b - d3 0 1",
+  "7b/8/8/8/3Pp3/8/8/k3K3 b - d3 0 1",
+  "4k3/8/8/3p4/8/8/8/4K3 w - d6 0 1",
+  "rnbqkbnr/pppp1ppp/8/8/4p3/8/PPPPPPPP/RNBQKBNR w KQkq e6 0 1",
+  # Missing trailing fields.
+  "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3",
+  "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR b KQkq",
+  "4k3/8/8/8/8/8/8/4K3 b",
+  "4k3/8/8/8/8/8/8/4K3",
+  # Promoted piece markers.
+  "4k3/8/8/8/8/8/8/Q~3K2N~ w - - 0 1",
+  "r3k2r/8/8/8/8/8/8/R~3K2R w KQkq - 0 1",
+  # More than one king, or none.
+  "r3k2r/8/8/8/8/8/8/R3K1KR w KQkq - 0 1",
+  "8/8/8/3pP3/8/8/8/8 w - d6 0 1",
+  "k7/8/8/3pP3/8/8/8/K6K w - d6 0 1"
+]
+
+@pytest.mark.parametrize("scheme", list(FEN_SCHEMES))
+@pytest.mark.parametrize("fen", FENS)
+def test_encode_fen_matches_board(fen, scheme):
+  codebook_id = BUILTIN_CODEBOOK_ID
+  if scheme == "dictionary":
+    # The builtin codebook has no dictionary, so use one holding every FEN.
+    codebook_id = DICTIONARY_CODEBOOK_ID
+    train_opening_dictionary([chess.Board(fen) for fen in FENS], codebook_id, min_count=1)
+  bits = encode_fen(fen, scheme, codebook_id)
+  assert bits == encode(chess.Board(fen), scheme, codebook_id)
+  decoded = decode_to_fen(bits.to_bytes(), len(bits), scheme, codebook_id)
+  assert decoded == decode(bits.to_bytes(), len(bits), scheme, codebook_id).fen()
+  assert chess.Board(decoded).epd(en_passant="legal") == chess.Board(fen).epd(en_passant="legal")
@@ -0,0 +1,80 @@
+
+"""
+A compressed game reads back every move and every position, from any ply, for any keyframe interval.
+"""
+
+import random
+import chess
+import pytest
+from chess_position_compression.bitstream import BitWriter, as_reader
+from chess_position_compression.game_compression import encode_game, GameReader
+from chess_position_compression.opening_dictionary import train_opening_dictionary
+
+def random_game(seed, plies, fen=chess.STARTING_FEN):
+  rng = random.Random(seed)
+  board = chess.Board(fen)
+  moves = []
+  for _ in range(plies):
+    legal_moves = list(board.legal_moves)
+    if not legal_moves:
+      break
+    moves.append(rng.choice(legal_moves))
+    board.push(moves[-1])
+  return chess.Board(fen), moves
+
+def positions(board, moves):
+  board = board.copy()
+  boards = [board.copy(stack=False)]
+  for move in moves:
+    board.push(move)
+    boards.append(board.copy(stack=False))
+  return [board.epd(en_passant="legal") for board in boards]
+
+@pytest.mark.parametrize("keyframe_interval", [1, 3, 16, 255])
+def test_round_trip(keyframe_interval):
+  for seed, plies in [(0, 0), (1, 1), (2, 47), (3, 48), (4, 200)]:
+    board, moves = random_game(seed, plies)
+    bits = encode_game(board, moves, keyframe_interval)
+    reader = GameReader(bits.to_bytes(), len(bits))
+    expected = positions(board, moves)
+    assert len(reader) == len(expected)
+    assert reader.moves() == moves
+    assert [board.epd(en_passant="legal") for board in reader] == expected
+    for ply in random.Random(seed).sample(range(len(expected)), min(10, len(expected))):
+      assert reader.board_at(ply).epd(en_passant="legal") == expected[ply]
+
+def test_game_from_position():
+  board, moves = random_game(5, 60, "r3k2r/pp3ppp/8/3pP3/8/8/PP3PPP/R3K2R w KQkq d6 0 1")
+  bits = encode_game(board, moves, 8)
+  assert [board.epd(en_passant="legal") for board in GameReader(bits.to_bytes(), len(bits))] == positions(board, moves)
+
+def test_ply_out_of_range():
+  board, moves = random_game(6, 10)
+  bits = encode_game(board, moves)
+  with pytest.raises(IndexError):
+    GameReader(bits.to_bytes(), len(bits)).board_at(11)
+
+def test_game_after_other_data():
+  board, moves = random_game(7, 40)
+  game_bits = encode_game(board, moves, 8)
+  stream = BitWriter().write(0b101, 3)
+  stream.extend(game_bits)
+  reader = as_reader(stream.to_bytes(), len(stream))
+  assert reader.read(3) == 0b101
+  game = GameReader(reader)
+  assert game.moves() == moves
+  assert [board.epd(en_passant="legal") for board in game] == positions(board, moves)
+
+def test_trained_codebook():
+  board, moves = random_game(8, 50)
+  # A dictionary holding the game's positions makes every keyframe a dictionary index.
+  boards = [chess.Board(fen) for fen in positions(board, moves)]
+  train_opening_dictionary(boards, 1, min_count=1)
+  bits = encode_game(board, moves, 4, codebook_id=1)
+  assert len(bits) < len(encode_game(board, moves, 4))
+  reader = GameReader(bits.to_bytes(), len(bits))
+  assert reader.codebook_id == 1
+  assert reader.moves() == moves
+  assert [board.epd(en_passant="legal") for board in reader] == positions(board, moves)
+  with pytest.raises(ValueError):
+    encode_game(board, moves, codebook_id=1 << 16)
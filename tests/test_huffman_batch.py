@@ -0,0 +1,46 @@
+
+"""
+Batch encodings must be byte for byte the single board encodings.
+"""
+
+import chess
+from chess_position_compression.huffman_batch import SCHEMES, boards_to_arrays, encode_batch, encode_boards_batch
+from chess_position_compression.huffman import encode_board_to_huffman
+from chess_position_compression.huffman_symmetry import encode_board_to_huffman_symmetry
+from chess_position_compression.huffman_default import encode_board_to_huffman_default
+
+ENCODE_FUNCTIONS = {
+  "huffman": encode_board_to_huffman,
+  "symmetry": encode_board_to_huffman_symmetry,
+  "default": encode_board_to_huffman_default
+}
+
+# En passant with a legal capture, with only a pseudo-legal one, and mirrored files.
+SPECIAL_FENS = [
+  "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1",
+  "4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 1",
+  "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R b Kq - 0 1",
+  "8/8/8/8/8/8/8/8 w - - 0 1"
+]
+
+def test_batch_matches_single_board(random_boards):
+  boards = [chess.Board(fen) for fen in SPECIAL_FENS] + random_boards(500, max_plies=300)
+  for scheme in SCHEMES:
+    buffer, offsets, bit_lengths = encode_boards_batch(boards, scheme)
+    assert len(offsets) == len(boards) + 1
+    for index, board in enumerate(boards):
+      bits = ENCODE_FUNCTIONS[scheme](board)
+      assert bit_lengths[index] == len(bits), (scheme, board.fen())
+      assert buffer[offsets[index]:offsets[index + 1]].tobytes() == bits.to_bytes(), (scheme, board.fen())
+
+def test_chunks_match_one_batch(random_boards):
+  arrays = boards_to_arrays(random_boards(300, seed=1))
+  for scheme in SCHEMES:
+    whole = encode_batch(*arrays, scheme=scheme)
+    chunked = encode_batch(*arrays, scheme=scheme, chunk_size=7)
+    for expected, result in zip(whole, chunked):
+      assert (expected == result).all()
+
+def test_empty_batch():
+  buffer, offsets, bit_lengths = encode_boards_batch([])
+  assert len(buffer) == 0 and offsets.tolist() == [0] and len(bit_lengths) == 0
@@ -0,0 +1,25 @@
+
+"""
+The default-square mask is written a1 first, so it is the bitboard with its bits reversed.
+"""
+
+import random
+import chess
+from chess_position_compression.huffman_default import reverse_bitboard, encode_board_to_huffman_default, decode_board_from_huffman_default
+
+def test_reverse_bitboard():
+  rng = random.Random(0)
+  for mask in [0, chess.BB_ALL, chess.BB_A1, chess.BB_H8, chess.BB_RANK_2] + [rng.getrandbits(64) for _ in range(1000)]:
+    assert reverse_bitboard(mask) == int("{:064b}".format(mask)[::-1], 2)
+
+def test_round_trip():
+  rng = random.Random(1)
+  board = chess.Board()
+  for _ in range(300):
+    moves = list(board.legal_moves)
+    if not moves:
+      board = chess.Board()
+      continue
+    board.push(rng.choice(moves))
+    bits = encode_board_to_huffman_default(board)
+    assert decode_board_from_huffman_default(bits.to_bytes(), len(bits)).board_fen() == board.board_fen()
@@ -0,0 +1,62 @@
+
+"""
+Importing the package must stay cheap and free of side effects: short-lived worker processes import it on every
+spawn. Every check runs in a fresh interpreter, so modules imported by other tests don't hide anything.
+"""
+
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "chess_position_compression"
+# Seconds the package import may take, best of IMPORT_RUNS fresh interpreters. Loading every scheme takes well over this.
+IMPORT_BUDGET = 0.1
+IMPORT_RUNS = 3
+
+def run_python(code):
+  """ Runs code in a fresh interpreter that can import the package, without a PGN path. Returns its stdout. """
+  env = {key: value for key, value in os.environ.items() if key != "CHESS_PGN_PATH"}
+  env["PYTHONPATH"] = ROOT
+  result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+  return result.stdout
+
+def measure_import():
+  return json.loads(run_python(
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {}\n"
+    "seconds = time.perf_counter() - start\n"
+    "print(json.dumps({{'seconds': seconds, 'modules': sorted(sys.modules)}}))\n".format(PACKAGE)))
+
+def test_import_budget():
+  runs = [measure_import() for _ in range(IMPORT_RUNS)]
+  seconds = min(run["seconds"] for run in runs)
+  assert seconds < IMPORT_BUDGET, "Importing {} took {:.3f} s, over the {} s budget.".format(PACKAGE, seconds, IMPORT_BUDGET)
+
+def test_import_loads_no_schemes():
+  modules = set(measure_import()["modules"])
+  loaded = sorted(module for module in modules if module.startswith(PACKAGE + "."))
+  assert loaded == [PACKAGE + ".codebook", PACKAGE + ".registry"]
+  assert "chess" not in modules
+  assert "numpy" not in modules
+
+def test_first_use_loads_only_its_scheme():
+  output = run_python(
+    "import sys\n"
+    "from {0} import encode, decode\n"
+    "import chess\n"
+    "bits = encode(chess.Board(), 'huffman')\n"
+    "assert decode(bits.to_bytes(), len(bits), 'huffman') == chess.Board()\n"
+    "print(' '.join(sorted(module for module in sys.modules if module.startswith('{0}.'))))\n".format(PACKAGE))
+  loaded = output.split()
+  assert PACKAGE + ".huffman" in loaded
+  assert PACKAGE + ".choose_best_huffman_encoding" not in loaded
+  assert PACKAGE + ".range_coding" not in loaded
+
+def test_modules_import_without_side_effects():
+  names = [name for _, name, _ in pkgutil.iter_modules([os.path.join(ROOT, PACKAGE)])]
+  for name in names:
+    assert run_python("import {}.{}".format(PACKAGE, name)) == "", "Importing {} printed output.".format(name)
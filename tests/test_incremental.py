@@ -0,0 +1,66 @@
+
+"""
+Incremental encodings must be bit for bit the encodings from scratch after every pushed move.
+"""
+
+import random
+import chess
+from chess_position_compression.incremental import SplicedCodes, IncrementalEncoder, INCREMENTAL_SCHEMES
+from chess_position_compression.bitstream import BitWriter
+from chess_position_compression.huffman import encode_board_to_huffman
+from chess_position_compression.huffman_symmetry import encode_board_to_huffman_symmetry
+from chess_position_compression.huffman_default import encode_board_to_huffman_default
+
+ENCODE_FUNCTIONS = {
+  "huffman": encode_board_to_huffman,
+  "symmetry": encode_board_to_huffman_symmetry,
+  "default": encode_board_to_huffman_default
+}
+
+def random_code(rng):
+  length = rng.choice([0, 0, 1, 3, 5, 7])
+  return rng.getrandbits(length) if length else 0, length
+
+def concatenate(codes):
+  writer = BitWriter()
+  for value, length in codes:
+    writer.write(value, length)
+  return writer
+
+def test_spliced_codes_match_concatenation():
+  rng = random.Random(0)
+  codes = [random_code(rng) for _ in range(64)]
+  spliced = SplicedCodes(codes)
+  for _ in range(2000):
+    slot = rng.randrange(64)
+    codes[slot] = random_code(rng)
+    spliced.set(slot, codes[slot])
+    assert spliced.write(BitWriter()) == concatenate(codes)
+
+def test_random_games_match_encoding_from_scratch():
+  rng = random.Random(1)
+  for _ in range(40):
+    board = chess.Board()
+    encoder = IncrementalEncoder(board)
+    for _ in range(rng.randint(1, 150)):
+      moves = list(board.legal_moves)
+      if not moves:
+        break
+      move = rng.choice(moves)
+      board.push(move)
+      encoder.push(move)
+      sizes = encoder.sizes()
+      for scheme in INCREMENTAL_SCHEMES:
+        expected = ENCODE_FUNCTIONS[scheme](board)
+        assert encoder.encode(scheme) == expected, (scheme, board.fen())
+        assert sizes[scheme] == len(expected)
+
+def test_en_passant_and_promotion():
+  board = chess.Board("4k3/1P6/8/8/3p4/8/4P3/4K3 w - - 0 1")
+  encoder = IncrementalEncoder(board)
+  for uci in ["e2e4", "d4e3", "b7b8q", "e3e2", "e1d2", "e2e1n"]:
+    move = chess.Move.from_uci(uci)
+    board.push(move)
+    encoder.push(move)
+    for scheme in INCREMENTAL_SCHEMES:
+      assert encoder.encode(scheme) == ENCODE_FUNCTIONS[scheme](board), (scheme, uci)
@@ -0,0 +1,40 @@
+
+"""
+Every instrumented call must count once, and no count may be lost to threads or to resetting exports.
+"""
+
+import threading
+import chess
+import pytest
+from chess_position_compression import instrumentation
+from chess_position_compression.huffman import encode_board_to_huffman
+
+@pytest.fixture(autouse=True)
+def enabled():
+  instrumentation.reset()
+  instrumentation.enable()
+  yield
+  instrumentation.disable()
+  instrumentation.reset()
+
+def test_one_call_counts_once():
+  for option in [None, "bits", "bytes", "binary", "string"]:
+    instrumentation.reset()
+    encode_board_to_huffman(chess.Board(), option=option)
+    assert instrumentation.snapshot()["counters"] == {"encode.huffman": 1}, option
+
+def test_threads_and_resetting_exports_lose_nothing():
+  exports = []
+  exporter = instrumentation.PeriodicExporter(exports.append, interval=0.001, reset_after=True)
+
+  def count():
+    for _ in range(20000):
+      instrumentation.increment("test.events")
+
+  threads = [threading.Thread(target=count) for _ in range(4)]
+  with exporter:
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+  assert sum(metrics["counters"].get("test.events", 0) for metrics in exports) == 4 * 20000
@@ -0,0 +1,76 @@
+
+"""
+Sharded ingestion must give the same positions as a serial pass, wherever the shard boundaries fall.
+"""
+
+import os
+import re
+from chess_position_compression.huffman import encode_board_to_huffman
+from chess_position_compression.parallel_ingest import find_game_start, encode_shard, ingest
+
+PGN = """[Event "First"]
+[Site "?"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 1-0
+
+[Event "Second"]
+[Site "?"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 3. Nc3 Nf6 4. Bg5 Be7 0-1
+
+[Event "Set up"]
+[Site "?"]
+[Result "*"]
+[FEN "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"]
+[SetUp "1"]
+
+1. exd6 Kd7 2. Kd2 Kxd6 *
+
+[Event "Last"]
+[Result "1/2-1/2"]
+
+1. c4 c5 2. g3 g6 1/2-1/2
+"""
+
+def write_pgn(tmp_path, text):
+  path = str(tmp_path / "games.pgn")
+  with open(path, "wb") as f:
+    f.write(text.encode())
+  return path
+
+def tag_line_offsets(text):
+  return [match.start() for match in re.finditer(r"^\[", text, re.MULTILINE)]
+
+def shard_encodings(path, boundaries):
+  """ Returns the encodings of every position with shards starting at find_game_start of each boundary. """
+  with open(path, "rb") as pgn:
+    starts = sorted(set([find_game_start(pgn, boundary) for boundary in boundaries] + [os.path.getsize(path)]))
+  return [encoding for start, end in zip(starts[:-1], starts[1:]) for encoding in encode_shard((path, start, end, encode_board_to_huffman))]
+
+def test_game_starts_skip_header_lines(tmp_path):
+  path = write_pgn(tmp_path, PGN)
+  game_starts = [PGN.index("[Event")] + [match.start() + 2 for match in re.finditer(r"\n\n\[", PGN)] + [len(PGN)]
+  with open(path, "rb") as pgn:
+    for offset in tag_line_offsets(PGN):
+      assert find_game_start(pgn, offset) == min(start for start in game_starts if start >= offset)
+
+def test_boundary_at_every_tag_line(tmp_path):
+  for newline in ("\n", "\r\n"):
+    text = PGN.replace("\n", newline)
+    path = write_pgn(tmp_path, text)
+    serial = encode_shard((path, 0, os.path.getsize(path), encode_board_to_huffman))
+    assert len(serial) == 26
+    for offset in tag_line_offsets(text):
+      assert shard_encodings(path, [0, offset]) == serial
+      # Also starting one byte either side of the tag line.
+      assert shard_encodings(path, [0, max(0, offset - 1), offset + 1]) == serial
+    assert shard_encodings(path, [0] + tag_line_offsets(text)) == serial
+
+def test_ingest_matches_serial(tmp_path):
+  path = write_pgn(tmp_path, PGN * 5)
+  serial = encode_shard((path, 0, os.path.getsize(path), encode_board_to_huffman))
+  assert ingest(path, encode_board_to_huffman, processes=2, num_shards=7) == serial
@@ -0,0 +1,60 @@
+
+"""
+A saved position index maps back to the same keys and ids, and finds every position of its container.
+"""
+
+import chess
+import numpy as np
+import pytest
+from chess_position_compression.container import ContainerWriter, ContainerReader
+from chess_position_compression.position_index import PositionIndex, KEY_KINDS, build_container_index, index_file_path, find_position
+
+def write_container(path, boards):
+  with ContainerWriter(path) as writer:
+    for board in boards:
+      writer.append_board(board)
+
+def test_save_load_round_trip(tmp_path):
+  rng = np.random.default_rng(0)
+  keys = rng.integers(0, 1 << 63, 1000, dtype=np.uint64)
+  keys[500:600] = keys[:100]
+  index = PositionIndex.build(keys)
+  path = str(tmp_path / "keys.pidx")
+  index.save(path)
+  loaded = PositionIndex.load(path)
+  assert loaded.key_kind == "zobrist"
+  assert np.array_equal(loaded.keys, index.keys) and np.array_equal(loaded.ids, index.ids)
+  assert (loaded.keys[1:] >= loaded.keys[:-1]).all()
+  for position_id in (0, 99, 550, 999):
+    assert position_id in loaded.find(keys[position_id]).tolist()
+  assert len(loaded.duplicate_groups()) == 100
+
+def test_empty_index(tmp_path):
+  path = str(tmp_path / "empty.pidx")
+  PositionIndex.build([], key_kind="encoding").save(path)
+  loaded = PositionIndex.load(path)
+  assert len(loaded) == 0 and loaded.key_kind == "encoding"
+  assert 1 not in loaded and len(loaded.find(1)) == 0
+
+@pytest.mark.parametrize("key_kind", list(KEY_KINDS))
+def test_finds_container_positions(tmp_path, key_kind, random_boards):
+  path = str(tmp_path / "positions.cpc")
+  # Short games, so some positions are stored more than once.
+  boards = random_boards(300, max_plies=30)
+  write_container(path, boards)
+  build_container_index(path, key_kind)
+  index = PositionIndex.load(index_file_path(path))
+  assert index.key_kind == key_kind and len(index) == len(boards)
+  with ContainerReader(path) as reader:
+    for board in boards:
+      position_id = find_position(index, reader, board)
+      assert position_id is not None
+      assert reader.get_board(position_id).epd(en_passant="legal") == board.epd(en_passant="legal")
+    assert find_position(index, reader, chess.Board("8/8/8/4k3/8/8/8/4K2R w K - 0 1")) is None
+
+def test_load_rejects_other_files(tmp_path):
+  path = str(tmp_path / "not_an_index.pidx")
+  with open(path, "wb") as f:
+    f.write(b"\0" * 32)
+  with pytest.raises(ValueError):
+    PositionIndex.load(path)
@@ -0,0 +1,50 @@
+
+"""
+A position is stored once however its en passant square is written, and a saved store loads back the same.
+"""
+
+import io
+import chess
+import chess.pgn
+from chess_position_compression.position_store import PositionStore, unique_positions
+
+# Black's d7-d5 gives a d6 en passant square, but exd6 would leave the white king in check from the rook.
+PSEUDO_LEGAL_EP = "4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 1"
+NO_EP = "4k3/8/8/K2pP2r/8/8/8/8 w - - 0 1"
+LEGAL_EP = "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"
+LEGAL_EP_DROPPED = "4k3/8/8/3pP3/8/8/8/4K3 w - - 0 1"
+
+GAMES = """[Event "?"]
+
+1. e4 e5 2. Nf3 Nf6 3. Ng1 Ng8 4. Nf3 Nf6 5. d4 exd4 *
+
+[Event "?"]
+
+1. e4 e5 2. Nf3 Nc6 *
+"""
+
+def test_pseudo_legal_en_passant_is_stored_once():
+  store = PositionStore()
+  position_id = store.add(chess.Board(PSEUDO_LEGAL_EP))
+  assert store.add(chess.Board(NO_EP)) == position_id
+  assert store.find(chess.Board(NO_EP)) == position_id
+  assert store.add(chess.Board(LEGAL_EP)) != store.add(chess.Board(LEGAL_EP_DROPPED))
+  assert len(store) == 3
+  assert len(unique_positions([chess.Board(fen) for fen in (PSEUDO_LEGAL_EP, NO_EP, LEGAL_EP, LEGAL_EP_DROPPED)])) == 3
+
+def test_save_load_round_trip(tmp_path):
+  store = PositionStore()
+  stream = io.StringIO(GAMES)
+  while True:
+    game = chess.pgn.read_game(stream)
+    if game is None:
+      break
+    store.add_game(game)
+  store.add(chess.Board(PSEUDO_LEGAL_EP))
+  path = str(tmp_path / "store.cpc")
+  store.save(path)
+  loaded = PositionStore.load(path)
+  assert loaded.encodings == store.encodings
+  assert loaded.games == store.games
+  assert loaded.find(chess.Board(NO_EP)) == store.find(chess.Board(NO_EP))
+  assert loaded.find(chess.Board()) == 0
@@ -0,0 +1,69 @@
+
+"""
+The range coder must round trip with the prior and with a trained context model, agree with its size estimate,
+and refuse bits that aren't an encoding.
+"""
+
+import random
+import chess
+import pytest
+from chess_position_compression.bitstream import BitWriter, as_reader
+from chess_position_compression.codebook import BUILTIN_CODEBOOK_ID
+from chess_position_compression.utility import board_metadata, get_square_symbols
+from chess_position_compression.range_coding import (PRIOR_MODEL, get_context_model, train_codebook,
+  encode_board_to_range_coded, decode_board_from_range_coded, range_coded_size, write_range_coded_squares,
+  read_range_coded_squares)
+
+TRAINED_CODEBOOK_ID = 1
+
+@pytest.fixture
+def codebook_ids(random_boards):
+  """ The builtin codebook and one trained on random positions. """
+  train_codebook(random_boards(300, seed=1), TRAINED_CODEBOOK_ID)
+  return [BUILTIN_CODEBOOK_ID, TRAINED_CODEBOOK_ID]
+
+def test_models(codebook_ids):
+  assert get_context_model(BUILTIN_CODEBOOK_ID) is PRIOR_MODEL
+  assert get_context_model(TRAINED_CODEBOOK_ID) is not PRIOR_MODEL
+
+@pytest.mark.parametrize("codebook_index", [0, 1])
+def test_round_trip_and_size(random_boards, codebook_ids, codebook_index):
+  codebook_id = codebook_ids[codebook_index]
+  boards = [chess.Board(), chess.Board(None), chess.Board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")] + random_boards(200)
+  for board in boards:
+    bits = encode_board_to_range_coded(board, codebook_id=codebook_id)
+    assert range_coded_size(board_metadata(board), get_square_symbols(board), codebook_id) == len(bits)
+    decoded = decode_board_from_range_coded(bits.to_bytes(), len(bits), codebook_id)
+    assert decoded.epd(en_passant="legal") == board.epd(en_passant="legal")
+
+def test_trained_model_is_smaller(random_boards, codebook_ids):
+  boards = random_boards(300, seed=1)
+  prior = sum(len(encode_board_to_range_coded(board)) for board in boards)
+  trained = sum(len(encode_board_to_range_coded(board, codebook_id=TRAINED_CODEBOOK_ID)) for board in boards)
+  assert trained < prior
+
+def test_truncated_bits_raise(random_boards):
+  for board in random_boards(20, seed=2):
+    bits = encode_board_to_range_coded(board)
+    data = bits.to_bytes()
+    for length in range(len(bits)):
+      with pytest.raises(ValueError):
+        decode_board_from_range_coded(data, length)
+
+def test_random_bits_raise_or_are_an_encoding():
+  # Arithmetic coding leaves almost no redundancy, so some random bits are a valid encoding of some squares.
+  # Those must be exactly that encoding; everything else must raise.
+  rng = random.Random(0)
+  rejected = 0
+  for _ in range(2000):
+    length = rng.randrange(1, 200)
+    data = rng.getrandbits(length).to_bytes((length + 7) // 8, "big")
+    reader = as_reader(data, length)
+    try:
+      symbols = read_range_coded_squares(reader, PRIOR_MODEL)
+    except ValueError:
+      rejected += 1
+      continue
+    encoded = write_range_coded_squares(symbols, BitWriter(), PRIOR_MODEL)
+    assert as_reader(data, reader.pos).read(reader.pos) == encoded.value and reader.pos == len(encoded)
+  assert rejected > 1500